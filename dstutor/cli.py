@@ -0,0 +1,117 @@
+"""
+Command line interface for DS-Tutor
+"""
+
+import argparse
+from pathlib import Path
+from typing import List, Optional
+
+from .curriculum.lesson_loader import LessonLoader
+
+
+def _cmd_build_catalog(args) -> int:
+    """Compile all lesson YAML files into the binary catalog"""
+    loader = LessonLoader(
+        lessons_dir=Path(args.lessons_dir) if args.lessons_dir else None,
+        catalog_path=Path(args.output) if args.output else None,
+    )
+    loader.catalog.refresh(verbose=True)
+    print(f"Compiled {loader.catalog.lesson_count} lessons into {loader.catalog.catalog_path}")
+
+    if args.solutions:
+        count = _precompute_solutions(loader)
+        print(f"Cached reference results of {count} solution_check exercises")
+    return 0
+
+
+def _precompute_solutions(loader: LessonLoader) -> int:
+    """Run the reference solution of every 'solution_check' exercise into the solution cache"""
+    from .core.rules import RuleError, get_plan
+    from .core.validator import CodeValidator
+
+    validator = CodeValidator()
+    count = 0
+    for topic in loader.catalog.topics():
+        for lesson_id in loader.get_topic_lesson_ids(topic):
+            lesson = loader.get_lesson_by_id(lesson_id)
+            exercise = (lesson.get('exercise') if lesson else None) or {}
+            try:
+                plan = get_plan(exercise.get('validation'))
+            except RuleError:
+                continue  # Reported when the catalog was built
+            if plan.target != 'solution':
+                continue
+            try:
+                validator.reference_results(
+                    exercise.get('solution') or '',
+                    exercise.get('setup_code') or '',
+                    plan.variables
+                )
+                count += 1
+            except Exception as e:
+                print(f"Warning: reference solution of {lesson_id} failed: {e}")
+    return count
+
+
+def _cmd_fingerprint(args) -> int:
+    """Print a fingerprint check for the result of a lesson's reference solution"""
+    import yaml
+    from .core.fingerprint import fingerprint_check
+    from .core.validator import CodeValidator
+
+    loader = LessonLoader(lessons_dir=Path(args.lessons_dir) if args.lessons_dir else None)
+    lesson = loader.get_lesson_by_id(args.lesson_id)
+    exercise = (lesson.get('exercise') if lesson else None) or {}
+    if not exercise.get('solution'):
+        print(f"Lesson {args.lesson_id} has no exercise solution")
+        return 1
+
+    try:
+        values = CodeValidator().reference_results(
+            exercise['solution'], exercise.get('setup_code') or '', [args.variable]
+        )
+    except Exception as e:
+        print(f"Reference solution of {args.lesson_id} failed: {e}")
+        return 1
+
+    check = fingerprint_check(values[args.variable], args.decimals, with_sketch=not args.no_sketch)
+    print(yaml.safe_dump([check], sort_keys=False), end='')
+    return 0
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Entry point for the ``dstutor`` console script"""
+    parser = argparse.ArgumentParser(prog='dstutor', description="DS-Tutor utilities")
+    subparsers = parser.add_subparsers(dest='command')
+
+    build = subparsers.add_parser('build-catalog', help="Compile lessons into a binary catalog")
+    build.add_argument('lessons_dir', nargs='?', default=None,
+                       help="Lessons directory (defaults to the bundled lessons)")
+    build.add_argument('-o', '--output', default=None,
+                       help="Catalog file (defaults to $DSTUTOR_CATALOG or ~/.dstutor/lesson_catalog.bin)")
+    build.add_argument('--solutions', action='store_true',
+                       help="Also run and cache the reference solutions of solution_check exercises")
+    build.set_defaults(func=_cmd_build_catalog)
+
+    fingerprint = subparsers.add_parser(
+        'fingerprint', help="Print a fingerprint check for a lesson's expected result")
+    fingerprint.add_argument('lesson_id', help="Lesson whose reference solution to fingerprint")
+    fingerprint.add_argument('--lessons-dir', default=None,
+                             help="Lessons directory (defaults to the bundled lessons)")
+    fingerprint.add_argument('--variable', default='result',
+                             help="Variable holding the expected result (default: result)")
+    fingerprint.add_argument('--decimals', type=int, default=6,
+                             help="Decimals numbers are rounded to before hashing (default: 6)")
+    fingerprint.add_argument('--no-sketch', action='store_true',
+                             help="Omit the per-column sketches")
+    fingerprint.set_defaults(func=_cmd_fingerprint)
+
+    args = parser.parse_args(argv)
+    if not getattr(args, 'func', None):
+        parser.print_help()
+        return 1
+    return args.func(args)
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
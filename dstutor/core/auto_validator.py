@@ -0,0 +1,163 @@
+"""
+Automatic validation of executed cells
+
+When enabled, every executed cell passes a cheap relevance filter: only
+cells that ran without error and mention 'result' (or one of the variables
+the exercise checks, or call plt./ax. methods in plot exercises) are
+validated. Validation runs on a worker thread in
+the sandbox, so the next cell never waits for it; re-running a cell within
+the debounce delay replaces the pending check. The verdict is streamed into
+a display handle created under the cell that triggered it.
+"""
+
+import re
+import threading
+from functools import lru_cache
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from IPython.display import HTML, display
+
+from .cell_history import is_magic
+
+
+DEFAULT_DELAY = 0.5
+
+# Cells that may draw the figure a plot_check exercise inspects
+_PLOT_CALL = re.compile(r'\b(?:plt|ax|axs|axes|fig)\.')
+
+_CHECKING_HTML = '<div style="color: #6c757d; padding: 10px; border-left: 4px solid #6c757d;">⏳ Checking your solution…</div>'
+
+
+@lru_cache(maxsize=32)
+def _names_pattern(names: Tuple[str, ...]) -> re.Pattern:
+    """Regex matching any of the names as a whole word"""
+    return re.compile(r'\b(?:' + '|'.join(re.escape(name) for name in names) + r')\b')
+
+
+class AutoValidator:
+    """Validate cells as they run, without blocking the kernel"""
+
+    def __init__(self,
+                 engine,
+                 render: Callable[[Dict[str, Any]], str],
+                 delay: float = DEFAULT_DELAY):
+        """
+        Initialize auto-validator
+
+        Args:
+            engine: TutorEngine validating the current exercise
+            render: Builds the verdict HTML from a validate_exercise() result
+            delay: Debounce delay in seconds
+        """
+        self.engine = engine
+        self.render = render
+        self.delay = delay
+
+        self._lock = threading.Lock()
+        self._run_lock = threading.Lock()  # One validation at a time
+        self._generation = 0  # Bumped by every relevant cell, older checks are dropped
+        self._timer = None
+        self._handle = None
+
+    def is_relevant(self, code: str) -> bool:
+        """
+        Cheap filter: whether a cell may have set the checked variables
+
+        Args:
+            code: Source of the executed cell
+
+        Returns:
+            True if the cell mentions one of the variables the current
+            exercise validates, or draws on a plot exercise's figure
+        """
+        if not code or is_magic(code):
+            return False
+        if self.engine.checks_plot():
+            return _PLOT_CALL.search(code) is not None
+        names = self.engine.checked_variables()
+        return bool(names) and _names_pattern(names).search(code) is not None
+
+    def post_run_cell(self, result: Any):
+        """
+        IPython 'post_run_cell' event handler
+
+        Args:
+            result: IPython ExecutionResult of the cell
+        """
+        info = getattr(result, 'info', None)
+        code = getattr(info, 'raw_cell', None)
+        if not result.success or not self.is_relevant(code):
+            return
+        # Without the sandbox the code would run in the kernel, next to the user's cells
+        if self.engine.validator.sandbox is None:
+            return
+        self.schedule(code)
+
+    def schedule(self, code: str):
+        """
+        Validate code after the debounce delay, replacing a pending check
+
+        Must be called on the kernel's main thread: the display handle is
+        created under the cell being executed.
+        """
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+            self._clear_handle()
+
+            self._generation += 1
+            handle = display(HTML(_CHECKING_HTML), display_id=True)
+            self._handle = handle
+            self._timer = threading.Timer(
+                self.delay,
+                self._run,
+                args=(code, self.engine.current_lesson_id, self._generation, handle)
+            )
+            self._timer.name = 'dstutor-auto-validate'
+            self._timer.daemon = True
+            self._timer.start()
+
+    def cancel(self):
+        """Drop the pending check (e.g. when auto-validation is turned off)"""
+        with self._lock:
+            self._generation += 1
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            self._clear_handle()
+
+    def _clear_handle(self):
+        """Blank the verdict of a check that never finished (lock held)"""
+        if self._handle is not None:
+            try:
+                self._handle.update(HTML(''))
+            except Exception:
+                pass
+            self._handle = None
+
+    def _is_current(self, generation: int) -> bool:
+        with self._lock:
+            return generation == self._generation
+
+    def _run(self, code: str, lesson_id: Optional[str], generation: int, handle):
+        """Timer thread: validate and stream the verdict into the handle"""
+        with self._run_lock:
+            if not self._is_current(generation):
+                return
+            if lesson_id != self.engine.current_lesson_id:
+                result = None  # The learner moved to another lesson meanwhile
+            else:
+                try:
+                    result = self.engine.validate_exercise(code, ai_feedback=False, record_attempt=False)
+                except Exception as e:
+                    result = {'success': False, 'message': f'Validation error: {str(e)}'}
+
+        with self._lock:
+            if generation != self._generation:
+                return  # A newer cell is being checked, its handle replaced this one
+            self._handle = None
+            self._timer = None
+        try:
+            handle.update(HTML(self.render(result) if result is not None else ''))
+        except Exception:
+            pass  # The notebook's output area may be gone
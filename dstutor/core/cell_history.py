@@ -0,0 +1,85 @@
+"""
+Recently executed notebook cells
+
+A post_run_cell hook keeps the last few code cells (magics excluded) in a
+ring buffer, so finding the cell to check doesn't read the session's whole
+history from IPython's SQLite database.
+"""
+
+from collections import deque
+from typing import Any, List, NamedTuple, Optional
+
+
+DEFAULT_HISTORY_SIZE = 20
+
+
+class CellRecord(NamedTuple):
+    """An executed cell"""
+    code: str
+    success: bool
+    execution_count: Optional[int] = None
+
+
+def is_magic(code: str) -> bool:
+    """Whether a cell only runs a magic command"""
+    return code.strip().startswith('%')
+
+
+class CellHistory:
+    """Ring buffer of the last executed code cells"""
+
+    def __init__(self, max_cells: int = DEFAULT_HISTORY_SIZE):
+        """
+        Initialize cell history
+
+        Args:
+            max_cells: Number of cells kept
+        """
+        self._cells = deque(maxlen=max_cells)
+
+    @property
+    def max_cells(self) -> int:
+        return self._cells.maxlen
+
+    def __len__(self) -> int:
+        return len(self._cells)
+
+    def post_run_cell(self, result: Any):
+        """
+        IPython 'post_run_cell' event handler
+
+        Args:
+            result: IPython ExecutionResult of the cell
+        """
+        info = getattr(result, 'info', None)
+        code = getattr(info, 'raw_cell', None)
+        if not code or not code.strip() or is_magic(code):
+            return
+        self.add(code, result.success, getattr(result, 'execution_count', None))
+
+    def add(self, code: str, success: bool = True, execution_count: Optional[int] = None):
+        """Record an executed cell"""
+        self._cells.append(CellRecord(code, success, execution_count))
+
+    def last(self, successful: bool = False) -> Optional[CellRecord]:
+        """
+        Most recently executed cell
+
+        Args:
+            successful: Skip cells that raised an exception
+
+        Returns:
+            CellRecord or None
+        """
+        for record in reversed(self._cells):
+            if record.success or not successful:
+                return record
+        return None
+
+    def cells(self) -> List[CellRecord]:
+        """Recorded cells, oldest first"""
+        return list(self._cells)
+
+    def clear(self):
+        """Forget all cells"""
+        self._cells.clear()
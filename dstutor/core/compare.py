@@ -0,0 +1,404 @@
+"""
+Vectorized comparison of tabular results
+
+DataFrames are compared column by column on their numpy arrays, so large
+frames never become Python lists. Numeric columns match within rtol/atol,
+missing values (NaN, None, NaT) match each other, and the comparison stops
+at the first column that differs, reporting its first few mismatches.
+
+Nested results (dicts and lists of numbers, arrays, Series, ...) are walked
+by find_mismatch(), which compares numeric lists and arrays in one
+np.isclose call and reports where the first difference is, e.g.
+``result['mean'][3]``.
+"""
+
+import numbers
+from collections.abc import Mapping
+from typing import Any, NamedTuple, Optional
+
+import numpy as np
+import pandas as pd
+
+
+# Mismatching cells quoted in feedback
+MAX_REPORTED_DIFFS = 3
+
+_NUMERIC_KINDS = 'biuf'
+_EXACT_KINDS = 'biu'
+_DATETIME_KINDS = 'mM'
+
+
+def column_array(values: Any) -> np.ndarray:
+    """numpy array of a column, extension dtypes become float or object arrays"""
+    if isinstance(values, (pd.Series, pd.Index)):
+        if isinstance(values.dtype, np.dtype):
+            return values.to_numpy()
+        if pd.api.types.is_numeric_dtype(values.dtype):
+            return values.to_numpy(dtype=float, na_value=np.nan)
+        return values.to_numpy(dtype=object)
+    return np.asarray(values)
+
+
+def _numeric(values: np.ndarray) -> np.ndarray:
+    """Object array holding only numbers and missing values as floats (else unchanged)"""
+    try:
+        return values.astype(float)
+    except (TypeError, ValueError):
+        return values
+
+
+def mismatch_mask(actual: Any, expected: Any, rtol: float = 1e-5, atol: float = 1e-8) -> np.ndarray:
+    """
+    Find the positions where two equally long columns differ
+
+    Args:
+        actual: User's column (Series, Index or 1-D array)
+        expected: Expected column
+        rtol: Relative tolerance for floats
+        atol: Absolute tolerance for floats
+
+    Returns:
+        Boolean array, True where the values differ
+    """
+    # Extension arrays (strings, categoricals) compare natively when equal
+    if isinstance(actual, (pd.Series, pd.Index)) and isinstance(expected, (pd.Series, pd.Index)) and \
+            actual.dtype == expected.dtype and not isinstance(actual.dtype, np.dtype) and \
+            actual.array.equals(expected.array):
+        return np.zeros(len(actual), dtype=bool)
+
+    a = column_array(actual)
+    e = column_array(expected)
+
+    # Numbers in object columns (e.g. from YAML lists with gaps) compare as floats
+    if a.dtype.kind == 'O' and e.dtype.kind in _NUMERIC_KINDS:
+        a = _numeric(a)
+    elif e.dtype.kind == 'O' and a.dtype.kind in _NUMERIC_KINDS:
+        e = _numeric(e)
+
+    if a.dtype.kind in _NUMERIC_KINDS and e.dtype.kind in _NUMERIC_KINDS:
+        if a.dtype.kind in _EXACT_KINDS and e.dtype.kind in _EXACT_KINDS:
+            return a != e
+        return ~np.isclose(a, e, rtol=rtol, atol=atol, equal_nan=True)
+
+    if a.dtype.kind == 'c' or e.dtype.kind == 'c':
+        try:
+            return ~np.isclose(a, e, rtol=rtol, atol=atol, equal_nan=True)
+        except TypeError:
+            pass
+
+    if a.dtype.kind in _DATETIME_KINDS and a.dtype == e.dtype:
+        return (a != e) & ~(np.isnat(a) & np.isnat(e))
+
+    # Strings, mixed objects, categoricals: equal or both missing. Only the
+    # cells that compare unequal are checked for missing values
+    differs = np.asarray(a != e, dtype=bool)
+    positions = np.flatnonzero(differs)
+    if positions.size:
+        both_missing = pd.isna(a[positions]) & pd.isna(e[positions])
+        differs[positions[both_missing]] = False
+    return differs
+
+
+def _show(value: Any) -> str:
+    """repr of a cell, numpy scalars shown as Python values"""
+    return repr(value.item() if isinstance(value, np.generic) else value)
+
+
+def _describe_diffs(mask: np.ndarray, actual: np.ndarray, expected: np.ndarray, labels: Any) -> str:
+    """Summary of the first mismatching cells"""
+    positions = np.flatnonzero(mask)
+    shown = [
+        f"row {_show(labels[i])}: got {_show(actual[i])}, expected {_show(expected[i])}"
+        for i in positions[:MAX_REPORTED_DIFFS]
+    ]
+    more = len(positions) - len(shown)
+    summary = "; ".join(shown)
+    if more > 0:
+        summary += f"; and {more} more"
+    return f"{len(positions)} of {len(mask)} rows differ ({summary})"
+
+
+def compare_series(actual: pd.Series,
+                   expected: pd.Series,
+                   rtol: float = 1e-5,
+                   atol: float = 1e-8,
+                   check_labels: bool = True,
+                   name: Optional[str] = None) -> Optional[str]:
+    """
+    Compare two Series element-wise
+
+    Args:
+        actual: User's Series
+        expected: Expected Series
+        rtol: Relative tolerance for floats
+        atol: Absolute tolerance for floats
+        check_labels: Also compare the indexes
+        name: Column name to use in messages
+
+    Returns:
+        None if they match, else the feedback message
+    """
+    if len(actual) != len(expected):
+        return f"Length mismatch: got {len(actual)}, expected {len(expected)}"
+
+    if check_labels and not actual.index.equals(expected.index):
+        mask = mismatch_mask(actual.index, expected.index)
+        return f"Index doesn't match the expected result: " \
+               f"{_describe_diffs(mask, column_array(actual.index), column_array(expected.index), range(len(mask)))}"
+
+    mask = mismatch_mask(actual, expected, rtol, atol)
+    if not mask.any():
+        return None
+
+    what = f"Column '{name}' doesn't" if name is not None else "Values don't"
+    return f"{what} match the expected result: " \
+           f"{_describe_diffs(mask, column_array(actual), column_array(expected), actual.index)}"
+
+
+def compare_frames(actual: pd.DataFrame,
+                   expected: pd.DataFrame,
+                   rtol: float = 1e-5,
+                   atol: float = 1e-8,
+                   check_labels: bool = True) -> Optional[str]:
+    """
+    Compare two DataFrames column by column
+
+    Args:
+        actual: User's DataFrame
+        expected: Expected DataFrame
+        rtol: Relative tolerance for floats
+        atol: Absolute tolerance for floats
+        check_labels: Also compare column names and the index (otherwise
+            columns are matched by position)
+
+    Returns:
+        None if they match, else the feedback message for the first
+        mismatching column
+    """
+    if actual.shape != expected.shape:
+        return f"Shape mismatch: got {actual.shape}, expected {expected.shape}"
+
+    if check_labels:
+        if list(actual.columns) != list(expected.columns):
+            return f"Column mismatch: got {list(actual.columns)}, expected {list(expected.columns)}"
+        if not actual.index.equals(expected.index):
+            mask = mismatch_mask(actual.index, expected.index)
+            return f"Index doesn't match the expected result: " \
+                   f"{_describe_diffs(mask, column_array(actual.index), column_array(expected.index), range(len(mask)))}"
+
+    for j in range(actual.shape[1]):
+        message = compare_series(actual.iloc[:, j], expected.iloc[:, j], rtol, atol,
+                                 check_labels=False, name=actual.columns[j])
+        if message is not None:
+            return message
+    return None
+
+
+class Mismatch(NamedTuple):
+    """First difference found by find_mismatch()"""
+    path: str    # e.g. "result['mean'][3]"
+    reason: str  # e.g. "got 2.5, expected 2.0"
+
+
+def _is_number(value: Any) -> bool:
+    return isinstance(value, (numbers.Number, np.number)) and not isinstance(value, (bool, np.bool_))
+
+
+def _numeric_sequence(value: Any) -> Optional[np.ndarray]:
+    """A list/tuple (possibly nested) of numbers as an array, else None"""
+    if not value or not (_is_number(value[0]) or isinstance(value[0], (list, tuple))):
+        return None  # Lists of Series or arrays are compared item by item, with labels
+    try:
+        arr = np.asarray(value)
+    except (TypeError, ValueError):
+        return None  # Ragged nesting
+    if arr.dtype.kind not in _NUMERIC_KINDS or arr.dtype.kind == 'b' or arr.shape[0] != len(value):
+        return None
+    return arr
+
+
+def _type_name(value: Any) -> str:
+    if value is None:
+        return 'None'
+    if isinstance(value, Mapping):
+        return 'dict'
+    if isinstance(value, (set, frozenset)):
+        return 'set'
+    if isinstance(value, (list, tuple)):
+        return 'list'
+    if _is_number(value):
+        return 'number'
+    return type(value).__name__
+
+
+def _item_path(path: str, index: Any, numpy_index: bool = False) -> str:
+    if numpy_index and isinstance(index, tuple):
+        return f"{path}[{', '.join(str(i) for i in index)}]"
+    if isinstance(index, tuple):
+        return path + ''.join(f"[{i}]" for i in index)
+    return f"{path}[{index!r}]"
+
+
+def _array_mismatch(actual: np.ndarray,
+                    expected: np.ndarray,
+                    rtol: float,
+                    atol: float,
+                    path: str,
+                    numpy_index: bool) -> Optional[Mismatch]:
+    """Compare equally shaped arrays in one vectorized pass"""
+    if actual.shape != expected.shape:
+        return Mismatch(path, f"shape {actual.shape}, expected {expected.shape}")
+
+    if actual.dtype.kind in _NUMERIC_KINDS and expected.dtype.kind in _NUMERIC_KINDS:
+        if actual.dtype.kind in _EXACT_KINDS and expected.dtype.kind in _EXACT_KINDS:
+            differs = actual != expected
+        else:
+            differs = ~np.isclose(actual, expected, rtol=rtol, atol=atol, equal_nan=True)
+    else:
+        differs = mismatch_mask(actual.ravel(), expected.ravel(), rtol, atol).reshape(expected.shape)
+
+    if not differs.any():
+        return None
+    index = tuple(int(i) for i in np.argwhere(differs)[0])
+    if actual.ndim == 1:
+        index = index[0]
+    return Mismatch(_item_path(path, index, numpy_index),
+                    f"got {_show(actual[index])}, expected {_show(expected[index])}")
+
+
+def find_mismatch(actual: Any,
+                  expected: Any,
+                  rtol: float = 1e-5,
+                  atol: float = 1e-8,
+                  path: str = 'result') -> Optional[Mismatch]:
+    """
+    Compare nested results, stopping at the first difference
+
+    Dicts must have the same keys, sets the same elements, lists and tuples
+    the same length, numbers match within rtol/atol (NaN equals NaN),
+    arrays, Series and DataFrames are compared vectorized; other values
+    with ==. Lists, tuples, arrays and Series are interchangeable
+    array-likes: only their values are compared when one of them has no
+    labels.
+
+    Args:
+        actual: User's value
+        expected: Expected value
+        rtol: Relative tolerance for floats
+        atol: Absolute tolerance for floats
+        path: Expression naming actual in messages
+
+    Returns:
+        None if they match, else the Mismatch
+    """
+    # YAML writes sets as mappings to null ({4, 5} is {4: null, 5: null})
+    if isinstance(expected, Mapping) and isinstance(actual, (set, frozenset)) and \
+            all(value is None for value in expected.values()):
+        expected = set(expected)
+
+    if isinstance(expected, (set, frozenset)):
+        if not isinstance(actual, (set, frozenset)):
+            return Mismatch(path, f"expected a set, got {_type_name(actual)}")
+        missing = expected - actual
+        if missing:
+            return Mismatch(path, f"missing {_show(sorted(missing, key=repr)[0])}")
+        extra = actual - expected
+        if extra:
+            return Mismatch(path, f"unexpected {_show(sorted(extra, key=repr)[0])}")
+        return None
+
+    if isinstance(expected, Mapping):
+        if not isinstance(actual, Mapping):
+            return Mismatch(path, f"expected a dict, got {_type_name(actual)}")
+        for key in expected:
+            if key not in actual:
+                return Mismatch(path, f"missing key {key!r}")
+        for key in actual:
+            if key not in expected:
+                return Mismatch(path, f"unexpected key {key!r}")
+        for key, value in expected.items():
+            mismatch = find_mismatch(actual[key], value, rtol, atol, _item_path(path, key))
+            if mismatch is not None:
+                return mismatch
+        return None
+
+    if isinstance(expected, (list, tuple)):
+        # An array or Series holding the same values matches a list
+        if isinstance(actual, (np.ndarray, pd.Series)):
+            actual_arr = column_array(actual)
+            expected_arr = _numeric_sequence(expected)
+            if expected_arr is not None and actual_arr.dtype.kind in _NUMERIC_KINDS:
+                return _array_mismatch(actual_arr, expected_arr, rtol, atol, path, numpy_index=False)
+            actual = actual_arr.tolist()
+        if not isinstance(actual, (list, tuple)):
+            return Mismatch(path, f"expected a list, got {_type_name(actual)}")
+        if len(actual) != len(expected):
+            return Mismatch(path, f"{len(actual)} items, expected {len(expected)}")
+
+        # Lists of numbers compare in one vectorized call
+        expected_arr = _numeric_sequence(expected)
+        if expected_arr is not None:
+            actual_arr = _numeric_sequence(actual)
+            if actual_arr is not None and actual_arr.shape == expected_arr.shape:
+                return _array_mismatch(actual_arr, expected_arr, rtol, atol, path, numpy_index=False)
+
+        for i, (got, want) in enumerate(zip(actual, expected)):
+            mismatch = find_mismatch(got, want, rtol, atol, f"{path}[{i}]")
+            if mismatch is not None:
+                return mismatch
+        return None
+
+    if isinstance(expected, np.ndarray):
+        if isinstance(actual, (list, tuple, pd.Series)):
+            try:
+                actual = column_array(actual)
+            except ValueError:
+                return Mismatch(path, "expected a numpy array, got a ragged list")
+        if not isinstance(actual, np.ndarray):
+            return Mismatch(path, f"expected a numpy array, got {_type_name(actual)}")
+        return _array_mismatch(actual, expected, rtol, atol, path, numpy_index=True)
+
+    # Lists and arrays have no labels, their values are compared to the Series'
+    if isinstance(expected, pd.Series) and isinstance(actual, (list, tuple, np.ndarray)):
+        try:
+            actual_arr = np.asarray(actual)
+        except ValueError:
+            actual_arr = None  # Ragged list
+        if actual_arr is None or actual_arr.ndim != 1:
+            return Mismatch(path, f"expected a Series (or a flat list of values), got {_type_name(actual)}")
+        if len(actual_arr) != len(expected):
+            return Mismatch(path, f"{len(actual_arr)} items, expected {len(expected)}")
+        actual = pd.Series(actual_arr, index=expected.index, name=expected.name)
+
+    if isinstance(expected, (pd.DataFrame, pd.Series)):
+        if type(actual) is not type(expected):
+            return Mismatch(path, f"expected a {type(expected).__name__}, got {_type_name(actual)}")
+        if isinstance(expected, pd.DataFrame):
+            message = compare_frames(actual, expected, rtol, atol)
+        else:
+            message = compare_series(actual, expected, rtol, atol)
+        return Mismatch(path, message) if message is not None else None
+
+    if _is_number(expected):
+        if not _is_number(actual):
+            return Mismatch(path, f"expected a number, got {_type_name(actual)}")
+        if isinstance(expected, (numbers.Integral, np.integer)) and isinstance(actual, (numbers.Integral, np.integer)):
+            equal = actual == expected
+        else:
+            try:
+                equal = bool(np.isclose(actual, expected, rtol=rtol, atol=atol, equal_nan=True))
+            except TypeError:
+                equal = actual == expected  # Complex numbers and other exotic types
+        return None if equal else Mismatch(path, f"got {_show(actual)}, expected {_show(expected)}")
+
+    if isinstance(expected, (bool, np.bool_)):
+        if not isinstance(actual, (bool, np.bool_)) or bool(actual) != bool(expected):
+            return Mismatch(path, f"got {_show(actual)}, expected {_show(expected)}")
+        return None
+
+    try:
+        equal = actual == expected
+        equal = bool(equal) if isinstance(equal, (bool, np.bool_)) else False
+    except Exception:
+        equal = False
+    return None if equal else Mismatch(path, f"got {_show(actual)}, expected {_show(expected)}")
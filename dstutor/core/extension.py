@@ -5,8 +5,11 @@ Main IPython extension for DS-Tutor
 from IPython.core.magic import Magics, line_magic, magics_class
 from IPython.display import display, HTML
 from .tutor_engine import TutorEngine
+from .cell_history import CellHistory, is_magic
+from .auto_validator import AutoValidator
 import sys
 import os
+import html as html_lib
 
 # Load environment variables from .env file if it exists
 try:
@@ -16,6 +19,45 @@ except ImportError:
     pass  # python-dotenv not installed, skip
 
 
+def feedback_html(result):
+    """HTML verdict of a TutorEngine.validate_exercise() result"""
+    if not result['success']:
+        return f'<div style="color: #d9534f; padding: 10px; border-left: 4px solid #d9534f;">❌ {result.get("message", "Validation error")}</div>'
+
+    message = result['feedback']
+
+    if result.get('limit_exceeded'):
+        title = {
+            'timeout': '⏱️ Time Limit Exceeded',
+            'memory': '💾 Memory Limit Exceeded',
+            'output': '📜 Output Limit Exceeded',
+        }.get(result['limit_exceeded'], '⚠️ Resource Limit Exceeded')
+        return f"""
+        <div style="padding: 20px; background: #fff3cd; border: 2px solid #ffc107; border-radius: 8px; margin: 15px 0;">
+            <h3 style="color: #856404; margin: 0 0 10px 0;">{title}</h3>
+            <p style="color: #856404; margin: 0;">{message}</p>
+        </div>
+        """
+
+    if result['is_correct']:
+        return f"""
+        <div style="padding: 20px; background: #d4edda; border: 2px solid #28a745; border-radius: 8px; margin: 15px 0;">
+            <h3 style="color: #155724; margin: 0 0 10px 0;">✅ Correct! Well Done!</h3>
+            <p style="color: #155724; margin: 0;">{message}</p>
+        </div>
+        """
+
+    return f"""
+    <div style="padding: 20px; background: #f8d7da; border: 2px solid #dc3545; border-radius: 8px; margin: 15px 0;">
+        <h3 style="color: #721c24; margin: 0 0 10px 0;">⚠️ Not Quite Right</h3>
+        <p style="color: #721c24; margin: 0;">{message}</p>
+        <p style="color: #721c24; margin: 10px 0 0 0; font-style: italic;">
+            💡 Try again or use <code>%dstutor hint</code> for help
+        </p>
+    </div>
+    """
+
+
 @magics_class
 class DSTutorMagics(Magics):
     """Magic commands for DS-Tutor"""
@@ -25,6 +67,53 @@ class DSTutorMagics(Magics):
         self.tutor_engine = None
         self.current_session = None
         self._initialized = False
+        self.auto_validator = None
+
+        # Last executed cells, recorded as they run
+        self.cell_history = CellHistory()
+        if shell is not None:
+            shell.events.register('post_run_cell', self.cell_history.post_run_cell)
+            shell.events.register('post_run_cell', self._redraw_lesson)
+
+    def close(self):
+        """Stop recording executed cells and release the tutor's workers"""
+        self._set_auto_validate(False)
+        self._close_engine()
+        for callback in (self.cell_history.post_run_cell, self._redraw_lesson):
+            try:
+                self.shell.events.unregister('post_run_cell', callback)
+            except (AttributeError, ValueError):
+                pass
+
+    def _redraw_lesson(self, result=None):
+        """Redraw a hot-reloaded lesson on the kernel thread after each cell"""
+        if self.tutor_engine is not None:
+            self.tutor_engine.redraw_changed_lesson(result)
+
+    def _close_engine(self):
+        """Shut down the current tutor engine, if any"""
+        if self.tutor_engine is not None:
+            self.tutor_engine.close()
+            self.tutor_engine = None
+            self._initialized = False
+
+    def _set_auto_validate(self, enabled):
+        """Register or remove the auto-validation post_run_cell handler"""
+        if self.auto_validator is not None:
+            self.auto_validator.cancel()
+            try:
+                self.shell.events.unregister('post_run_cell', self.auto_validator.post_run_cell)
+            except ValueError:
+                pass
+            self.auto_validator = None
+
+        if enabled and self.tutor_engine is not None:
+            self.auto_validator = AutoValidator(
+                self.tutor_engine,
+                feedback_html,
+                delay=self.tutor_engine.config.get('auto_validate_delay', 0.5)
+            )
+            self.shell.events.register('post_run_cell', self.auto_validator.post_run_cell)
 
     @line_magic
     def dstutor(self, line):
@@ -34,7 +123,7 @@ class DSTutorMagics(Magics):
         Usage:
             %dstutor init                 - Initialize the tutor
             %dstutor start <topic>        - Start learning a topic
-            %dstutor check                - Check your solution
+            %dstutor check [live|rerun]   - Check your solution
             %dstutor next                 - Go to next lesson
             %dstutor previous             - Go to previous lesson
             %dstutor hint [level]         - Get a hint
@@ -43,7 +132,10 @@ class DSTutorMagics(Magics):
             %dstutor topics               - List available topics
             %dstutor reset                - Reset current lesson
             %dstutor goto <lesson_id>     - Jump to specific lesson
+            %dstutor search <terms>       - Find lessons covering the terms
             %dstutor config               - Show configuration
+            %dstutor watch [on|off]       - Hot-reload edited lesson files
+            %dstutor auto [on|off]        - Check cells automatically as they run
         """
         args = line.strip().split()
 
@@ -102,12 +194,30 @@ class DSTutorMagics(Magics):
                 return
             self._cmd_goto(args[1])
 
+        elif command == "search":
+            if len(args) < 2:
+                display(HTML('<div style="color: #d9534f;">❌ Please specify search terms: %dstutor search &lt;terms&gt;</div>'))
+                return
+            self._cmd_search(' '.join(args[1:]))
+
         elif command == "check" or command == "validate":
-            self._cmd_check()
+            mode = args[1].lower() if len(args) > 1 else None
+            if mode not in (None, "live", "rerun"):
+                display(HTML(f'<div style="color: #d9534f;">❌ Unknown check mode: {html_lib.escape(mode)} (use live or rerun)</div>'))
+                return
+            self._cmd_check(mode)
 
         elif command == "config":
             self._cmd_config()
 
+        elif command == "watch":
+            enabled = args[1].lower() not in ("off", "stop", "false") if len(args) > 1 else True
+            self._cmd_watch(enabled)
+
+        elif command == "auto":
+            enabled = args[1].lower() not in ("off", "stop", "false") if len(args) > 1 else True
+            self._cmd_auto(enabled)
+
         elif command == "help":
             self._show_help()
 
@@ -118,8 +228,11 @@ class DSTutorMagics(Magics):
     def _cmd_init(self):
         """Initialize DS-Tutor"""
         try:
+            self._set_auto_validate(False)
+            self._close_engine()
             self.tutor_engine = TutorEngine()
             self._initialized = True
+            self._set_auto_validate(self.tutor_engine.config.get('auto_validate'))
 
             # Show welcome message (pure HTML, no widgets)
             welcome_html = """
@@ -167,6 +280,7 @@ class DSTutorMagics(Magics):
         try:
             result = self.tutor_engine.start_topic(topic)
             if result['success']:
+                self._show_prerequisite_notice(result)
                 # Inject lesson content into notebook
                 self.tutor_engine.display_current_lesson()
             else:
@@ -330,62 +444,94 @@ class DSTutorMagics(Magics):
         try:
             result = self.tutor_engine.goto_lesson(lesson_id)
             if result['success']:
+                self._show_prerequisite_notice(result)
                 self.tutor_engine.display_current_lesson()
             else:
                 display(HTML(f'<div style="color: #d9534f;">❌ {result["message"]}</div>'))
         except Exception as e:
             display(HTML(f'<div style="color: #d9534f;">❌ Error: {str(e)}</div>'))
 
-    def _cmd_check(self):
-        """Check/validate the user's solution"""
+    def _cmd_search(self, query):
+        """Search lessons"""
         try:
-            # Get the last executed code from IPython history
-            hist = list(self.shell.history_manager.get_range(output=False))
-            if not hist:
-                display(HTML('<div style="color: #f0ad4e; padding: 10px; border-left: 4px solid #f0ad4e;">⚠️ No code history found. Write and run your solution first.</div>'))
+            result = self.tutor_engine.search_lessons(query)
+            if not result['success']:
+                display(HTML(f'<div style="color: #d9534f;">❌ {result["message"]}</div>'))
                 return
 
-            # Get the most recent non-magic command
-            last_code = None
-            for session, line_num, code in reversed(hist):
-                if not code.strip().startswith('%'):
-                    last_code = code
-                    break
+            query_html = html_lib.escape(query)
+            if not result['results']:
+                display(HTML(f'<div style="color: #f0ad4e;">🔍 No lessons found for <em>{query_html}</em></div>'))
+                return
 
-            if not last_code:
+            html = '<div style="padding: 15px; background: #f8f9fa; border-radius: 5px;">'
+            html += f'<h3 style="margin-top: 0;">🔍 Lessons about <em>{query_html}</em></h3>'
+            html += '<ul style="list-style: none; padding-left: 0;">'
+            for lesson in result['results']:
+                html += '<li style="margin: 8px 0;">'
+                html += f'<strong>{html_lib.escape(str(lesson["subtopic"]))}</strong>'
+                html += f' <span style="color: #6c757d;">({lesson["topic"]})</span>'
+                html += f' <code style="background: rgba(255,255,255,0.95); color: #2c3e50; padding: 2px 6px; border-radius: 3px; font-family: monospace; margin-left: 8px;">%dstutor goto {lesson["id"]}</code>'
+                html += '</li>'
+            html += '</ul></div>'
+            display(HTML(html))
+        except Exception as e:
+            display(HTML(f'<div style="color: #d9534f;">❌ Error: {str(e)}</div>'))
+
+    def _show_prerequisite_notice(self, result):
+        """Warn when a lesson is opened before its prerequisites are completed"""
+        missing = result.get('missing_prerequisites')
+        if not missing:
+            return
+        shown = ', '.join(f'<code>{lesson_id}</code>' for lesson_id in missing[:5])
+        more = f' and {len(missing) - 5} more' if len(missing) > 5 else ''
+        display(HTML(
+            '<div style="color: #856404; padding: 10px; border-left: 4px solid #ffc107; background: #fff3cd;">'
+            f'🔒 This lesson builds on lessons you haven\'t completed yet: {shown}{more}'
+            '</div>'
+        ))
+
+    def _cmd_check(self, mode=None):
+        """
+        Check/validate the user's solution
+
+        Args:
+            mode: 'rerun' runs the last cell again in a fresh namespace, 'live'
+                checks the variables already in the kernel (default from the
+                'check_mode' setting)
+        """
+        try:
+            mode = mode or self.tutor_engine.config.get('check_mode', 'rerun')
+
+            # Get the most recent non-magic cell
+            last_code = self._last_cell_code()
+            if last_code is None and mode != 'live':
                 display(HTML('<div style="color: #f0ad4e; padding: 10px; border-left: 4px solid #f0ad4e;">⚠️ No code to check. Write and run your solution first.</div>'))
                 return
 
-            # Validate the code
-            result = self.tutor_engine.validate_exercise(last_code)
-            if result['success']:
-                is_correct = result['is_correct']
-                message = result['feedback']
-
-                if is_correct:
-                    feedback_html = f"""
-                    <div style="padding: 20px; background: #d4edda; border: 2px solid #28a745; border-radius: 8px; margin: 15px 0;">
-                        <h3 style="color: #155724; margin: 0 0 10px 0;">✅ Correct! Well Done!</h3>
-                        <p style="color: #155724; margin: 0;">{message}</p>
-                    </div>
-                    """
-                else:
-                    feedback_html = f"""
-                    <div style="padding: 20px; background: #f8d7da; border: 2px solid #dc3545; border-radius: 8px; margin: 15px 0;">
-                        <h3 style="color: #721c24; margin: 0 0 10px 0;">⚠️ Not Quite Right</h3>
-                        <p style="color: #721c24; margin: 0;">{message}</p>
-                        <p style="color: #721c24; margin: 10px 0 0 0; font-style: italic;">
-                            💡 Try again or use <code>%dstutor hint</code> for help
-                        </p>
-                    </div>
-                    """
-                display(HTML(feedback_html))
+            if mode == 'live':
+                # Validate the variables in place, without running anything again
+                result = self.tutor_engine.validate_namespace(self.shell.user_ns, last_code or '')
             else:
-                display(HTML(f'<div style="color: #d9534f; padding: 10px; border-left: 4px solid #d9534f;">❌ {result.get("message", "Validation error")}</div>'))
+                # Validate the code
+                result = self.tutor_engine.validate_exercise(last_code)
+            display(HTML(feedback_html(result)))
 
         except Exception as e:
             display(HTML(f'<div style="color: #d9534f; padding: 10px; border-left: 4px solid #d9534f;">❌ Error checking solution: {str(e)}</div>'))
 
+    def _last_cell_code(self):
+        """Code of the most recent non-magic cell, or None"""
+        record = self.cell_history.last()
+        if record is not None:
+            return record.code
+
+        # Cells run before the extension was loaded: the end of this session's inputs
+        for code in reversed(self.shell.history_manager.input_hist_raw[-self.cell_history.max_cells:]):
+            if code and code.strip() and not is_magic(code):
+                return code
+        return None
+
     def _cmd_config(self):
         """Show configuration"""
         try:
@@ -404,6 +550,31 @@ class DSTutorMagics(Magics):
         except Exception as e:
             display(HTML(f'<div style="color: #d9534f;">❌ Error: {str(e)}</div>'))
 
+    def _cmd_watch(self, enabled):
+        """Toggle hot-reloading of lesson files"""
+        try:
+            result = self.tutor_engine.watch_lessons(enabled)
+            if result['success']:
+                display(HTML(f'<div style="color: #5cb85c;">👀 {result["message"]}</div>'))
+            else:
+                display(HTML(f'<div style="color: #d9534f;">❌ {result["message"]}</div>'))
+        except Exception as e:
+            display(HTML(f'<div style="color: #d9534f;">❌ Error: {str(e)}</div>'))
+
+    def _cmd_auto(self, enabled):
+        """Toggle auto-validation of executed cells"""
+        try:
+            self.tutor_engine.update_config('auto_validate', enabled)
+            self._set_auto_validate(enabled)
+            if not enabled:
+                display(HTML('<div style="color: #5cb85c;">⏸️ Auto-validation off</div>'))
+            elif self.tutor_engine.sandbox is None:
+                display(HTML('<div style="color: #f0ad4e;">⚠️ Auto-validation needs the code sandbox, which is disabled. Use <code>%dstutor check</code>.</div>'))
+            else:
+                display(HTML('<div style="color: #5cb85c;">▶️ Auto-validation on: cells that set your answer are checked as they run</div>'))
+        except Exception as e:
+            display(HTML(f'<div style="color: #d9534f;">❌ Error: {str(e)}</div>'))
+
     def _show_help(self):
         """Show help message"""
         help_html = """
@@ -412,7 +583,7 @@ class DSTutorMagics(Magics):
             <table style="width: 100%;">
                 <tr><td><code>%dstutor init</code></td><td>Initialize the tutor</td></tr>
                 <tr><td><code>%dstutor start &lt;topic&gt;</code></td><td>Start learning a topic</td></tr>
-                <tr><td><code>%dstutor check</code></td><td>Check your solution</td></tr>
+                <tr><td><code>%dstutor check [live|rerun]</code></td><td>Check your solution (live: check the variables you already computed)</td></tr>
                 <tr><td><code>%dstutor next</code></td><td>Go to next lesson</td></tr>
                 <tr><td><code>%dstutor previous</code></td><td>Go to previous lesson</td></tr>
                 <tr><td><code>%dstutor hint [level]</code></td><td>Get a hint (levels 1-3)</td></tr>
@@ -421,7 +592,10 @@ class DSTutorMagics(Magics):
                 <tr><td><code>%dstutor topics</code></td><td>List available topics</td></tr>
                 <tr><td><code>%dstutor reset</code></td><td>Reset current lesson</td></tr>
                 <tr><td><code>%dstutor goto &lt;id&gt;</code></td><td>Jump to specific lesson</td></tr>
+                <tr><td><code>%dstutor search &lt;terms&gt;</code></td><td>Find lessons covering the terms</td></tr>
                 <tr><td><code>%dstutor config</code></td><td>Show configuration</td></tr>
+                <tr><td><code>%dstutor watch [on|off]</code></td><td>Hot-reload edited lesson files (authors)</td></tr>
+                <tr><td><code>%dstutor auto [on|off]</code></td><td>Check cells automatically as they run</td></tr>
                 <tr><td><code>%dstutor help</code></td><td>Show this help message</td></tr>
             </table>
         </div>
@@ -455,4 +629,6 @@ def load_ipython_extension(ipython):
 
 def unload_ipython_extension(ipython):
     """Unload the IPython extension"""
-    pass
+    magics = ipython.magics_manager.registry.get('DSTutorMagics')
+    if magics is not None:
+        magics.close()
@@ -0,0 +1,270 @@
+"""
+Fingerprints of large arrays and DataFrames
+
+Instead of listing every expected value, a lesson can store a fingerprint
+of its expected result: a hash of the values rounded to a number of
+decimals, plus optional per-column sketches (count, NaN count, sum, min,
+max and a position-weighted sum). They are computed in a streaming pass
+over chunks of rows, so checking a result never copies it whole.
+
+The hash decides equality up to rounding. A value sitting on a rounding
+boundary can hash differently after harmless float noise, so only when the
+hashes differ are the sketches computed and compared with tolerances; the
+weighted sum makes them sensitive to row order, not just to the values.
+
+Generate the check for a lesson with:
+
+    dstutor fingerprint <lesson_id>
+"""
+
+import hashlib
+import math
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .compare import column_array
+
+
+FINGERPRINT_DECIMALS = 6
+
+# Rows hashed and summarized at a time
+CHUNK_ROWS = 1 << 16
+
+# Weights of the position-weighted sum: fractional parts of i * (golden ratio)
+_WEIGHT_STEP = 0.6180339887498949
+
+_SKETCH_STATS = ('count', 'nan_count', 'hash', 'sum', 'min', 'max', 'weighted_sum')
+
+# Compared exactly, the others within tolerances
+_EXACT_STATS = ('count', 'nan_count', 'hash')
+
+
+def _blocks(value: Any) -> Tuple[tuple, List[Tuple[List[str], Any]]]:
+    """
+    Split a value into blocks of columns that are hashed together
+
+    Arrays form a single (rows, columns) block; DataFrame columns can have
+    different dtypes, so each is a block of its own.
+
+    Returns:
+        (shape, [(column names, 2-D array or column)])
+    """
+    if isinstance(value, pd.DataFrame):
+        return value.shape, [([str(name)], column_array(value.iloc[:, j]))
+                             for j, name in enumerate(value.columns)]
+    if isinstance(value, pd.Series):
+        return value.shape, [([str(value.name)], column_array(value))]
+
+    arr = np.asarray(value)
+    if arr.ndim == 0:
+        arr = arr.reshape(1)
+    matrix = arr.reshape(arr.shape[0], -1) if arr.ndim > 1 else arr
+    if matrix.ndim == 1:
+        return arr.shape, [(['0'], matrix)]
+    return arr.shape, [([str(j) for j in range(matrix.shape[1])], matrix)]
+
+
+def _chunks(block: np.ndarray) -> Iterator[Tuple[int, np.ndarray]]:
+    """(start row, rows) chunks of a block"""
+    for start in range(0, len(block), CHUNK_ROWS):
+        yield start, block[start:start + CHUNK_ROWS]
+
+
+def _numeric_block(block: np.ndarray) -> Optional[np.ndarray]:
+    """Block as a numeric array (datetimes as int64, numeric objects as float), else None"""
+    kind = block.dtype.kind
+    if kind in 'biuf':
+        return block
+    if kind in 'mM':
+        return block.view('i8')
+    if kind == 'O':
+        try:
+            return block.astype(float)
+        except (TypeError, ValueError):
+            return None
+    return None
+
+
+class _BlockSummary:
+    """Streaming per-column sketches of a numeric block"""
+
+    def __init__(self, width: int):
+        self.count = np.zeros(width, dtype=np.int64)
+        self.nan_count = np.zeros(width, dtype=np.int64)
+        self.sum = np.zeros(width)
+        self.weighted_sum = np.zeros(width)
+        self.min = np.full(width, np.inf)
+        self.max = np.full(width, -np.inf)
+
+    def update(self, start: int, values: np.ndarray, missing: np.ndarray):
+        if values.ndim == 1:
+            values, missing = values[:, None], missing[:, None]
+        any_missing = missing.any()
+        missing_count = missing.sum(axis=0) if any_missing else 0
+        self.nan_count += missing_count
+        self.count += len(values) - missing_count
+
+        filled = np.where(missing, 0.0, values) if any_missing else values
+        weights = (np.arange(start, start + len(values)) * _WEIGHT_STEP) % 1.0 - 0.5
+        self.sum += np.ones(len(values)) @ filled
+        self.weighted_sum += weights @ filled
+        if any_missing:
+            self.min = np.minimum(self.min, np.where(missing, np.inf, values).min(axis=0))
+            self.max = np.maximum(self.max, np.where(missing, -np.inf, values).max(axis=0))
+        elif len(values):
+            self.min = np.minimum(self.min, values.min(axis=0))
+            self.max = np.maximum(self.max, values.max(axis=0))
+
+    def to_dicts(self) -> List[Dict[str, Any]]:
+        sketches = []
+        for j in range(len(self.count)):
+            has_values = bool(self.count[j])
+            sketches.append({
+                'count': int(self.count[j]),
+                'nan_count': int(self.nan_count[j]),
+                'sum': float(self.sum[j]),
+                'min': float(self.min[j]) if has_values else None,
+                'max': float(self.max[j]) if has_values else None,
+                'weighted_sum': float(self.weighted_sum[j]),
+            })
+        return sketches
+
+
+def _hash_text_column(column: np.ndarray) -> Tuple[str, Dict[str, Any]]:
+    """Exact hash and sketch of a column of strings or other objects"""
+    digest = hashlib.sha1()
+    missing_total = 0
+    for start, chunk in _chunks(column):
+        missing = np.asarray(pd.isna(chunk), dtype=bool)
+        missing_total += int(missing.sum())
+        digest.update('\x1f'.join('\x00' if m else str(v) for v, m in zip(chunk, missing)).encode('utf-8'))
+        digest.update(b'\x1e')
+    column_digest = digest.hexdigest()
+    return column_digest, {'count': len(column) - missing_total, 'nan_count': missing_total, 'hash': column_digest}
+
+
+def summarize(value: Any,
+              decimals: int = FINGERPRINT_DECIMALS,
+              sketches: bool = True) -> Tuple[str, List[Dict[str, Any]]]:
+    """
+    Compute the fingerprint of a value in one pass
+
+    Args:
+        value: DataFrame, Series or array-like
+        decimals: Numbers are rounded to this many decimals before hashing
+        sketches: Also compute per-column sketches
+
+    Returns:
+        (hex digest, per-column sketches or [])
+    """
+    shape, blocks = _blocks(value)
+    scale = 10.0 ** decimals
+    digest = hashlib.sha1()
+    digest.update(repr(shape).encode('utf-8'))
+    summaries = []
+
+    for names, block in blocks:
+        digest.update(('\x00'.join(names) + '\x00').encode('utf-8'))
+        numeric = _numeric_block(block)
+
+        if numeric is None:
+            # Strings and other objects hash exactly, column by column
+            for j in range(1 if block.ndim == 1 else block.shape[1]):
+                column_digest, sketch = _hash_text_column(block if block.ndim == 1 else block[:, j])
+                digest.update(column_digest.encode('ascii'))
+                summaries.append(sketch)
+            continue
+
+        summary = _BlockSummary(1 if block.ndim == 1 else block.shape[1])
+        for start, chunk in _chunks(numeric):
+            if block.dtype.kind in 'mM':
+                # Timestamps hash exactly, NaT is the minimum int64
+                missing = chunk == np.iinfo(np.int64).min
+                values = np.where(missing, np.nan, chunk.astype(np.float64))
+                quantized = np.ascontiguousarray(chunk)
+            else:
+                # Round, normalize -0.0 and NaN so equal results hash equally
+                values = chunk.astype(np.float64, copy=False)
+                missing = np.isnan(values)
+                quantized = values * scale
+                np.rint(quantized, out=quantized)
+                quantized += 0.0
+                if missing.any():
+                    quantized[missing] = np.nan
+            digest.update(quantized.tobytes())
+            if sketches:
+                summary.update(start, values, missing)
+
+        if sketches:
+            summaries.extend(summary.to_dicts())
+
+    return digest.hexdigest(), summaries if sketches else []
+
+
+def fingerprint(value: Any, decimals: int = FINGERPRINT_DECIMALS) -> str:
+    """Hex digest of a value rounded to decimals (see summarize())"""
+    return summarize(value, decimals, sketches=False)[0]
+
+
+def compare_sketches(actual: List[Dict[str, Any]],
+                     expected: List[Dict[str, Any]],
+                     rtol: float = 1e-6,
+                     atol: float = 1e-9,
+                     names: Optional[List[str]] = None) -> Optional[str]:
+    """
+    Compare column sketches with tolerances
+
+    The absolute tolerance of sums grows with the square root of the number
+    of summed values, like their accumulated rounding noise.
+
+    Args:
+        actual: Sketches of the user's result
+        expected: Sketches stored in the lesson
+        rtol: Relative tolerance
+        atol: Absolute tolerance
+        names: Column names for messages
+
+    Returns:
+        None if they match, else the feedback message
+    """
+    if len(actual) != len(expected):
+        return f"Column count mismatch: got {len(actual)}, expected {len(expected)}"
+
+    for j, (got, want) in enumerate(zip(actual, expected)):
+        column = names[j] if names else j
+        for stat in _SKETCH_STATS:
+            if stat not in want:
+                continue
+            a, e = got.get(stat), want[stat]
+            if a is None or e is None or stat in _EXACT_STATS:
+                if a != e:
+                    detail = '' if stat == 'hash' else f" ({stat}: got {a}, expected {e})"
+                    return f"Column '{column}' doesn't match the expected result{detail}"
+                continue
+            tol = atol * math.sqrt(max(1, want.get('count') or 1)) if stat in ('sum', 'weighted_sum') else atol
+            if not math.isclose(a, e, rel_tol=rtol, abs_tol=tol):
+                return f"Column '{column}' doesn't match the expected result ({stat}: got {a:.6g}, expected {e:.6g})"
+    return None
+
+
+def fingerprint_check(value: Any, decimals: int = FINGERPRINT_DECIMALS, with_sketch: bool = True) -> Dict:
+    """
+    Build the YAML check for an expected result
+
+    Args:
+        value: Expected DataFrame or array
+        decimals: Rounding before hashing
+        with_sketch: Include per-column sketches (tolerant fallback)
+
+    Returns:
+        Check dictionary for array_check/dataframe_check 'checks'
+    """
+    digest, sketches = summarize(value, decimals, sketches=with_sketch)
+    check = {'type': 'fingerprint', 'expected': digest, 'decimals': decimals, 'shape': list(np.shape(value))}
+    if isinstance(value, pd.DataFrame):
+        check['columns'] = [str(name) for name in value.columns]
+    if with_sketch:
+        check['sketch'] = sketches
+    return check
@@ -0,0 +1,324 @@
+"""
+Validation of matplotlib figures
+
+Plots are checked by walking the figure's artist tree: axes, lines,
+collections, containers, texts and data limits. Nothing is drawn, so a
+check needs no renderer, no rasterization and no image comparison, and
+works the same under the Agg backend of the sandbox workers and in the
+kernel.
+
+Lessons use them with:
+
+    validation:
+      type: "plot_check"
+      checks:
+        - type: "subplot_count"
+          expected: 4
+        - type: "has_histogram"
+          expected: true
+        - type: "xlabel"
+          expected: "Score"
+          axes: 0          # optional: only this subplot
+
+Counting checks (has_*) accept true/false or a minimum count. Text checks
+accept true (any non-empty text) or the expected text (case-insensitive).
+"""
+
+import sys
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+
+
+TEXT_CHECKS = ('xlabel', 'ylabel', 'title')
+
+
+def is_figure(value: Any) -> bool:
+    """Whether a value is a matplotlib Figure (without importing matplotlib)"""
+    return any(cls.__name__ == 'Figure' and cls.__module__.startswith('matplotlib')
+               for cls in type(value).__mro__)
+
+
+def find_figure(namespace: Dict) -> Optional[Any]:
+    """
+    The figure a submission drew
+
+    Args:
+        namespace: Namespace the user's code ran in
+
+    Returns:
+        The 'result' variable if it is a Figure, else pyplot's current
+        figure, or None if there is no figure
+    """
+    result = namespace.get('result')
+    if is_figure(result):
+        return result
+
+    pyplot = sys.modules.get('matplotlib.pyplot')
+    if pyplot is None or not pyplot.get_fignums():
+        return None  # gcf() would create an empty figure
+    return pyplot.gcf()
+
+
+@contextmanager
+def figure_scope():
+    """
+    Give the code under check a fresh current figure, and close the figures
+    it created afterwards
+
+    Figures live in pyplot's global state, so without this a submission
+    would draw onto the figure of an earlier check.
+    """
+    import matplotlib.pyplot as plt
+
+    before = set(plt.get_fignums())
+    plt.figure()
+    try:
+        yield
+    finally:
+        for num in set(plt.get_fignums()) - before:
+            plt.close(num)
+
+
+def plot_axes(figure) -> List[Any]:
+    """Axes of a figure, without colorbars"""
+    return [ax for ax in figure.axes
+            if ax.get_label() != '<colorbar>' and not hasattr(ax, '_colorbar')]
+
+
+def _xy(line) -> tuple:
+    """Data of a Line2D as float arrays, or (None, None)"""
+    try:
+        x = np.asarray(line.get_xdata(), dtype=float)
+        y = np.asarray(line.get_ydata(), dtype=float)
+    except (TypeError, ValueError):
+        return None, None  # Categorical or date data
+    return x, y
+
+
+def _bar_containers(ax) -> List[Any]:
+    return [container for container in ax.containers
+            if type(container).__name__ == 'BarContainer' and len(container.patches)]
+
+
+def _is_contiguous(container) -> bool:
+    """Whether the bars of a container touch each other (a histogram)"""
+    patches = container.patches
+    if len(patches) < 2:
+        return False
+    horizontal = getattr(container, 'orientation', 'vertical') == 'horizontal'
+    if horizontal:
+        starts = np.array([p.get_y() for p in patches])
+        sizes = np.array([p.get_height() for p in patches])
+    else:
+        starts = np.array([p.get_x() for p in patches])
+        sizes = np.array([p.get_width() for p in patches])
+    order = np.argsort(starts)
+    starts, sizes = starts[order], sizes[order]
+    scale = max(abs(starts[-1] + sizes[-1] - starts[0]), 1e-12)
+    return bool(np.allclose(starts[:-1] + sizes[:-1], starts[1:], rtol=0, atol=1e-9 * scale))
+
+
+def _is_straight(x: np.ndarray, y: np.ndarray) -> bool:
+    """Whether points lie on one straight, non-vertical line"""
+    finite = np.isfinite(x) & np.isfinite(y)
+    x, y = x[finite], y[finite]
+    if len(x) < 2 or x[-1] == x[0]:
+        return False
+    fitted = y[0] + (x - x[0]) * (y[-1] - y[0]) / (x[-1] - x[0])
+    scale = max(np.ptp(y), abs(y).max(), 1e-12)
+    return bool(np.allclose(y, fitted, rtol=0, atol=1e-6 * scale))
+
+
+def count_lines(ax) -> int:
+    """Lines drawn with a visible line style (markers-only lines excluded)"""
+    return sum(1 for line in ax.lines
+               if line.get_linestyle() not in ('None', ' ', '') and len(line.get_xdata()) >= 2)
+
+
+def count_scatters(ax) -> int:
+    return sum(1 for collection in ax.collections
+               if type(collection).__name__ == 'PathCollection' and len(collection.get_offsets()))
+
+
+def count_bars(ax) -> int:
+    return len(_bar_containers(ax))
+
+
+def count_histograms(ax) -> int:
+    return sum(1 for container in _bar_containers(ax) if _is_contiguous(container))
+
+
+def count_heatmaps(ax) -> int:
+    """Color-mapped grids: pcolormesh/seaborn heatmaps (QuadMesh) and images"""
+    return len(ax.images) + sum(1 for collection in ax.collections
+                                if type(collection).__name__ == 'QuadMesh')
+
+
+def count_boxes(ax) -> int:
+    """
+    Boxes of box plots: a box (PathPatch, or a closed 5-point line without
+    patch_artist) comes with whiskers, caps and a median (2-point lines)
+    """
+    boxes = sum(1 for patch in ax.patches if type(patch).__name__ == 'PathPatch')
+    segments = 0
+    for line in ax.lines:
+        x, y = _xy(line)
+        if x is None:
+            continue
+        if len(x) == 2:
+            segments += 1
+        elif len(x) == 5 and x[0] == x[-1] and y[0] == y[-1]:
+            boxes += 1
+    return boxes if boxes and segments >= 3 * boxes else 0
+
+
+def count_regressions(ax) -> int:
+    """Straight lines drawn over a scatter plot"""
+    if not count_scatters(ax):
+        return 0
+    count = 0
+    for line in ax.lines:
+        x, y = _xy(line)
+        if x is not None and _is_straight(x, y):
+            count += 1
+    return count
+
+
+def count_legends(ax) -> int:
+    return int(ax.get_legend() is not None)
+
+
+# check type -> (counter(axes) -> int, description used in feedback)
+ARTIST_COUNTERS = {
+    'has_lines': (count_lines, "line"),
+    'has_scatter': (count_scatters, "scatter plot"),
+    'has_bars': (count_bars, "bar chart"),
+    'has_histogram': (count_histograms, "histogram"),
+    'has_heatmap': (count_heatmaps, "heatmap"),
+    'has_boxplot': (count_boxes, "box plot"),
+    'has_regression': (count_regressions, "regression line"),
+    'has_legend': (count_legends, "legend"),
+}
+
+
+def count_artists(ax, type_name: str) -> int:
+    """Artists of a type (class name, including base classes) plotted on the axes"""
+    artists = list(ax.lines) + list(ax.collections) + list(ax.patches) + list(ax.images) + \
+        list(ax.texts) + list(ax.artists) + list(ax.containers)
+    return sum(1 for artist in artists
+               if any(cls.__name__ == type_name for cls in type(artist).__mro__))
+
+
+def axes_text(ax, kind: str) -> List[str]:
+    """Texts of an axes: 'xlabel', 'ylabel' or 'title' (any of the three title slots)"""
+    if kind == 'xlabel':
+        return [ax.get_xlabel()]
+    if kind == 'ylabel':
+        return [ax.get_ylabel()]
+    return [ax.get_title(loc) for loc in ('center', 'left', 'right')]
+
+
+def _describe(count: int, description: str) -> str:
+    return f"{count} {description}{'s' if count != 1 else ''}"
+
+
+# ----------------------------------------------------------------------
+# Checker factories (used by rules.py)
+# ----------------------------------------------------------------------
+
+def _select_axes(figure, index: Optional[int]):
+    """(axes to check, error message)"""
+    axes = plot_axes(figure)
+    if index is None:
+        return axes, None
+    if not -len(axes) <= index < len(axes):
+        return None, f"Subplot {index} not found: your figure has {_describe(len(axes), 'subplot')}"
+    return [axes[index]], None
+
+
+def subplot_count_check(expected_count: int) -> Callable:
+    def check(figure, expected):
+        count = len(plot_axes(figure))
+        if count != expected_count:
+            return f"Expected {_describe(expected_count, 'subplot')}, found {count}"
+    return check
+
+
+def artist_check(counter: Callable, description: str, expected_value: Any, index: Optional[int]) -> Callable:
+    """
+    Check the number of plotted elements
+
+    expected_value is True (at least one), False (none) or a minimum count.
+    """
+    def check(figure, expected):
+        axes, error = _select_axes(figure, index)
+        if error:
+            return error
+        count = sum(counter(ax) for ax in axes)
+        where = f" in subplot {index}" if index is not None else " in your plot"
+        if expected_value is True and not count:
+            return f"No {description} found{where}"
+        if expected_value is False and count:
+            return f"Your plot shouldn't contain a {description} (found {count})"
+        if not isinstance(expected_value, bool) and count < expected_value:
+            return f"Expected at least {_describe(expected_value, description)}{where}, found {count}"
+    return check
+
+
+def text_check(kind: str, expected_text: Any, index: Optional[int]) -> Callable:
+    """Check an axis label or title: True for any text, else the text itself"""
+    name = {'xlabel': "x-axis label", 'ylabel': "y-axis label", 'title': "title"}[kind]
+    wanted = None if expected_text is True else str(expected_text).strip().lower()
+
+    def check(figure, expected):
+        axes, error = _select_axes(figure, index)
+        if error:
+            return error
+        texts = [text.strip() for ax in axes for text in axes_text(ax, kind) if text.strip()]
+        suptitle = getattr(figure, '_suptitle', None)
+        if kind == 'title' and index is None and suptitle is not None and suptitle.get_text().strip():
+            texts.append(suptitle.get_text().strip())
+
+        if wanted is None:
+            if not texts:
+                return f"Your plot has no {name}"
+        elif not any(text.lower() == wanted for text in texts):
+            found = f" (found {', '.join(repr(text) for text in texts)})" if texts else ""
+            return f"The {name} should be '{expected_text}'{found}"
+    return check
+
+
+def artist_type_check(type_name: str, minimum: int, index: Optional[int]) -> Callable:
+    def check(figure, expected):
+        axes, error = _select_axes(figure, index)
+        if error:
+            return error
+        count = sum(count_artists(ax, type_name) for ax in axes)
+        if count < minimum:
+            return f"Expected at least {minimum} {type_name} artist{'s' if minimum != 1 else ''}, found {count}"
+    return check
+
+
+def data_limits_check(limits: Dict[str, tuple], rtol: float, index: Optional[int]) -> Callable:
+    """
+    Check the extent of the plotted data (the axes' data limits, not the view)
+
+    limits maps 'x' and/or 'y' to the expected (min, max).
+    """
+    def check(figure, expected):
+        axes, error = _select_axes(figure, index)
+        if error:
+            return error
+        if not axes:
+            return "Your plot has no axes"
+        for axis, (low, high) in limits.items():
+            intervals = [ax.dataLim.intervalx if axis == 'x' else ax.dataLim.intervaly for ax in axes]
+            got_low = min(interval[0] for interval in intervals)
+            got_high = max(interval[1] for interval in intervals)
+            atol = rtol * max(abs(high - low), 1e-12)
+            if not (np.isclose(got_low, low, rtol=rtol, atol=atol) and np.isclose(got_high, high, rtol=rtol, atol=atol)):
+                return f"The plotted {axis} values should range from {low:g} to {high:g}, " \
+                       f"found {got_low:.6g} to {got_high:.6g}"
+    return check
@@ -0,0 +1,704 @@
+"""
+Compiled validation rules
+
+An exercise's ``validation`` block is compiled once into a ValidationPlan:
+a tuple of checker callables with their expected values already converted
+(shapes to tuples, expected arrays to ndarrays, type names to types). A
+check is then a loop over the plan, without re-reading the rule dict.
+
+Plans are cached by the content of the rule block, so every kernel and
+sandbox worker compiles an exercise once, and an edited lesson gets a new
+plan. The lesson catalog compiles every exercise when it is built, so
+malformed blocks are reported to lesson authors instead of learners.
+"""
+
+import marshal
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .compare import compare_frames, find_mismatch
+from .fingerprint import FINGERPRINT_DECIMALS, compare_sketches, fingerprint, summarize
+from .sandbox import ResourceLimits
+from .plot_check import (
+    ARTIST_COUNTERS, TEXT_CHECKS, artist_check, artist_type_check, data_limits_check,
+    subplot_count_check, text_check
+)
+from .static_check import CONSTRUCTS
+
+
+CORRECT = "Correct! ✅"
+
+# Compiled plans kept in memory (one per exercise)
+MAX_CACHED_PLANS = 256
+
+# Names accepted by 'type_check'
+RESULT_TYPES = {
+    'DataFrame': pd.DataFrame,
+    'Series': pd.Series,
+    'ndarray': np.ndarray,
+    'list': list,
+    'dict': dict,
+    'int': int,
+    'float': float,
+    'str': str,
+}
+
+# Types enforced on variable checks; other type names are descriptive only
+VARIABLE_TYPES = {'int': int, 'float': float, 'str': str, 'bool': bool}
+
+
+class RuleError(ValueError):
+    """An exercise's validation block is malformed"""
+
+
+class ValidationPlan(NamedTuple):
+    """
+    Compiled validation block of one exercise
+
+    target selects what the checks receive:
+        'result'     checker(result, expected) for the 'result' variable
+        'variables'  checker(namespace), every check reports its error
+        'solution'   compared against the reference solution (no checkers)
+        'plot'       checker(figure, expected) for the figure the code drew
+
+    Checkers return None when the check passes, else the feedback message.
+    forbidden and required hold (construct, message) pairs for the static
+    pre-check (see static_check.py).
+    """
+    target: str
+    checks: Tuple[Callable, ...] = ()
+    success: str = CORRECT
+    variables: Tuple[str, ...] = ('result',)  # variables the checks read
+    tolerance: float = 0.001                   # solution_check
+    ignored: Tuple[str, ...] = ()  # check types this validator doesn't know
+    forbidden: Tuple[Tuple[str, str], ...] = ()
+    required: Tuple[Tuple[str, str], ...] = ()
+
+    def check_result(self, result: Any, expected: Any) -> Tuple[bool, str]:
+        """
+        Run the checks on the user's result, stopping at the first failure
+
+        Args:
+            result: Value of the user's 'result' variable
+            expected: Expected solution (for value_check)
+
+        Returns:
+            (is_correct, feedback_message)
+        """
+        for check in self.checks:
+            error = check(result, expected)
+            if error is not None:
+                return False, error
+        return True, self.success
+
+    def check_variables(self, namespace: Dict) -> Tuple[bool, str]:
+        """
+        Run the variable checks, reporting every failing variable
+
+        Args:
+            namespace: Execution namespace containing user's variables
+
+        Returns:
+            (is_correct, feedback_message)
+        """
+        errors = [error for error in (check(namespace) for check in self.checks) if error is not None]
+        if errors:
+            return False, "\n".join(errors)
+        return True, self.success
+
+
+def compare_value(user_value: Any, expected_value: Any, tolerance: float = 0.001) -> Tuple[bool, str]:
+    """
+    Compare a single value: same type, numbers within tolerance, others equal
+
+    Args:
+        user_value: User's value
+        expected_value: Expected value
+        tolerance: Absolute tolerance for numbers
+
+    Returns:
+        (is_correct, feedback_message)
+    """
+    # Check type match
+    if type(user_value) != type(expected_value):
+        return False, f"Type mismatch: got {type(user_value).__name__}, expected {type(expected_value).__name__}"
+
+    # Containers are walked, numbers inside them compare with tolerance
+    if isinstance(expected_value, (dict, list, tuple)):
+        mismatch = find_mismatch(user_value, expected_value, rtol=0, atol=tolerance)
+        if mismatch is None:
+            return True, CORRECT
+        return False, f"Value mismatch at {mismatch.path}: {mismatch.reason}"
+
+    # Numeric comparison with tolerance
+    if isinstance(expected_value, (int, float, np.number)):
+        if abs(user_value - expected_value) <= tolerance:
+            return True, CORRECT
+        return False, f"Value mismatch: got {user_value}, expected {expected_value}"
+
+    # Exact comparison for other types
+    if user_value == expected_value:
+        return True, CORRECT
+    return False, f"Value mismatch: got {user_value}, expected {expected_value}"
+
+
+# ----------------------------------------------------------------------
+# Checker factories
+# ----------------------------------------------------------------------
+
+def _require(check: Dict, key: str, context: str) -> Any:
+    """Value of a required key of a check"""
+    if check.get(key) is None:
+        raise RuleError(f"{context} needs '{key}'")
+    return check[key]
+
+
+def _number(check: Dict, key: str, default: float, context: str) -> float:
+    """Numeric option of a check (rtol, atol, ...)"""
+    value = check.get(key)
+    if value is None:
+        return default
+    if isinstance(value, bool):
+        raise RuleError(f"{context}: {key} must be a number, got {value!r}")
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        raise RuleError(f"{context}: {key} must be a number, got {value!r}") from None
+
+
+def _as_list(value: Any, context: str, what: str) -> list:
+    """Check that a rule value (column names, variable names) is a list"""
+    if not isinstance(value, (list, tuple)):
+        raise RuleError(f"{context}: {what} must be a list, got {value!r}")
+    return list(value)
+
+
+def _as_shape(value: Any, context: str) -> tuple:
+    """Convert an expected shape to a tuple"""
+    try:
+        return tuple(value)
+    except TypeError:
+        raise RuleError(f"{context}: expected shape must be a list, got {value!r}") from None
+
+
+def _instance_check(cls: type, message: str) -> Callable:
+    def check(value, expected):
+        if not isinstance(value, cls):
+            return message.format(type(value).__name__)
+    return check
+
+
+def _shape_check(expected_shape: tuple) -> Callable:
+    def check(value, expected):
+        if value.shape != expected_shape:
+            return f"Shape mismatch: got {value.shape}, expected {expected_shape}"
+    return check
+
+
+def _columns_check(expected_cols: list) -> Callable:
+    def check(df, expected):
+        if list(df.columns) != expected_cols:
+            return f"Column mismatch: got {list(df.columns)}, expected {expected_cols}"
+    return check
+
+
+def _dtypes_check(expected_dtypes: Tuple[Tuple[str, str], ...]) -> Callable:
+    def check(df, expected):
+        for col, expected_dtype in expected_dtypes:
+            if col not in df.columns:
+                return f"Column '{col}' not found"
+            if str(df[col].dtype) != expected_dtype:
+                return f"Column '{col}' has wrong dtype: {df[col].dtype}"
+    return check
+
+
+def _frame_values_check(expected_frame: pd.DataFrame, rtol: float, atol: float) -> Callable:
+    def check(df, expected):
+        # Columns are matched by position, the expected rows have no labels
+        return compare_frames(df, expected_frame, rtol=rtol, atol=atol, check_labels=False)
+    return check
+
+
+def _fingerprint_check(digest: str,
+                       decimals: int,
+                       shape: Optional[tuple],
+                       columns: Optional[List[str]],
+                       sketch: Optional[List[Dict]],
+                       rtol: float,
+                       atol: float) -> Callable:
+    def check(value, expected):
+        if shape is not None and tuple(value.shape) != shape:
+            return f"Shape mismatch: got {value.shape}, expected {shape}"
+        names = [str(col) for col in value.columns] if isinstance(value, pd.DataFrame) else None
+        if columns is not None and names != columns:
+            return f"Column mismatch: got {names}, expected {columns}"
+
+        if fingerprint(value, decimals) == digest:
+            return None
+        if sketch is None:
+            return "Values don't match expected result"
+        # Rounding boundaries can flip the hash, the sketches decide
+        return compare_sketches(summarize(value, decimals)[1], sketch, rtol, atol, names)
+    return check
+
+
+def _compile_fingerprint(check: Dict, context: str) -> Callable:
+    digest = _require(check, 'expected', context)
+    sketch = check.get('sketch')
+    if sketch is not None and (not isinstance(sketch, list) or not all(isinstance(s, dict) for s in sketch)):
+        raise RuleError(f"{context}: sketch must be a list of per-column mappings")
+    columns = check.get('columns')
+    try:
+        return _fingerprint_check(
+            str(digest),
+            int(check.get('decimals', FINGERPRINT_DECIMALS)),
+            _as_shape(check['shape'], context) if check.get('shape') is not None else None,
+            [str(col) for col in columns] if columns is not None else None,
+            sketch,
+            _number(check, 'rtol', 1e-6, context),
+            _number(check, 'atol', 1e-9, context)
+        )
+    except (TypeError, ValueError) as e:
+        raise RuleError(f"{context}: {e}") from None
+
+
+def _not_empty_check(df, expected):
+    if df.empty:
+        return "DataFrame is empty"
+
+
+def _no_nulls_check(df, expected):
+    if df.isnull().any().any():
+        return "DataFrame contains null values"
+
+
+def _dtype_check(expected_dtype: str) -> Callable:
+    def check(arr, expected):
+        if str(arr.dtype) != expected_dtype:
+            return f"Dtype mismatch: got {arr.dtype}, expected {expected_dtype}"
+    return check
+
+
+def _array_values_check(expected_values: np.ndarray) -> Callable:
+    def check(arr, expected):
+        if not np.allclose(arr, expected_values, rtol=1e-5, atol=1e-8):
+            return "Values don't match expected result"
+    return check
+
+
+def _min_max_check(minimum: Any, maximum: Any) -> Callable:
+    def check(arr, expected):
+        if minimum is not None and arr.min() < minimum:
+            return f"Minimum value {arr.min()} is below expected {minimum}"
+        if maximum is not None and arr.max() > maximum:
+            return f"Maximum value {arr.max()} is above expected {maximum}"
+    return check
+
+
+def _value_check(tolerance: float) -> Callable:
+    def check(value, expected):
+        is_correct, message = compare_value(value, expected, tolerance)
+        if not is_correct:
+            return message
+    return check
+
+
+def _type_check(expected_type: str) -> Callable:
+    cls = RESULT_TYPES[expected_type]
+
+    def check(value, expected):
+        if not isinstance(value, cls):
+            return f"Type mismatch: got {type(value).__name__}, expected {expected_type}"
+    return check
+
+
+def _has_shape_check(value, expected):
+    if not hasattr(value, 'shape'):
+        return f"Result has no shape attribute (type: {type(value).__name__})"
+
+
+def _callable_check(value, expected):
+    if not callable(value):
+        return "Result is not a callable function"
+
+
+def _function_check(test_cases: Tuple[Tuple[Any, Any], ...]) -> Callable:
+    def check(func, expected):
+        for i, (inputs, expected_output) in enumerate(test_cases, 1):
+            try:
+                # Call function with inputs
+                if isinstance(inputs, dict):
+                    actual_output = func(**inputs)
+                elif isinstance(inputs, (list, tuple)):
+                    actual_output = func(*inputs)
+                else:
+                    actual_output = func(inputs)
+
+                # Check output
+                if actual_output != expected_output:
+                    return f"Test case {i} failed: expected {expected_output}, got {actual_output}"
+
+            except Exception as e:
+                return f"Test case {i} raised error: {str(e)}"
+    return check
+
+
+def _variable_check(var_name: str, expected_value: Any, expected_type: Optional[str]) -> Callable:
+    cls = VARIABLE_TYPES.get(expected_type)
+
+    def check(namespace):
+        # Check if variable exists
+        if var_name not in namespace:
+            return f"Variable '{var_name}' not found"
+
+        user_value = namespace[var_name]
+
+        # Check type
+        if cls is not None and not isinstance(user_value, cls):
+            return f"Variable '{var_name}' has wrong type: expected {expected_type}, got {type(user_value).__name__}"
+
+        # Check value
+        if expected_value is not None:
+            if isinstance(expected_value, (dict, list)):
+                mismatch = find_mismatch(user_value, expected_value, rtol=0, atol=0.001, path=var_name)
+                if mismatch is not None:
+                    where = f" at {mismatch.path}" if mismatch.path != var_name else ""
+                    return f"Variable '{var_name}' has wrong value{where}: {mismatch.reason}"
+            elif isinstance(expected_value, float):
+                if abs(user_value - expected_value) > 0.001:
+                    return f"Variable '{var_name}' has wrong value: expected {expected_value}, got {user_value}"
+            elif user_value != expected_value:
+                return f"Variable '{var_name}' has wrong value: expected {expected_value}, got {user_value}"
+    return check
+
+
+# ----------------------------------------------------------------------
+# Compiler
+# ----------------------------------------------------------------------
+
+def _tolerance(rules: Dict) -> float:
+    """The numeric 'tolerance' of a validation block"""
+    tolerance = rules.get('tolerance')
+    if tolerance is None:
+        return 0.001
+    try:
+        return float(tolerance)
+    except (TypeError, ValueError):
+        raise RuleError(f"tolerance must be a number, got {tolerance!r}") from None
+
+
+def _check_list(rules: Dict) -> List[Dict]:
+    """The 'checks' list of a validation block"""
+    checks = rules.get('checks') or []
+    if not isinstance(checks, list) or not all(isinstance(check, dict) for check in checks):
+        raise RuleError("'checks' must be a list of mappings")
+    return checks
+
+
+def _compile_dataframe_checks(checks: List[Dict], ignored: List[str]) -> List[Callable]:
+    compiled = [_instance_check(pd.DataFrame, "Expected pandas DataFrame, got {}")]
+    for check in checks:
+        check_type = check.get('type')
+        context = f"dataframe_check '{check_type}'"
+
+        if check_type == 'shape':
+            compiled.append(_shape_check(_as_shape(_require(check, 'expected', context), context)))
+        elif check_type == 'columns':
+            compiled.append(_columns_check(_as_list(_require(check, 'expected', context), context, "expected columns")))
+        elif check_type == 'dtypes':
+            dtypes = _require(check, 'expected', context)
+            if not isinstance(dtypes, dict):
+                raise RuleError(f"{context}: expected must map columns to dtypes")
+            compiled.append(_dtypes_check(tuple((col, str(dtype)) for col, dtype in dtypes.items())))
+        elif check_type == 'values':
+            expected_values = check.get('expected_values')
+            if expected_values:
+                if not isinstance(expected_values, list) or \
+                        not all(isinstance(row, list) for row in expected_values):
+                    raise RuleError(f"{context}: expected_values must be a list of rows")
+                compiled.append(_frame_values_check(
+                    pd.DataFrame(expected_values),
+                    _number(check, 'rtol', 1e-5, context),
+                    _number(check, 'atol', 1e-8, context)
+                ))
+        elif check_type == 'fingerprint':
+            compiled.append(_compile_fingerprint(check, context))
+        elif check_type == 'not_empty':
+            compiled.append(_not_empty_check)
+        elif check_type == 'no_nulls':
+            compiled.append(_no_nulls_check)
+        else:
+            ignored.append(str(check_type))
+    return compiled
+
+
+def _compile_array_checks(checks: List[Dict], ignored: List[str]) -> List[Callable]:
+    compiled = [_instance_check(np.ndarray, "Expected numpy array, got {}")]
+    for check in checks:
+        check_type = check.get('type')
+        context = f"array_check '{check_type}'"
+
+        if check_type == 'shape':
+            compiled.append(_shape_check(_as_shape(_require(check, 'expected', context), context)))
+        elif check_type == 'dtype':
+            compiled.append(_dtype_check(str(_require(check, 'expected', context))))
+        elif check_type == 'values':
+            try:
+                expected_values = np.array(_require(check, 'expected', context))
+            except ValueError as e:
+                raise RuleError(f"{context}: {e}") from None
+            compiled.append(_array_values_check(expected_values))
+        elif check_type == 'min_max':
+            bounds = [check.get(key) for key in ('min', 'max')]
+            for key, bound in zip(('min', 'max'), bounds):
+                if bound is not None and (isinstance(bound, bool) or not isinstance(bound, (int, float))):
+                    raise RuleError(f"{context}: {key} must be a number, got {bound!r}")
+            compiled.append(_min_max_check(*bounds))
+        elif check_type == 'fingerprint':
+            compiled.append(_compile_fingerprint(check, context))
+        else:
+            ignored.append(str(check_type))
+    return compiled
+
+
+def _axes_index(check: Dict, context: str) -> Optional[int]:
+    """The optional 'axes' (subplot index) of a plot check"""
+    index = check.get('axes')
+    if index is None:
+        return None
+    if isinstance(index, bool) or not isinstance(index, int):
+        raise RuleError(f"{context}: axes must be a subplot index, got {index!r}")
+    return index
+
+
+def _compile_plot_checks(checks: List[Dict], ignored: List[str]) -> List[Callable]:
+    compiled = []
+    for check in checks:
+        check_type = check.get('type')
+        context = f"plot_check '{check_type}'"
+        index = _axes_index(check, context)
+
+        if check_type in ('subplot_count', 'axes_count'):
+            count = _require(check, 'expected', context)
+            if isinstance(count, bool) or not isinstance(count, int):
+                raise RuleError(f"{context}: expected must be a number of subplots")
+            compiled.append(subplot_count_check(count))
+        elif check_type in ARTIST_COUNTERS:
+            expected_value = check.get('expected', True)
+            if not isinstance(expected_value, (bool, int)) or expected_value < 0:
+                raise RuleError(f"{context}: expected must be true, false or a minimum count")
+            counter, description = ARTIST_COUNTERS[check_type]
+            compiled.append(artist_check(counter, description, expected_value, index))
+        elif check_type in TEXT_CHECKS:
+            expected_text = check.get('expected', True)
+            if expected_text is False or expected_text is None:
+                raise RuleError(f"{context}: expected must be true or the expected text")
+            compiled.append(text_check(check_type, expected_text, index))
+        elif check_type == 'artist':
+            minimum = check.get('expected', 1)
+            if isinstance(minimum, bool) or not isinstance(minimum, int):
+                raise RuleError(f"{context}: expected must be a minimum count")
+            compiled.append(artist_type_check(str(_require(check, 'artist', context)), minimum, index))
+        elif check_type == 'data_limits':
+            limits = {}
+            for axis in ('x', 'y'):
+                if check.get(axis) is None:
+                    continue
+                try:
+                    low, high = (float(v) for v in check[axis])
+                except (TypeError, ValueError):
+                    raise RuleError(f"{context}: {axis} must be [min, max]") from None
+                limits[axis] = (low, high)
+            if not limits:
+                raise RuleError(f"{context} needs 'x' or 'y'")
+            compiled.append(data_limits_check(limits, _number(check, 'rtol', 0.01, context), index))
+        else:
+            ignored.append(str(check_type))
+    return compiled
+
+
+def _compile_test_cases(rules: Dict) -> Tuple[Tuple[Any, Any], ...]:
+    test_cases = rules.get('test_cases') or []
+    if not isinstance(test_cases, list) or not all(isinstance(case, dict) for case in test_cases):
+        raise RuleError("'test_cases' must be a list of mappings with 'input' and 'output'")
+    return tuple((case.get('input'), case.get('output')) for case in test_cases)
+
+
+def _compile_constructs(rules: Dict, key: str) -> Tuple[Tuple[str, str], ...]:
+    """
+    Compile the 'forbid' or 'require' list of a validation block
+
+    Entries are construct names or mappings with 'construct' and an
+    optional feedback 'message'.
+    """
+    entries = rules.get(key) or []
+    if isinstance(entries, (str, dict)):
+        entries = [entries]
+    if not isinstance(entries, list):
+        raise RuleError(f"'{key}' must be a list of constructs")
+
+    compiled = []
+    for entry in entries:
+        if isinstance(entry, dict):
+            construct, message = entry.get('construct'), entry.get('message')
+        else:
+            construct, message = entry, None
+        if not isinstance(construct, str) or not construct.strip():
+            raise RuleError(f"'{key}' entries need a construct (one of {', '.join(CONSTRUCTS)} or a name)")
+        compiled.append((construct.strip(), str(message) if message else ''))
+    return tuple(compiled)
+
+
+def compile_rules(rules: Optional[Dict]) -> ValidationPlan:
+    """
+    Compile an exercise's validation block
+
+    Args:
+        rules: Validation configuration from the lesson YAML
+
+    Returns:
+        ValidationPlan
+
+    Raises:
+        RuleError: If the block is malformed (unknown validation type,
+            missing expected values, ...)
+    """
+    rules = rules or {}
+    if not isinstance(rules, dict):
+        raise RuleError("validation must be a mapping")
+
+    try:
+        plan = _compile_checks(rules)
+    except RuleError:
+        raise
+    except (TypeError, ValueError, KeyError, AttributeError) as e:
+        # Values of an unexpected type that no check above anticipated
+        raise RuleError(f"malformed {rules.get('type', 'value_check')} block ({type(e).__name__}: {e})") from None
+
+    _check_limits(rules.get('limits'))
+    return plan._replace(
+        forbidden=_compile_constructs(rules, 'forbid'),
+        required=_compile_constructs(rules, 'require')
+    )
+
+
+def _check_limits(limits: Any):
+    """Check a validation block's resource limits (see ResourceLimits.from_rules())"""
+    if limits is None:
+        return
+    if not isinstance(limits, dict):
+        raise RuleError(f"limits must be a mapping, got {limits!r}")
+    for key, value in limits.items():
+        if key not in ResourceLimits._fields:
+            raise RuleError(f"limits: unknown limit '{key}' (expected one of {', '.join(ResourceLimits._fields)})")
+        if value is not None and _number(limits, key, 0, "limits") <= 0:
+            raise RuleError(f"limits: {key} must be positive, got {value!r}")
+
+
+def _compile_checks(rules: Dict) -> ValidationPlan:
+    """Compile the checks of a validation block (see compile_rules())"""
+    validation_type = rules.get('type', 'value_check')
+    ignored = []
+
+    # Compare against the reference solution's results
+    if validation_type == 'solution_check':
+        variables = rules.get('variables') or ['result']
+        if isinstance(variables, str):
+            variables = [variables]
+        variables = _as_list(variables, "solution_check", "variables")
+        if not all(isinstance(name, str) for name in variables):
+            raise RuleError(f"solution_check: variables must be names, got {variables!r}")
+        return ValidationPlan('solution', variables=tuple(variables),
+                              tolerance=_tolerance(rules))
+
+    checks = _check_list(rules)
+
+    # Checks naming variables validate those instead of 'result'
+    if checks and 'variable' in checks[0]:
+        compiled = []
+        names = []
+        for check in checks:
+            names.append(str(_require(check, 'variable', "variable check")))
+            compiled.append(_variable_check(names[-1], check.get('expected'), check.get('type')))
+        return ValidationPlan('variables', tuple(compiled),
+                              success="Correct! ✅ All variables match the expected values and types.",
+                              variables=tuple(dict.fromkeys(names)))
+
+    success = CORRECT
+    if validation_type == 'dataframe_check':
+        compiled = _compile_dataframe_checks(checks, ignored)
+
+    elif validation_type == 'array_check':
+        compiled = _compile_array_checks(checks, ignored)
+
+    elif validation_type == 'value_check':
+        compiled = [_value_check(_tolerance(rules))]
+
+    elif validation_type == 'type_check':
+        expected_type = rules.get('expected_type')
+        if not isinstance(expected_type, str) or expected_type not in RESULT_TYPES:
+            raise RuleError(f"Unknown expected type: {expected_type}")
+        compiled = [_type_check(expected_type)]
+
+    elif validation_type == 'function_check':
+        compiled = [_callable_check, _function_check(_compile_test_cases(rules))]
+        success = "All test cases passed! ✅"
+
+    elif validation_type == 'shape_check':
+        context = "shape_check"
+        compiled = [_has_shape_check, _shape_check(_as_shape(_require(rules, 'expected_shape', context), context))]
+
+    elif validation_type == 'plot_check':
+        # Plots are read from the figure, not from a variable
+        return ValidationPlan('plot', tuple(_compile_plot_checks(checks, ignored)),
+                              variables=(), ignored=tuple(ignored))
+
+    else:
+        raise RuleError(f"Unknown validation type: {validation_type}")
+
+    return ValidationPlan('result', tuple(compiled), success=success, ignored=tuple(ignored))
+
+
+@lru_cache(maxsize=MAX_CACHED_PLANS)
+def _compile_marshalled(data: bytes) -> ValidationPlan:
+    return compile_rules(marshal.loads(data))
+
+
+def get_plan(rules: Optional[Dict]) -> ValidationPlan:
+    """
+    Compiled plan of a validation block, from the cache when possible
+
+    Args:
+        rules: Validation configuration from the lesson YAML
+
+    Returns:
+        ValidationPlan
+
+    Raises:
+        RuleError: If the block is malformed
+    """
+    try:
+        data = marshal.dumps(rules or {})
+    except ValueError:
+        return compile_rules(rules)  # Values marshal can't key on (e.g. YAML dates)
+    return _compile_marshalled(data)
+
+
+def rule_problems(rules: Optional[Dict]) -> List[str]:
+    """
+    Problems a lesson author should fix in a validation block
+
+    Args:
+        rules: Validation configuration from the lesson YAML
+
+    Returns:
+        Error or warning messages (empty when the block is fine)
+    """
+    try:
+        plan = get_plan(rules)
+    except RuleError as e:
+        return [str(e)]
+    return [f"unknown check '{check_type}' is ignored" for check_type in plan.ignored]
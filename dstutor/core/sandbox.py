@@ -0,0 +1,426 @@
+"""
+Pool of warm worker processes for running learner code
+
+Submissions run in separate processes so a crash, an infinite loop or a
+runaway allocation can't take the learner's kernel down. Workers are forked
+from a forkserver that has already imported the data science stack, and
+they stay alive between submissions, so a check costs about as much as the
+learner's code itself.
+
+Every submission runs under ResourceLimits: a wall-clock timeout enforced
+by the pool, and CPU time (RLIMIT_CPU), address space (RLIMIT_AS) and
+captured output caps enforced inside the worker.
+"""
+
+import multiprocessing
+import os
+import queue
+import signal
+import threading
+from contextlib import contextmanager
+from typing import Any, Dict, Iterable, NamedTuple, Optional, Tuple
+
+
+# Imported once in the forkserver and inherited by every worker
+PRELOAD_MODULES = (
+    'numpy',
+    'pandas',
+    'matplotlib',
+    'sklearn.datasets',
+    'sklearn.model_selection',
+    'sklearn.preprocessing',
+    'sklearn.linear_model',
+    'sklearn.tree',
+    'sklearn.ensemble',
+    'sklearn.metrics',
+    'dstutor.core.sandbox_worker',
+)
+
+# Workers are replaced after this many submissions, which discards any
+# state learner code left behind in imported modules
+DEFAULT_MAX_RUNS = 50
+
+
+class SandboxError(RuntimeError):
+    """Learner code could not be run to completion in the sandbox"""
+
+
+class SandboxUnavailable(SandboxError):
+    """Worker processes could not be started on this system"""
+
+
+class ResourceLimitExceeded(SandboxError):
+    """Learner code hit one of its resource limits"""
+    limit = ''
+
+
+class TimeoutExceeded(ResourceLimitExceeded):
+    """Wall-clock or CPU time limit exceeded"""
+    limit = 'timeout'
+
+
+class MemoryExceeded(ResourceLimitExceeded):
+    """Memory limit exceeded"""
+    limit = 'memory'
+
+
+class OutputLimitExceeded(ResourceLimitExceeded):
+    """Too much output printed"""
+    limit = 'output'
+
+
+_LIMIT_MESSAGES = {
+    'timeout': "Your code ran for more than {limits.timeout:g} seconds and was stopped. "
+               "Look for an infinite loop or a computation much larger than needed.",
+    'cpu': "Your code used more than {limits.cpu_seconds} seconds of CPU time and was stopped. "
+           "Look for an infinite loop or a computation much larger than needed.",
+    'memory': "Your code used more than {limits.memory_mb} MB of memory and was stopped. "
+              "Check for arrays or DataFrames much larger than needed.",
+    'output': "Your code printed more than {limits.max_output_bytes} bytes and was stopped. "
+              "Check for print() calls inside loops.",
+}
+
+
+class ResourceLimits(NamedTuple):
+    """Resource budget of one submission"""
+    timeout: float = 10.0               # wall-clock seconds
+    cpu_seconds: int = 10               # RLIMIT_CPU
+    memory_mb: int = 1024               # RLIMIT_AS, on top of the preloaded stack
+    max_output_bytes: int = 1_000_000   # captured stdout
+
+    @classmethod
+    def from_rules(cls, validation_rules: Optional[Dict]) -> 'ResourceLimits':
+        """
+        Read limits from a lesson's validation block
+
+        Example:
+            validation:
+              type: value_check
+              limits:
+                timeout: 30
+                memory_mb: 2048
+
+        Args:
+            validation_rules: Validation configuration
+
+        Returns:
+            ResourceLimits with defaults for unspecified limits
+
+        The block is checked by rules.compile_rules() when the lesson
+        catalog is built, so unknown keys and non-positive values are
+        reported to lesson authors.
+        """
+        overrides = (validation_rules or {}).get('limits') or {}
+        limits = cls()
+        return limits._replace(**{
+            field: type(getattr(limits, field))(overrides[field])
+            for field in cls._fields if overrides.get(field) is not None
+        })
+
+    def message(self, kind: str) -> str:
+        """Learner-facing explanation of an exceeded limit ('timeout', 'cpu', 'memory' or 'output')"""
+        return _LIMIT_MESSAGES[kind].format(limits=self)
+
+
+@contextmanager
+def wall_clock_limit(limits: ResourceLimits):
+    """
+    Enforce the wall-clock timeout on code running in this process
+
+    Used when there is no sandbox. The timer is a SIGALRM, so the limit can
+    only be enforced on the main thread of a Unix process.
+
+    Yields:
+        True if the timeout is enforced, False if the code runs unlimited
+
+    Raises:
+        TimeoutExceeded: In the code running when the timeout expires
+    """
+    if not hasattr(signal, 'setitimer') or threading.current_thread() is not threading.main_thread():
+        yield False
+        return
+    if signal.getitimer(signal.ITIMER_REAL)[0] > 0:
+        yield True  # Nested in another limit, which stays in charge
+        return
+
+    def on_timeout(signum, frame):
+        raise TimeoutExceeded(limits.message('timeout'))
+
+    previous = signal.signal(signal.SIGALRM, on_timeout)
+    signal.setitimer(signal.ITIMER_REAL, limits.timeout)
+    try:
+        yield True
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previous if previous is not None else signal.SIG_DFL)
+
+
+def _run_worker(conn, preload: Tuple[str, ...]):
+    """Process target; the worker module is only ever imported in the child"""
+    from .sandbox_worker import worker_main
+    worker_main(conn, preload)
+
+
+class _Worker:
+    """Handle of one worker process"""
+
+    __slots__ = ('process', 'conn', 'runs')
+
+    def __init__(self, process, conn):
+        self.process = process
+        self.conn = conn
+        self.runs = 0
+
+    def stop(self):
+        """Ask the worker to exit, killing it if it doesn't"""
+        try:
+            self.conn.send(None)
+        except (OSError, ValueError):
+            pass
+        self.process.join(timeout=1)
+        if self.process.is_alive():
+            self.process.kill()
+            self.process.join(timeout=1)
+        self.conn.close()
+
+
+class SandboxPool:
+    """
+    Pre-started worker processes that validate submissions
+
+    Each submission is sent to an idle worker. Workers are recycled after
+    max_runs submissions and replaced in the background when they crash.
+    """
+
+    def __init__(self,
+                 workers: int = 1,
+                 max_runs: int = DEFAULT_MAX_RUNS,
+                 preload: Iterable[str] = PRELOAD_MODULES):
+        """
+        Initialize sandbox pool
+
+        Args:
+            workers: Number of worker processes
+            max_runs: Submissions a worker runs before it is replaced
+            preload: Modules imported before workers are forked
+        """
+        self.workers = max(1, workers)
+        self.max_runs = max(1, max_runs)
+        self.preload = tuple(preload)
+
+        self._context = None
+        self._idle = queue.Queue()
+        self._lock = threading.Lock()
+        self._live = set()
+        self._pending = 0  # workers being started
+        self._started = False
+        self._closed = False
+        self._start_error = None
+
+    @property
+    def start_method(self) -> str:
+        """'forkserver' where available (Linux, macOS), otherwise 'spawn'"""
+        return 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+
+    def start(self, wait: bool = False):
+        """
+        Start the worker processes
+
+        Args:
+            wait: Block until the workers are running (otherwise they are
+                started in a background thread)
+        """
+        with self._lock:
+            if self._started or self._closed:
+                return
+            self._started = True
+
+        if wait:
+            self._start_workers()
+        else:
+            threading.Thread(target=self._start_workers, name='dstutor-sandbox-start', daemon=True).start()
+
+    def run(self,
+            user_code: str,
+            expected_result: Any,
+            validation_rules: Dict,
+            setup_code: str = '') -> Tuple[bool, str]:
+        """
+        Validate a submission in an idle worker
+
+        Args:
+            user_code: The code submitted by user
+            expected_result: Expected solution (for reference)
+            validation_rules: Validation configuration
+            setup_code: Exercise setup code, snapshotted by the worker
+
+        Returns:
+            (is_correct, feedback_message)
+
+        Raises:
+            SandboxUnavailable: If worker processes can't be started
+            ResourceLimitExceeded: If the code hit one of its ResourceLimits
+            SandboxError: If the worker died while running the code
+        """
+        limits = ResourceLimits.from_rules(validation_rules)
+        return self._call('validate', (user_code, expected_result, validation_rules, setup_code), limits)
+
+    def reference_results(self,
+                          solution: str,
+                          setup_code: str = '',
+                          variables: Iterable[str] = ('result',),
+                          limits: Optional[ResourceLimits] = None) -> Dict[str, Any]:
+        """
+        Run an exercise's reference solution in an idle worker
+
+        Args:
+            solution: Reference solution code
+            setup_code: Exercise setup code
+            variables: Names of the variables to return
+            limits: Resource limits of the run (defaults to ResourceLimits())
+
+        Returns:
+            variable name -> reference value
+
+        Raises:
+            SandboxUnavailable: If worker processes can't be started
+            ResourceLimitExceeded: If the solution hit one of its limits
+            SandboxError: If the worker died or the values can't be sent back
+            Exception: Whatever the solution raised
+        """
+        result = self._call('reference', (solution, setup_code, tuple(variables)), limits or ResourceLimits())
+        if isinstance(result, BaseException):
+            raise result
+        return result
+
+    def _call(self, kind: str, args: tuple, limits: ResourceLimits) -> Any:
+        """
+        Send a job ('validate' or 'reference') to an idle worker and wait for its result
+
+        The worker runs it in the kernel's current directory, so relative
+        data paths resolve the same way as in the notebook.
+        """
+        if self._closed:
+            raise SandboxError("Sandbox has been shut down")
+
+        self.start()
+        worker = self._acquire()
+
+        try:
+            worker.conn.send((kind, args, limits, os.getcwd()))
+            if not worker.conn.poll(limits.timeout):
+                self._replace(worker, kill=True)
+                raise TimeoutExceeded(limits.message('timeout'))
+            result = worker.conn.recv()
+        except (EOFError, OSError):
+            # Segfault, os._exit() or killed by the OS
+            worker.process.join(timeout=1)
+            exitcode = worker.process.exitcode
+            self._replace(worker)
+            if exitcode == -getattr(signal, 'SIGKILL', 9):
+                # Most likely the kernel's OOM killer
+                raise MemoryExceeded(limits.message('memory'))
+            raise SandboxError(f"Your code crashed the Python process running it (exit code {exitcode}).")
+        except ResourceLimitExceeded:
+            raise
+        except BaseException:
+            # Interrupted while waiting (e.g. KeyboardInterrupt): the worker
+            # may still be running the code, replace it
+            self._replace(worker, kill=True)
+            raise
+
+        worker.runs += 1
+        if worker.runs >= self.max_runs or isinstance(result, ResourceLimitExceeded):
+            # Recycled, or left in an unknown state by a limit
+            self._replace(worker)
+        else:
+            self._idle.put(worker)
+
+        if isinstance(result, ResourceLimitExceeded):
+            raise result
+        return result
+
+    def shutdown(self):
+        """Stop all worker processes"""
+        with self._lock:
+            self._closed = True
+            workers = list(self._live)
+            self._live.clear()
+        for worker in workers:
+            worker.stop()
+
+    def stats(self) -> Dict[str, Any]:
+        """Pool size and state"""
+        return {
+            'workers': len(self._live),
+            'idle': self._idle.qsize(),
+            'max_runs': self.max_runs,
+            'start_method': self.start_method,
+        }
+
+    def _get_context(self):
+        """Multiprocessing context, with the forkserver preloading the stack"""
+        if self._context is None:
+            context = multiprocessing.get_context(self.start_method)
+            if self.start_method == 'forkserver':
+                context.set_forkserver_preload(list(self.preload))
+            self._context = context
+        return self._context
+
+    def _spawn(self) -> _Worker:
+        """Start one worker process"""
+        context = self._get_context()
+        parent_conn, child_conn = context.Pipe()
+        process = context.Process(
+            target=_run_worker,
+            args=(child_conn, self.preload),
+            name='dstutor-sandbox',
+            daemon=True
+        )
+        process.start()
+        child_conn.close()
+        return _Worker(process, parent_conn)
+
+    def _start_workers(self):
+        """Start workers until the pool is full"""
+        while True:
+            with self._lock:
+                if self._closed or len(self._live) + self._pending >= self.workers:
+                    return
+                self._pending += 1
+            try:
+                worker = self._spawn()
+            except Exception as e:
+                self._start_error = e
+                self._idle.put(None)  # Wake up a waiting run()
+                return
+            finally:
+                with self._lock:
+                    self._pending -= 1
+            with self._lock:
+                if self._closed:
+                    worker.stop()
+                    return
+                self._live.add(worker)
+            self._idle.put(worker)
+
+    def _acquire(self) -> _Worker:
+        """Take an idle worker, waiting for one to become free"""
+        while True:
+            if self._start_error is not None:
+                raise SandboxUnavailable(f"Could not start sandbox workers: {self._start_error}")
+            worker = self._idle.get()
+            if worker is None:
+                continue
+            if worker.process.is_alive():
+                return worker
+            self._replace(worker)  # Died while idle
+
+    def _replace(self, worker: _Worker, kill: bool = False):
+        """Retire a worker and start a new one in the background"""
+        with self._lock:
+            self._live.discard(worker)
+        if kill:
+            worker.process.kill()  # Still running learner code
+        threading.Thread(target=worker.stop, daemon=True).start()
+        threading.Thread(target=self._start_workers, name='dstutor-sandbox-start', daemon=True).start()
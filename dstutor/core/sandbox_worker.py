@@ -0,0 +1,152 @@
+"""
+Entry point of sandbox worker processes
+
+Only imported in sandbox processes: it selects matplotlib's headless Agg
+backend before pyplot is imported, which must not happen in the kernel.
+Imported by the forkserver, so workers start with plotting ready.
+"""
+
+import importlib
+import math
+import os
+import pickle
+import signal
+from typing import Any, Tuple
+
+try:
+    import resource
+except ImportError:
+    resource = None  # Windows: only the pool's wall-clock timeout applies
+
+try:
+    import matplotlib
+    matplotlib.use('Agg', force=True)
+    import matplotlib.pyplot as plt
+    import seaborn  # noqa: F401
+except ImportError:
+    plt = None
+
+from .sandbox import ResourceLimits, ResourceLimitExceeded, SandboxError, TimeoutExceeded
+from .validator import CodeValidator
+
+
+def _address_space() -> int:
+    """Current virtual memory size of this process in bytes, 0 if unknown"""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[0]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        return 0
+
+
+def _set_soft_limit(which: int, value: int):
+    """Set a soft resource limit, capped by the hard limit"""
+    soft, hard = resource.getrlimit(which)
+    if hard != resource.RLIM_INFINITY:
+        value = min(value, hard)
+    try:
+        resource.setrlimit(which, (value, hard))
+    except (ValueError, OSError):
+        pass
+
+
+def _apply_limits(limits: ResourceLimits):
+    """Limit CPU time and address space of the next submission"""
+    if resource is None:
+        return
+
+    # Limits apply to the whole process, so budget on top of current usage
+    # (rounded up: the limit has whole-second granularity)
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    _set_soft_limit(resource.RLIMIT_CPU, math.ceil(usage.ru_utime + usage.ru_stime) + limits.cpu_seconds)
+
+    address_space = _address_space()
+    if address_space:
+        _set_soft_limit(resource.RLIMIT_AS, address_space + limits.memory_mb * 1024 * 1024)
+
+
+def _clear_limits():
+    """Lift the soft limits again after a submission"""
+    if resource is None:
+        return
+    for which in (resource.RLIMIT_CPU, resource.RLIMIT_AS):
+        soft, hard = resource.getrlimit(which)
+        try:
+            resource.setrlimit(which, (hard, hard))
+        except (ValueError, OSError):
+            pass
+
+
+def _run_job(validator: CodeValidator, kind: str, args: tuple) -> Any:
+    """Run one job: 'validate' a submission or run a 'reference' solution"""
+    if kind == 'reference':
+        try:
+            return validator.run_reference(*args)
+        except ResourceLimitExceeded:
+            raise
+        except BaseException as e:
+            # Raised again by the pool; other exception types may not unpickle there
+            return e if type(e).__module__ == 'builtins' else SandboxError(f"{type(e).__name__}: {str(e)}")
+    return validator.validate(*args)
+
+
+def _send(conn, result: Any):
+    """Send a result, or the reason it can't be pickled"""
+    try:
+        conn.send(result)
+    except (pickle.PicklingError, TypeError, AttributeError) as e:
+        # Pickled before anything is written, so the pipe is still clean
+        conn.send(SandboxError(f"The result can't be sent back from the sandbox ({type(e).__name__}: {str(e)})"))
+
+
+def worker_main(conn, preload: Tuple[str, ...]):
+    """Run jobs received over conn until told to stop"""
+    # Already imported when forked from the forkserver, imported here with 'spawn'
+    for module in preload:
+        try:
+            importlib.import_module(module)
+        except ImportError:
+            pass
+
+    validator = CodeValidator(wall_clock_limit=False)  # Enforced by the pool
+    limits = ResourceLimits()
+
+    def on_cpu_limit(signum, frame):
+        raise TimeoutExceeded(limits.message('cpu'))
+
+    if hasattr(signal, 'SIGXCPU'):
+        signal.signal(signal.SIGXCPU, on_cpu_limit)
+
+    while True:
+        try:
+            job = conn.recv()
+        except (EOFError, OSError):
+            break
+        if job is None:
+            break
+
+        kind, args, limits, cwd = job
+
+        # Submissions read data files relative to the notebook, like in the kernel
+        try:
+            os.chdir(cwd)
+        except OSError:
+            pass
+
+        _apply_limits(limits)
+        try:
+            result = _run_job(validator, kind, args)
+        except ResourceLimitExceeded as e:
+            result = e
+        except BaseException as e:
+            result = (False, f"{type(e).__name__}: {str(e)}")
+        finally:
+            _clear_limits()
+
+        if plt is not None:
+            plt.close('all')
+
+        try:
+            _send(conn, result)
+        except (OSError, ValueError):
+            break
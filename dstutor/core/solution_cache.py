@@ -0,0 +1,106 @@
+"""
+Cache of reference solution results
+
+Exercises validated with ``type: solution_check`` compare the learner's
+variables against the ones produced by the exercise's reference solution.
+The solution runs once; its results are pickled to disk under a key derived
+from the exercise content (setup code, solution, compared variables) and
+the numpy/pandas versions, so edited lessons and library upgrades get a
+fresh reference.
+"""
+
+import hashlib
+import json
+import os
+import pickle
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+
+def default_solution_cache_dir() -> Path:
+    """Return the cache location (``$DSTUTOR_SOLUTION_CACHE`` or ~/.dstutor)"""
+    env_path = os.getenv('DSTUTOR_SOLUTION_CACHE')
+    if env_path:
+        return Path(env_path)
+    return Path.home() / ".dstutor" / "solutions"
+
+
+class SolutionCache:
+    """Reference results in memory, backed by pickle files"""
+
+    def __init__(self, cache_dir: Optional[Path] = None):
+        """
+        Initialize solution cache
+
+        Args:
+            cache_dir: Directory of the pickled results
+        """
+        self.cache_dir = Path(cache_dir) if cache_dir else default_solution_cache_dir()
+        self._memory = {}
+
+    @staticmethod
+    def key(setup_code: str, solution: str, variables: List[str]) -> str:
+        """Content hash identifying an exercise's reference results"""
+        content = json.dumps([setup_code or '', solution or '', list(variables), np.__version__, pd.__version__])
+        return hashlib.sha1(content.encode('utf-8')).hexdigest()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        Look up reference results
+
+        Args:
+            key: Output of SolutionCache.key()
+
+        Returns:
+            variable name -> value, or None if not cached
+        """
+        values = self._memory.get(key)
+        if values is not None:
+            return values
+
+        try:
+            with open(self.cache_dir / f"{key}.pkl", 'rb') as f:
+                values = pickle.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception:
+            return None  # Truncated or written by incompatible libraries, recompute
+
+        self._memory[key] = values
+        return values
+
+    def put(self, key: str, values: Dict[str, Any]):
+        """
+        Store reference results
+
+        Results that can't be pickled are only kept in memory.
+
+        Args:
+            key: Output of SolutionCache.key()
+            values: variable name -> value
+        """
+        self._memory[key] = values
+
+        try:
+            data = pickle.dumps(values, protocol=pickle.HIGHEST_PROTOCOL)
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            path = self.cache_dir / f"{key}.pkl"
+            tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+            with open(tmp_path, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except Exception:
+            pass  # Unpicklable result or read-only home
+
+    def clear(self):
+        """Forget all cached results"""
+        self._memory.clear()
+        if self.cache_dir.exists():
+            for path in self.cache_dir.glob('*.pkl'):
+                try:
+                    path.unlink()
+                except OSError:
+                    pass
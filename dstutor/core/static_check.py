@@ -0,0 +1,190 @@
+"""
+Static pre-check of submissions
+
+Before any code runs, the submission is parsed once and rejected right away
+when it can't pass: a syntax error, a required variable (e.g. 'result') that
+is never assigned, or a construct the lesson forbids. Lessons declare
+constructs in their validation block:
+
+    validation:
+      type: array_check
+      forbid:
+        - construct: loop
+          message: "Apply the formula to the whole array at once."
+      require: [np.where]
+
+A construct is one of CONSTRUCTS or a name, matched against names and
+attribute accesses ('iterrows' matches ``df.iterrows()``, 'np.where' matches
+``np.where(...)``).
+"""
+
+import ast
+from functools import lru_cache
+from typing import Optional, Set, Tuple
+
+
+_COMPREHENSIONS = (ast.ListComp, ast.SetComp, ast.DictComp, ast.GeneratorExp)
+
+# construct -> (node types, description used in feedback)
+CONSTRUCTS = {
+    'loop': ((ast.For, ast.AsyncFor, ast.While) + _COMPREHENSIONS, "a Python loop"),
+    'for': ((ast.For, ast.AsyncFor), "a for loop"),
+    'while': ((ast.While,), "a while loop"),
+    'comprehension': (_COMPREHENSIONS, "a comprehension"),
+    'lambda': ((ast.Lambda,), "a lambda"),
+    'def': ((ast.FunctionDef, ast.AsyncFunctionDef), "a function definition"),
+    'class': ((ast.ClassDef,), "a class definition"),
+    'import': ((ast.Import, ast.ImportFrom), "an import"),
+    'if': ((ast.If, ast.IfExp), "an if statement"),
+    'try': ((ast.Try,), "try/except"),
+}
+
+# Calls that can create variables the analysis can't see
+_DYNAMIC_BINDINGS = {'exec', 'eval', 'globals', 'locals', 'vars', 'setattr', '__import__'}
+
+_SCOPES = (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef, ast.Lambda) + _COMPREHENSIONS
+
+
+def _dotted_name(node: ast.AST) -> Optional[str]:
+    """'np.linalg.norm' for an attribute chain on a name, else None"""
+    parts = []
+    while isinstance(node, ast.Attribute):
+        parts.append(node.attr)
+        node = node.value
+    if not isinstance(node, ast.Name):
+        return None
+    parts.append(node.id)
+    return '.'.join(reversed(parts))
+
+
+def _module_bindings(tree: ast.Module) -> Tuple[Set[str], bool]:
+    """
+    Names a module binds in its global namespace
+
+    Returns:
+        (names, dynamic) where dynamic is True if the code may bind names
+        the analysis can't see (exec, globals(), star imports, ...)
+    """
+    names = set()
+    dynamic = False
+    stack = [(node, True) for node in tree.body]
+
+    while stack:
+        node, module_scope = stack.pop()
+
+        if isinstance(node, ast.Global):
+            names.update(node.names)
+        elif isinstance(node, ast.ImportFrom) and any(alias.name == '*' for alias in node.names):
+            dynamic = True
+        elif isinstance(node, ast.Call) and isinstance(node.func, ast.Name) and node.func.id in _DYNAMIC_BINDINGS:
+            dynamic = True
+
+        if module_scope:
+            if isinstance(node, ast.Name) and isinstance(node.ctx, ast.Store):
+                names.add(node.id)
+            elif isinstance(node, (ast.Import, ast.ImportFrom)):
+                names.update((alias.asname or alias.name).partition('.')[0] for alias in node.names)
+            elif isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+                names.add(node.name)
+            elif isinstance(node, ast.ExceptHandler) and node.name:
+                names.add(node.name)
+            elif isinstance(node, ast.NamedExpr) and isinstance(node.target, ast.Name):
+                names.add(node.target.id)  # Binds in the enclosing scope, even inside comprehensions
+
+        inner_scope = module_scope and not isinstance(node, _SCOPES)
+        stack.extend((child, inner_scope) for child in ast.iter_child_nodes(node))
+
+    return names, dynamic
+
+
+@lru_cache(maxsize=64)
+def _setup_bindings(setup_code: str) -> frozenset:
+    """Names bound by an exercise's setup code"""
+    try:
+        names, _ = _module_bindings(ast.parse(setup_code))
+    except (SyntaxError, ValueError):
+        return frozenset()
+    return frozenset(names)
+
+
+def _refers_to(node: ast.AST, name: str) -> bool:
+    """Whether a Name or Attribute node is name or ends with '.name'"""
+    if isinstance(node, ast.Name):
+        return node.id == name
+    if isinstance(node, ast.Attribute):
+        # Attributes of expressions (df['x'].apply) are matched on the attribute alone
+        dotted = _dotted_name(node) or '.' + node.attr
+        return dotted == name or dotted.endswith('.' + name)
+    return False
+
+
+def describe_construct(construct: str) -> str:
+    """Feedback wording of a construct"""
+    if construct in CONSTRUCTS:
+        return CONSTRUCTS[construct][1]
+    return f"`{construct}`"
+
+
+def find_construct(tree: ast.AST, construct: str) -> Optional[ast.AST]:
+    """
+    Find the first use of a construct
+
+    Args:
+        tree: Parsed code
+        construct: Key of CONSTRUCTS or a (dotted) name
+
+    Returns:
+        The first matching node, or None
+    """
+    if construct in CONSTRUCTS:
+        node_types = CONSTRUCTS[construct][0]
+        matches = (node for node in ast.walk(tree) if isinstance(node, node_types))
+    else:
+        matches = (node for node in ast.walk(tree) if _refers_to(node, construct))
+    return min(matches, key=lambda node: (getattr(node, 'lineno', 0), getattr(node, 'col_offset', 0)), default=None)
+
+
+def precheck(user_code: str,
+             required_names: Tuple[str, ...] = (),
+             forbidden: Tuple[Tuple[str, str], ...] = (),
+             required: Tuple[Tuple[str, str], ...] = (),
+             setup_code: str = '') -> Optional[str]:
+    """
+    Reject submissions that can't pass without running them
+
+    Args:
+        user_code: The code submitted by user
+        required_names: Variables the validation reads
+        forbidden: (construct, message) pairs the code must not use
+        required: (construct, message) pairs the code must use
+        setup_code: Exercise setup code (its variables count as defined)
+
+    Returns:
+        Feedback message, or None if the code has to be run to judge it
+    """
+    try:
+        tree = ast.parse(user_code, '<string>')
+    except (SyntaxError, ValueError) as e:  # ValueError: null bytes
+        return f"Syntax Error: {str(e)}\nCheck your code for typos."
+
+    for construct, message in forbidden:
+        node = find_construct(tree, construct)
+        if node is not None:
+            return message or f"This exercise should be solved without {describe_construct(construct)} " \
+                              f"(line {getattr(node, 'lineno', '?')})."
+
+    for construct, message in required:
+        if find_construct(tree, construct) is None:
+            return message or f"This exercise should be solved using {describe_construct(construct)}."
+
+    if required_names:
+        names, dynamic = _module_bindings(tree)
+        if not dynamic:
+            missing = [name for name in required_names
+                       if name not in names and name not in _setup_bindings(setup_code or '')]
+            if missing == ['result']:
+                return "Please store your answer in a variable called 'result'"
+            if missing:
+                return "\n".join(f"Variable '{name}' not found" for name in missing)
+
+    return None
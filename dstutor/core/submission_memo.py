@@ -0,0 +1,129 @@
+"""
+Memo of recent submission verdicts
+
+Learners often check the same code several times in a row. Verdicts are
+remembered per (exercise content, normalized code, setup code), so a
+repeated check neither runs the code again nor asks for AI feedback again.
+Code is normalized through its AST, so comments, blank lines and
+formatting don't change the key.
+"""
+
+import ast
+import hashlib
+import marshal
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+
+DEFAULT_MEMO_SIZE = 128
+
+
+def normalize_code(code: str) -> str:
+    """
+    Canonical form of submitted code
+
+    Args:
+        code: Source code
+
+    Returns:
+        Dump of the code's AST (without positions), or the stripped source
+        if it doesn't parse
+    """
+    try:
+        return ast.dump(ast.parse(code))
+    except (SyntaxError, ValueError):
+        return code.strip()
+
+
+def _sha1(data: bytes) -> str:
+    return hashlib.sha1(data).hexdigest()
+
+
+class SubmissionMemo:
+    """LRU memo of validation results keyed by submission content"""
+
+    def __init__(self, max_entries: int = DEFAULT_MEMO_SIZE):
+        """
+        Initialize submission memo
+
+        Args:
+            max_entries: Number of verdicts kept
+        """
+        self.max_entries = max_entries
+        self._entries = OrderedDict()  # key -> result dict
+        self._lock = threading.Lock()  # Auto-validation checks from a worker thread
+
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(exercise: Dict, user_code: str) -> Tuple[str, str, str]:
+        """
+        Memo key of a submission
+
+        Args:
+            exercise: Exercise dictionary of the lesson
+            user_code: Submitted code
+
+        Returns:
+            (exercise content hash, normalized code hash, setup code hash)
+        """
+        try:
+            exercise_data = marshal.dumps(exercise)
+        except ValueError:
+            exercise_data = repr(exercise).encode('utf-8')
+
+        return (
+            _sha1(exercise_data),
+            _sha1(normalize_code(user_code).encode('utf-8')),
+            _sha1((exercise.get('setup_code') or '').encode('utf-8')),
+        )
+
+    def get(self, key: Tuple[str, str, str]) -> Optional[Dict[str, Any]]:
+        """
+        Look up the verdict of an identical earlier submission
+
+        Args:
+            key: Output of SubmissionMemo.key()
+
+        Returns:
+            Copy of the stored result or None
+        """
+        with self._lock:
+            result = self._entries.get(key)
+            if result is None:
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return dict(result)
+
+    def put(self, key: Tuple[str, str, str], result: Dict[str, Any]):
+        """
+        Remember a verdict, evicting the least recently used over max_entries
+
+        Args:
+            key: Output of SubmissionMemo.key()
+            result: Result of TutorEngine.validate_exercise()
+        """
+        with self._lock:
+            self._entries[key] = dict(result)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        """Forget all verdicts"""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Memo size and hit counters"""
+        return {
+            'entries': len(self._entries),
+            'max_entries': self.max_entries,
+            'hits': self.hits,
+            'misses': self.misses,
+        }
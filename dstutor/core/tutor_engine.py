@@ -2,12 +2,16 @@
 Core orchestration engine for DS-Tutor
 """
 
-from typing import Dict, Optional, List, Any
+from typing import Dict, Optional, List, Any, Tuple
 from pathlib import Path
 from ..curriculum.lesson_loader import LessonLoader
+from ..curriculum.prefetch import LessonPrefetcher
 from ..utils.progress_tracker import ProgressTracker
 from ..ui.cell_injector import CellInjector
 from .validator import CodeValidator
+from .sandbox import SandboxPool, ResourceLimitExceeded, DEFAULT_MAX_RUNS
+from .submission_memo import SubmissionMemo
+from .rules import RuleError, get_plan
 from ..llm.feedback_engine import FeedbackEngine
 import os
 
@@ -35,9 +39,11 @@ class TutorEngine:
 
         # Initialize components
         self.lesson_loader = LessonLoader()
+        self.prefetcher = LessonPrefetcher(self.lesson_loader)
         self.progress_tracker = ProgressTracker(user_id)
         self.cell_injector = CellInjector()
         self.validator = CodeValidator()
+        self.submission_memo = SubmissionMemo()
 
         # Initialize LLM feedback engine (if API key available)
         api_key = os.getenv("ANTHROPIC_API_KEY")
@@ -50,14 +56,48 @@ class TutorEngine:
         self.current_exercise_id = None
         self.hints_used = 0
 
+        # Output area of the displayed lesson while lessons are being watched
+        self._lesson_output = None
+        self._lesson_stale = False  # Set by the watcher thread, redrawn after the next cell
+
+        # Completed lessons, loaded once and kept in sync as lessons complete
+        self._completed_lessons = None
+        self._completed_mask = None  # (prerequisite graph, bitmask)
+
         # Configuration
         self.config = {
-            'auto_validate': True,
+            'auto_validate': False,  # Check cells that assign the checked variables as they run
+            'auto_validate_delay': 0.5,  # Seconds without a re-run before auto-validating
             'hint_style': 'progressive',
             'feedback_verbosity': 'normal',
             'difficulty': 'medium',
+            'prefetch': True,
+            'sandbox': True,
+            'sandbox_workers': 1,
+            'sandbox_max_runs': DEFAULT_MAX_RUNS,
+            'memoize_submissions': True,
+            'check_mode': 'rerun',  # 'live': check the kernel's variables instead of re-running the cell
         }
 
+        # Run submissions in warm worker processes, started ahead of the first check
+        self.sandbox = None
+        if self.config['sandbox']:
+            self.sandbox = SandboxPool(
+                workers=self.config['sandbox_workers'],
+                max_runs=self.config['sandbox_max_runs']
+            )
+            self.sandbox.start()
+            self.validator.sandbox = self.sandbox
+
+    def close(self):
+        """Stop the sandbox workers, lesson watcher and prefetcher"""
+        self.prefetcher.cancel()
+        self.lesson_loader.unwatch()
+        if self.sandbox is not None:
+            self.sandbox.shutdown()
+            self.sandbox = None
+            self.validator.sandbox = None
+
     def start_topic(self, topic: str) -> Dict[str, Any]:
         """
         Start learning a topic
@@ -68,6 +108,8 @@ class TutorEngine:
         Returns:
             dict with 'success' and 'message' keys
         """
+        self.prefetcher.cancel()
+
         try:
             # Load first lesson of topic
             first_lesson = self.lesson_loader.get_first_lesson(topic)
@@ -86,7 +128,8 @@ class TutorEngine:
             return {
                 'success': True,
                 'message': f'Started topic: {topic}',
-                'lesson': first_lesson
+                'lesson': first_lesson,
+                'missing_prerequisites': self.get_missing_prerequisites(first_lesson['id'])
             }
 
         except Exception as e:
@@ -104,6 +147,7 @@ class TutorEngine:
             # Mark current lesson as completed
             if self.current_lesson_id:
                 self.progress_tracker.mark_lesson_complete(self.current_lesson_id)
+                self._record_completed_lesson(self.current_lesson_id)
 
             # Get next lesson
             next_lesson = self.lesson_loader.get_next_lesson(
@@ -135,6 +179,8 @@ class TutorEngine:
         if not self.current_lesson_id:
             return {'success': False, 'message': 'No active lesson'}
 
+        self.prefetcher.cancel()
+
         try:
             prev_lesson = self.lesson_loader.get_previous_lesson(
                 self.current_topic,
@@ -162,6 +208,8 @@ class TutorEngine:
 
     def goto_lesson(self, lesson_id: str) -> Dict[str, Any]:
         """Jump to a specific lesson"""
+        self.prefetcher.cancel()
+
         try:
             lesson = self.lesson_loader.get_lesson_by_id(lesson_id)
 
@@ -176,7 +224,30 @@ class TutorEngine:
             return {
                 'success': True,
                 'message': f'Jumped to lesson: {lesson_id}',
-                'lesson': lesson
+                'lesson': lesson,
+                'missing_prerequisites': self.get_missing_prerequisites(lesson_id)
+            }
+
+        except Exception as e:
+            return {'success': False, 'message': f'Error: {str(e)}'}
+
+    def search_lessons(self, query: str, limit: int = 10) -> Dict[str, Any]:
+        """
+        Search the curriculum for lessons covering the query terms
+
+        Args:
+            query: Search terms (e.g. 'merge pivot')
+            limit: Maximum number of results
+
+        Returns:
+            dict with success status and the matching lessons
+        """
+        try:
+            results = self.lesson_loader.search_lessons(query, limit)
+            return {
+                'success': True,
+                'message': f'{len(results)} lesson(s) found for "{query}"',
+                'results': results
             }
 
         except Exception as e:
@@ -187,15 +258,82 @@ class TutorEngine:
         if not self.current_lesson:
             return
 
+        if not self.lesson_loader.is_watching:
+            self._render_current_lesson()
+        else:
+            # Render into an output widget so hot-reloads can redraw it in place
+            import ipywidgets as widgets
+            from IPython.display import display
+
+            self._lesson_output = widgets.Output()
+            display(self._lesson_output)
+            with self._lesson_output:
+                self._render_current_lesson()
+
+        # Warm the next lesson while this one is being read
+        if self.config.get('prefetch') and self.current_topic:
+            self.prefetcher.prefetch(self.current_topic, self.current_lesson_id)
+
+    def watch_lessons(self, enabled: bool = True, interval: float = 1.0) -> Dict[str, Any]:
+        """
+        Enable or disable hot-reloading of lesson files (for lesson authors)
+
+        Args:
+            enabled: Whether to watch the lessons directory
+            interval: Polling interval in seconds when watchdog isn't installed
+
+        Returns:
+            dict with 'success' and 'message' keys
+        """
+        if not enabled:
+            self.lesson_loader.unwatch()
+            self._lesson_output = None
+            return {'success': True, 'message': 'Stopped watching lessons'}
+
+        try:
+            self.lesson_loader.watch(on_change=self._on_lessons_changed, interval=interval)
+            mode = self.lesson_loader._watcher.mode
+            return {
+                'success': True,
+                'message': f'Watching {self.lesson_loader.lessons_dir} for changes ({mode})'
+            }
+        except Exception as e:
+            return {'success': False, 'message': f'Error watching lessons: {str(e)}'}
+
+    def _on_lessons_changed(self, lesson_ids):
+        """Reload and redraw the current lesson if its file changed"""
+        if self.current_lesson_id not in lesson_ids:
+            return
+
+        lesson = self.lesson_loader.get_lesson_by_id(self.current_lesson_id)
+        if not lesson:
+            return
+        self.current_lesson = lesson
+
+        # Widget output can't be captured from the watcher thread, so the
+        # redraw waits for the kernel's next post_run_cell
+        if self._lesson_output is not None:
+            self._lesson_stale = True
+
+    def redraw_changed_lesson(self, result=None):
+        """Redraw the displayed lesson if its file changed (post_run_cell hook)"""
+        output = self._lesson_output
+        if not self._lesson_stale or output is None:
+            return
+        self._lesson_stale = False
+        output.clear_output(wait=True)
+        with output:
+            self._render_current_lesson()
+
+    def _render_current_lesson(self):
+        """Render the current lesson's header, content and navigation"""
         from IPython.display import display, HTML
 
         lesson = self.current_lesson
         topic = self.current_topic or "Unknown"
 
         # Display lesson header
-        all_lessons = self.lesson_loader.get_topic_lessons(topic)
-        current_index = next((i for i, l in enumerate(all_lessons) if l['id'] == lesson['id']), 0)
-        total_lessons = len(all_lessons)
+        current_index, total_lessons = self.lesson_loader.get_lesson_position(topic, lesson['id'])
         progress_pct = ((current_index + 1) / total_lessons * 100) if total_lessons > 0 else 0
 
         header_html = f"""
@@ -239,13 +377,21 @@ class TutorEngine:
         """
         display(HTML(nav_html))
 
-    def validate_exercise(self, user_code: str, exercise_id: str = None) -> Dict[str, Any]:
+    def validate_exercise(self,
+                          user_code: str,
+                          exercise_id: str = None,
+                          ai_feedback: bool = True,
+                          record_attempt: bool = True) -> Dict[str, Any]:
         """
         Validate user's exercise solution
 
         Args:
             user_code: The code submitted by the user
             exercise_id: Optional exercise ID (uses current if not provided)
+            ai_feedback: Ask the LLM for feedback on wrong answers
+                (auto-validation only reports the verdict)
+            record_attempt: Count the check as an attempt in the learner's
+                progress (auto-validation doesn't)
 
         Returns:
             dict with validation results
@@ -258,14 +404,101 @@ class TutorEngine:
             return {'success': False, 'message': 'Current lesson has no exercise'}
 
         try:
+            # Identical code already checked against this exercise: same verdict
+            memo_key = SubmissionMemo.key(exercise, user_code) if self.config['memoize_submissions'] else None
+            cached = self.submission_memo.get(memo_key) if memo_key else None
+            if cached is not None:
+                if record_attempt:
+                    self.progress_tracker.record_exercise_attempt(
+                        exercise_id or self.current_lesson['id'],
+                        user_code,
+                        cached['is_correct'],
+                        self.hints_used
+                    )
+                cached['cached'] = True
+                return cached
+
             # Validate the code
-            is_correct, feedback = self.validator.validate(
-                user_code,
+            limit_exceeded = None
+            try:
+                is_correct, feedback = self.validator.validate(
+                    user_code,
+                    exercise.get('solution'),
+                    exercise.get('validation', {}),
+                    exercise.get('setup_code', '')
+                )
+            except ResourceLimitExceeded as e:
+                is_correct, feedback, limit_exceeded = False, str(e), e.limit
+
+            result = self._finish_validation(exercise, exercise_id, user_code, is_correct, feedback,
+                                             limit_exceeded, ai_feedback, record_attempt)
+
+            # Limits depend on the machine's load, check those again. Verdicts
+            # missing their AI feedback are not reused for explicit checks
+            if memo_key and not limit_exceeded and (ai_feedback or is_correct or not self.feedback_engine):
+                self.submission_memo.put(memo_key, result)
+            return result
+
+        except Exception as e:
+            return {
+                'success': False,
+                'message': f'Validation error: {str(e)}'
+            }
+
+    def validate_namespace(self,
+                           namespace: Dict[str, Any],
+                           user_code: str = '',
+                           exercise_id: str = None) -> Dict[str, Any]:
+        """
+        Validate the variables the user's code already created
+
+        Nothing is executed: the variables ('result' or the ones the checks
+        name) are read from the namespace in place, so expensive cells don't
+        run twice and cells may build on earlier ones.
+
+        Args:
+            namespace: The kernel's user namespace
+            user_code: Code of the last executed cell (recorded with the
+                attempt and checked for forbidden constructs)
+            exercise_id: Optional exercise ID (uses current if not provided)
+
+        Returns:
+            dict with validation results
+        """
+        if not self.current_lesson:
+            return {'success': False, 'message': 'No active lesson'}
+
+        exercise = self.current_lesson.get('exercise')
+        if not exercise:
+            return {'success': False, 'message': 'Current lesson has no exercise'}
+
+        try:
+            is_correct, feedback = self.validator.validate_namespace(
+                namespace,
                 exercise.get('solution'),
-                exercise.get('validation', {})
+                exercise.get('validation', {}),
+                exercise.get('setup_code', ''),
+                user_code
             )
+            return self._finish_validation(exercise, exercise_id, user_code, is_correct, feedback)
+
+        except Exception as e:
+            return {
+                'success': False,
+                'message': f'Validation error: {str(e)}'
+            }
 
-            # Record attempt
+    def _finish_validation(self,
+                           exercise: Dict,
+                           exercise_id: Optional[str],
+                           user_code: str,
+                           is_correct: bool,
+                           feedback: str,
+                           limit_exceeded: Optional[str] = None,
+                           ai_feedback: bool = True,
+                           record_attempt: bool = True) -> Dict[str, Any]:
+        """Record a validation attempt and build its result"""
+        if record_attempt:
             self.progress_tracker.record_exercise_attempt(
                 exercise_id or self.current_lesson['id'],
                 user_code,
@@ -273,27 +506,41 @@ class TutorEngine:
                 self.hints_used
             )
 
-            # Generate AI feedback if available
-            if self.feedback_engine and not is_correct:
-                ai_feedback = self.feedback_engine.generate_feedback(
-                    exercise_context=exercise,
-                    user_code=user_code,
-                    is_correct=is_correct,
-                    error_message=feedback
-                )
-                feedback = ai_feedback
+        # Generate AI feedback if available (limit messages already say what to fix)
+        if self.feedback_engine and ai_feedback and not is_correct and not limit_exceeded:
+            feedback = self.feedback_engine.generate_feedback(
+                exercise_context=exercise,
+                user_code=user_code,
+                is_correct=is_correct,
+                error_message=feedback
+            )
 
-            return {
-                'success': True,
-                'is_correct': is_correct,
-                'feedback': feedback
-            }
+        return {
+            'success': True,
+            'is_correct': is_correct,
+            'feedback': feedback,
+            'limit_exceeded': limit_exceeded
+        }
 
-        except Exception as e:
-            return {
-                'success': False,
-                'message': f'Validation error: {str(e)}'
-            }
+    def checked_variables(self) -> Tuple[str, ...]:
+        """Names of the variables the current exercise's validation reads"""
+        plan = self._current_plan()
+        return plan.variables if plan else ()
+
+    def checks_plot(self) -> bool:
+        """Whether the current exercise checks the drawn figure (plot_check)"""
+        plan = self._current_plan()
+        return bool(plan) and plan.target == 'plot'
+
+    def _current_plan(self):
+        """Compiled validation plan of the current exercise, None without one"""
+        exercise = (self.current_lesson or {}).get('exercise')
+        if not exercise:
+            return None
+        try:
+            return get_plan(exercise.get('validation', {}))
+        except RuleError:
+            return None
 
     def get_hint(self, level: int = 1) -> Optional[str]:
         """
@@ -355,10 +602,72 @@ class TutorEngine:
         """
         Get all available topics organized by level
 
+        Topic status reflects the user's progress: 'completed', 'in_progress',
+        'available' when the first lesson's prerequisites are done, else 'locked'.
+
         Returns:
             dict mapping level names to lists of topics
         """
-        return self.lesson_loader.get_all_topics()
+        topics = self.lesson_loader.get_all_topics()
+        graph, completed = self._get_completed_mask()
+
+        for level_topics in topics.values():
+            for topic in level_topics:
+                lesson_ids = self.lesson_loader.get_topic_lesson_ids(topic['id'])
+                if not lesson_ids:
+                    continue  # Planned topic or sample lessons only
+
+                topic_mask = graph.mask(lesson_ids)
+                if topic_mask & completed == topic_mask:
+                    topic['status'] = 'completed'
+                elif topic_mask & completed:
+                    topic['status'] = 'in_progress'
+                elif graph.is_unlocked(lesson_ids[0], completed):
+                    topic['status'] = 'available'
+                else:
+                    topic['status'] = 'locked'
+
+        return topics
+
+    def is_lesson_unlocked(self, lesson_id: str) -> bool:
+        """Check whether all prerequisites of a lesson are completed"""
+        graph, completed = self._get_completed_mask()
+        return graph.is_unlocked(lesson_id, completed)
+
+    def get_missing_prerequisites(self, lesson_id: str) -> List[str]:
+        """
+        List prerequisites of a lesson the user hasn't completed yet
+
+        Args:
+            lesson_id: Lesson identifier
+
+        Returns:
+            Lesson ids in recommended order (empty if unlocked)
+        """
+        graph, completed = self._get_completed_mask()
+        return graph.missing_prerequisites(lesson_id, completed)
+
+    def _get_completed_mask(self):
+        """Get (prerequisite graph, completed lessons bitmask), querying SQLite once"""
+        graph = self.lesson_loader.get_prerequisite_graph()
+
+        if self._completed_lessons is None:
+            self._completed_lessons = self.progress_tracker.get_completed_lessons()
+
+        # The graph is replaced when lessons are reloaded, bits may move
+        if self._completed_mask is None or self._completed_mask[0] is not graph:
+            self._completed_mask = (graph, graph.mask(self._completed_lessons))
+
+        return self._completed_mask
+
+    def _record_completed_lesson(self, lesson_id: str):
+        """Add a lesson to the cached completed set and mask"""
+        if self._completed_lessons is None:
+            return  # Loaded from the database on first use
+        self._completed_lessons.add(lesson_id)
+        if self._completed_mask is not None:
+            graph, mask = self._completed_mask
+            self._completed_mask = (graph, mask | graph.mask([lesson_id]))
 
     def get_config(self) -> Dict[str, Any]:
         """Get current configuration"""
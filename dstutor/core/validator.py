@@ -4,16 +4,209 @@ Code validation system for exercises
 
 import pandas as pd
 import numpy as np
-from typing import Dict, Any, Tuple, Optional
+from typing import Dict, Any, Iterable, Tuple, Optional
 import traceback
+import hashlib
+import importlib
+import importlib.util
+import numbers
+import os
+import pickle
 import sys
+import tempfile
+from collections import OrderedDict
+from contextlib import contextmanager, nullcontext, redirect_stdout
 from io import StringIO
+from .sandbox import (
+    SandboxError, SandboxUnavailable, ResourceLimits, ResourceLimitExceeded,
+    MemoryExceeded, OutputLimitExceeded, wall_clock_limit
+)
+from .solution_cache import SolutionCache
+from .compare import compare_frames, compare_series, find_mismatch
+from .rules import RuleError, ValidationPlan, compare_value, get_plan
+from .plot_check import figure_scope, find_figure
+from .static_check import precheck
+
+
+class LazyModule:
+    """Stand-in for a module that imports it on first attribute access"""
+
+    __slots__ = ('_name', '_module')
+
+    def __init__(self, name: str):
+        """
+        Initialize lazy module
+
+        Args:
+            name: Dotted module name (e.g. 'matplotlib.pyplot')
+        """
+        self._name = name
+        self._module = None
+
+    @property
+    def is_loaded(self) -> bool:
+        """Whether the module has been imported"""
+        return self._module is not None
+
+    def _load(self):
+        if self._module is None:
+            self._module = importlib.import_module(self._name)
+        return self._module
+
+    def __getattr__(self, attr: str) -> Any:
+        return getattr(self._load(), attr)
+
+    def __dir__(self):
+        return dir(self._load())
+
+    def __repr__(self) -> str:
+        if self._module is not None:
+            return repr(self._module)
+        return f"<lazy module '{self._name}'>"
+
+
+def _build_namespace_template() -> Dict[str, Any]:
+    """Names available to submitted code; plotting libraries import on first use"""
+    template = {
+        '__builtins__': __builtins__,
+        'pd': pd,
+        'np': np,
+    }
+    for alias, module in (('plt', 'matplotlib.pyplot'), ('sns', 'seaborn')):
+        if importlib.util.find_spec(module.partition('.')[0]) is not None:
+            template[alias] = LazyModule(module)
+    return template
+
+
+# Execution namespaces are shallow copies of this template
+_NAMESPACE_TEMPLATE = _build_namespace_template()
+
+# Setup snapshots kept per validator (one per recently checked exercise)
+MAX_SETUP_SNAPSHOTS = 8
+
+_MISSING = object()
+
+UNLIMITED_NOTE = "Note: this check ran in your kernel without the code sandbox, so no time or memory limits applied."
+
+
+def _picklable(value: Any) -> bool:
+    """Whether a value can be pickled"""
+    try:
+        pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        return True
+    except Exception:
+        return False
+
+
+class NamespaceSnapshot:
+    """
+    State left by an exercise's setup code, restorable any number of times
+
+    Picklable values are pickled together (so objects sharing data stay
+    shared) and unpickled into every restored namespace, which protects the
+    snapshot from in-place changes made by the learner's code. Modules,
+    functions defined in the setup and other unpicklable values are shared.
+    """
+
+    def __init__(self, namespace: Dict[str, Any]):
+        """
+        Initialize namespace snapshot
+
+        Args:
+            namespace: Namespace after running the setup code
+        """
+        values = {
+            name: value for name, value in namespace.items()
+            if _NAMESPACE_TEMPLATE.get(name, _MISSING) is not value
+        }
+
+        self._shared = {}
+        for name, value in list(values.items()):
+            if isinstance(value, (type(sys), LazyModule)) or (callable(value) and not _picklable(value)):
+                self._shared[name] = values.pop(name)
+
+        try:
+            self._pickled = pickle.dumps(values, protocol=pickle.HIGHEST_PROTOCOL)
+        except Exception:
+            # Find the offending values and share them instead
+            for name in [name for name, value in values.items() if not _picklable(value)]:
+                self._shared[name] = values.pop(name)
+            self._pickled = pickle.dumps(values, protocol=pickle.HIGHEST_PROTOCOL)
+
+    def restore(self) -> Dict[str, Any]:
+        """Create a fresh execution namespace holding the setup state"""
+        namespace = dict(_NAMESPACE_TEMPLATE)
+        namespace.update(self._shared)
+        namespace.update(pickle.loads(self._pickled))
+        return namespace
+
+
+class _CappedOutput(StringIO):
+    """Captured stdout that stops the code once it printed too much"""
+
+    def __init__(self, limits: ResourceLimits):
+        super().__init__()
+        self.limits = limits
+        self.size = 0
+
+    def write(self, s: str) -> int:
+        self.size += len(s)
+        if self.size > self.limits.max_output_bytes:
+            raise OutputLimitExceeded(self.limits.message('output'))
+        return super().write(s)
+
+
+@contextmanager
+def scratch_directory():
+    """
+    Run code in an empty temporary working directory
+
+    Files written by the code (plt.savefig, df.to_csv) land there instead of
+    the learner's directory. The previous directory is restored afterwards.
+    """
+    previous = os.getcwd()
+    with tempfile.TemporaryDirectory(prefix='dstutor-') as path:
+        os.chdir(path)
+        try:
+            yield path
+        finally:
+            os.chdir(previous)
+
+
+def _strip_setup(user_code: str, setup_code: str) -> str:
+    """User code without the exercise's setup code pasted in front of it"""
+    setup = (setup_code or '').strip()
+    if setup and user_code.lstrip().startswith(setup):
+        return user_code.lstrip()[len(setup):]
+    return user_code
+
+
+def _invalid_rules_message(error: RuleError) -> str:
+    return f"This exercise's validation rules are invalid ({error}). This is a problem with the lesson, not your code."
 
 
 class CodeValidator:
     """Validates user code against expected results"""
 
-    def __init__(self):
+    def __init__(self,
+                 sandbox=None,
+                 solution_cache: Optional[SolutionCache] = None,
+                 wall_clock_limit: bool = True):
+        """
+        Initialize code validator
+
+        Args:
+            sandbox: SandboxPool to run submissions in; None runs them in
+                the current process
+            solution_cache: Cache of reference solution results for
+                'solution_check' validation
+            wall_clock_limit: Enforce the timeout on code run in the current
+                process (disabled in sandbox workers, where the pool does)
+        """
+        self.sandbox = sandbox
+        self.wall_clock_limit = wall_clock_limit
+        self.solution_cache = solution_cache or SolutionCache()
+        self._setup_snapshots = OrderedDict()  # setup code hash -> NamespaceSnapshot
         self.allowed_imports = {
             'numpy': np,
             'np': np,
@@ -28,7 +221,8 @@ class CodeValidator:
     def validate(self,
                  user_code: str,
                  expected_result: Any,
-                 validation_rules: Dict) -> Tuple[bool, str]:
+                 validation_rules: Dict,
+                 setup_code: str = '') -> Tuple[bool, str]:
         """
         Execute user code and validate against expected result
 
@@ -36,326 +230,370 @@ class CodeValidator:
             user_code: The code submitted by user
             expected_result: Expected solution (for reference)
             validation_rules: Validation configuration
+            setup_code: Exercise setup code; it runs once and later checks
+                start from a snapshot of the state it leaves behind
 
         Returns:
             (is_correct, feedback_message)
-        """
-        # Create execution namespace
-        namespace = self._create_namespace()
-
-        # Capture stdout
-        old_stdout = sys.stdout
-        sys.stdout = captured_output = StringIO()
 
+        Raises:
+            ResourceLimitExceeded: TimeoutExceeded, MemoryExceeded or
+                OutputLimitExceeded when the code hits a limit from
+                ResourceLimits (overridable in the 'limits' validation key)
+        """
         try:
-            # Execute user code
-            exec(user_code, namespace)
+            plan = get_plan(validation_rules)
+        except RuleError as e:
+            return False, _invalid_rules_message(e)
 
-            # Restore stdout
-            sys.stdout = old_stdout
+        # Setup pasted into the solution has already run
+        user_code = _strip_setup(user_code, setup_code)
 
-            # Check if validation has multiple variable checks
-            validation_type = validation_rules.get('type', 'value_check')
-            checks = validation_rules.get('checks', [])
+        # Submissions that can't pass are rejected without running them
+        message = precheck(user_code, plan.variables, plan.forbidden, plan.required, setup_code)
+        if message is not None:
+            return False, message
 
-            # If we have a checks array with variable definitions, validate those
-            if checks and isinstance(checks, list) and len(checks) > 0:
-                # Check if first item has 'variable' key (multi-variable validation)
-                if 'variable' in checks[0]:
-                    return self._validate_variables(namespace, checks)
+        if self.sandbox is not None:
+            try:
+                return self.sandbox.run(user_code, expected_result, validation_rules, setup_code)
+            except SandboxUnavailable as e:
+                print(f"Warning: {e}. Running submissions in the kernel.")
+                self.sandbox = None
+            except ResourceLimitExceeded:
+                raise
+            except SandboxError as e:
+                return False, str(e)
+
+        limits = ResourceLimits.from_rules(validation_rules)
+        with self._time_limit(limits) as limited:
+            is_correct, message = self._run_in_process(user_code, expected_result, plan, setup_code, limits)
+        if not limited:
+            message = f"{message}\n\n{UNLIMITED_NOTE}"
+        return is_correct, message
+
+    def _time_limit(self, limits: ResourceLimits):
+        """Wall-clock limit of code run in this process; yields whether it is enforced"""
+        if not self.wall_clock_limit:
+            return nullcontext(True)  # Enforced by the sandbox pool
+        return wall_clock_limit(limits)
+
+    def _run_in_process(self,
+                        user_code: str,
+                        expected_result: Any,
+                        plan: ValidationPlan,
+                        setup_code: str,
+                        limits: ResourceLimits) -> Tuple[bool, str]:
+        """Execute user code in this process and validate it (see validate())"""
+        # Printed output is capped, and restored however the code exits
+        captured_output = _CappedOutput(limits)
 
-            # Otherwise, check for single 'result' variable
-            if 'result' not in namespace:
-                return False, "Please store your answer in a variable called 'result'"
+        try:
+            # Create execution namespace holding the exercise's setup state
+            try:
+                with redirect_stdout(captured_output):
+                    namespace = self._create_namespace(setup_code)
+            except (ResourceLimitExceeded, MemoryError):
+                raise
+            except Exception as e:
+                return False, f"Exercise setup code failed ({type(e).__name__}: {str(e)}). This is a problem with the lesson, not your code."
 
-            user_result = namespace['result']
+            # Plots are drawn on a fresh figure, closed after the check
+            with figure_scope() if plan.target == 'plot' else nullcontext():
+                # Execute user code
+                with redirect_stdout(captured_output):
+                    exec(user_code, namespace)
 
-            # Apply validation rules
-            return self._apply_validation_rules(
-                user_result,
-                expected_result,
-                validation_rules
-            )
+                return self._check_namespace(namespace, expected_result, plan, setup_code)
 
         except SyntaxError as e:
-            sys.stdout = old_stdout
             return False, f"Syntax Error: {str(e)}\nCheck your code for typos."
 
         except NameError as e:
-            sys.stdout = old_stdout
             return False, f"Name Error: {str(e)}\nMake sure all variables are defined."
 
+        except ResourceLimitExceeded:
+            raise
+
+        except MemoryError:
+            raise MemoryExceeded(limits.message('memory'))
+
         except Exception as e:
-            sys.stdout = old_stdout
             error_type = type(e).__name__
             return False, f"{error_type}: {str(e)}"
 
-    def _create_namespace(self) -> Dict:
-        """Create safe execution namespace with allowed imports"""
-        namespace = {
-            '__builtins__': __builtins__,
-            'pd': pd,
-            'np': np,
-        }
-
-        # Add matplotlib if needed
-        try:
-            import matplotlib.pyplot as plt
-            import seaborn as sns
-            namespace['plt'] = plt
-            namespace['sns'] = sns
-        except ImportError:
-            pass
-
-        return namespace
-
-    def _apply_validation_rules(self,
-                                 user_result: Any,
-                                 expected: Any,
-                                 rules: Dict) -> Tuple[bool, str]:
+    def validate_namespace(self,
+                           namespace: Dict,
+                           expected_result: Any,
+                           validation_rules: Dict,
+                           setup_code: str = '',
+                           user_code: str = '') -> Tuple[bool, str]:
         """
-        Apply validation rules based on validation type
+        Validate variables that already exist, without executing any code
+
+        Used to check the live kernel namespace: the values are read in
+        place, so a check costs only the comparison.
 
         Args:
-            user_result: User's result
-            expected: Expected result (reference)
-            rules: Validation configuration
+            namespace: Namespace holding the user's variables (e.g. the
+                kernel's user_ns); it is never modified
+            expected_result: Expected solution (for reference)
+            validation_rules: Validation configuration
+            setup_code: Exercise setup code
+            user_code: The code the variables came from, if known; used for
+                the lesson's forbidden and required constructs
 
         Returns:
             (is_correct, feedback_message)
         """
-        validation_type = rules.get('type', 'value_check')
-
-        if validation_type == 'dataframe_check':
-            return self._validate_dataframe(user_result, rules.get('checks', []))
-
-        elif validation_type == 'array_check':
-            return self._validate_array(user_result, rules.get('checks', []))
-
-        elif validation_type == 'value_check':
-            return self._validate_value(
-                user_result,
-                expected,
-                rules.get('tolerance', 0.001)
-            )
+        try:
+            plan = get_plan(validation_rules)
+        except RuleError as e:
+            return False, _invalid_rules_message(e)
 
-        elif validation_type == 'type_check':
-            return self._validate_type(user_result, rules.get('expected_type'))
+        # Variables may come from earlier cells, so only constructs are checked
+        if user_code and (plan.forbidden or plan.required):
+            message = precheck(_strip_setup(user_code, setup_code), (), plan.forbidden, plan.required)
+            if message is not None:
+                return False, message
 
-        elif validation_type == 'function_check':
-            return self._validate_function(user_result, rules.get('test_cases', []))
+        try:
+            return self._check_namespace(namespace, expected_result, plan, setup_code)
+        except (ResourceLimitExceeded, MemoryError):
+            raise
+        except Exception as e:
+            return False, f"{type(e).__name__}: {str(e)}"
 
-        elif validation_type == 'shape_check':
-            return self._validate_shape(user_result, rules.get('expected_shape'))
+    def _check_namespace(self,
+                         namespace: Dict,
+                         expected_result: Any,
+                         plan: ValidationPlan,
+                         setup_code: str) -> Tuple[bool, str]:
+        """
+        Apply a validation plan to the variables of a namespace
 
-        else:
-            return False, f"Unknown validation type: {validation_type}"
-
-    def _validate_dataframe(self, df: Any, checks: list) -> Tuple[bool, str]:
-        """Validate DataFrame properties"""
-
-        # Check if it's actually a DataFrame
-        if not isinstance(df, pd.DataFrame):
-            return False, f"Expected pandas DataFrame, got {type(df).__name__}"
-
-        for check in checks:
-            check_type = check.get('type')
-
-            if check_type == 'shape':
-                expected_shape = tuple(check['expected'])
-                if df.shape != expected_shape:
-                    return False, f"Shape mismatch: got {df.shape}, expected {expected_shape}"
-
-            elif check_type == 'columns':
-                expected_cols = check['expected']
-                if list(df.columns) != expected_cols:
-                    return False, f"Column mismatch: got {list(df.columns)}, expected {expected_cols}"
-
-            elif check_type == 'dtypes':
-                for col, expected_dtype in check['expected'].items():
-                    if col not in df.columns:
-                        return False, f"Column '{col}' not found"
-                    if str(df[col].dtype) != expected_dtype:
-                        return False, f"Column '{col}' has wrong dtype: {df[col].dtype}"
-
-            elif check_type == 'values':
-                expected_values = check.get('expected_values')
-                if expected_values:
-                    actual_values = df.values.tolist()
-                    if actual_values != expected_values:
-                        return False, "Values don't match expected result"
-
-            elif check_type == 'not_empty':
-                if df.empty:
-                    return False, "DataFrame is empty"
-
-            elif check_type == 'no_nulls':
-                if df.isnull().any().any():
-                    return False, "DataFrame contains null values"
+        Args:
+            namespace: Namespace containing user's variables
+            expected_result: Expected solution (for reference)
+            plan: Compiled validation rules
+            setup_code: Exercise setup code
 
-        return True, "Correct! ✅"
+        Returns:
+            (is_correct, feedback_message)
+        """
+        # Compare against the reference solution's results
+        if plan.target == 'solution':
+            return self._validate_against_solution(namespace, expected_result, plan, setup_code)
 
-    def _validate_array(self, arr: Any, checks: list) -> Tuple[bool, str]:
-        """Validate NumPy array properties"""
+        # Checks naming variables validate those instead of 'result'
+        if plan.target == 'variables':
+            return plan.check_variables(namespace)
 
-        # Check if it's a numpy array
-        if not isinstance(arr, np.ndarray):
-            return False, f"Expected numpy array, got {type(arr).__name__}"
+        # Plot checks inspect the figure the code drew
+        if plan.target == 'plot':
+            figure = find_figure(namespace)
+            if figure is None:
+                return False, "No plot found. Draw your plot with matplotlib (or store the figure with result = plt.gcf())"
+            return plan.check_result(figure, expected_result)
 
-        for check in checks:
-            check_type = check.get('type')
+        # Otherwise, check for single 'result' variable
+        if 'result' not in namespace:
+            return False, "Please store your answer in a variable called 'result'"
 
-            if check_type == 'shape':
-                expected_shape = tuple(check['expected'])
-                if arr.shape != expected_shape:
-                    return False, f"Shape mismatch: got {arr.shape}, expected {expected_shape}"
+        return plan.check_result(namespace['result'], expected_result)
 
-            elif check_type == 'dtype':
-                expected_dtype = check['expected']
-                if str(arr.dtype) != expected_dtype:
-                    return False, f"Dtype mismatch: got {arr.dtype}, expected {expected_dtype}"
+    def _create_namespace(self, setup_code: str = '') -> Dict:
+        """
+        Create safe execution namespace with allowed imports
 
-            elif check_type == 'values':
-                expected_values = np.array(check['expected'])
-                if not np.allclose(arr, expected_values, rtol=1e-5, atol=1e-8):
-                    return False, "Values don't match expected result"
+        Args:
+            setup_code: Exercise setup code to run (once, then snapshotted)
 
-            elif check_type == 'min_max':
-                if 'min' in check and arr.min() < check['min']:
-                    return False, f"Minimum value {arr.min()} is below expected {check['min']}"
-                if 'max' in check and arr.max() > check['max']:
-                    return False, f"Maximum value {arr.max()} is above expected {check['max']}"
+        Returns:
+            Fresh namespace dictionary
+        """
+        if not setup_code or not setup_code.strip():
+            return dict(_NAMESPACE_TEMPLATE)
 
-        return True, "Correct! ✅"
+        key = hashlib.sha1(setup_code.encode('utf-8')).hexdigest()
+        snapshot = self._setup_snapshots.get(key)
+        if snapshot is not None:
+            self._setup_snapshots.move_to_end(key)
+        else:
+            namespace = dict(_NAMESPACE_TEMPLATE)
+            exec(setup_code, namespace)
+            snapshot = NamespaceSnapshot(namespace)
+            self._setup_snapshots[key] = snapshot
+            while len(self._setup_snapshots) > MAX_SETUP_SNAPSHOTS:
+                self._setup_snapshots.popitem(last=False)
+
+        return snapshot.restore()
+
+    def reference_results(self,
+                          solution: str,
+                          setup_code: str = '',
+                          variables: Iterable[str] = ('result',)) -> Dict[str, Any]:
+        """
+        Get the variables produced by an exercise's reference solution
 
-    def _validate_value(self,
-                        user_value: Any,
-                        expected_value: Any,
-                        tolerance: float = 0.001) -> Tuple[bool, str]:
-        """Validate a single value"""
+        The solution runs once, in a sandbox worker when there is one;
+        later calls are served from the solution cache (in memory, then on
+        disk).
 
-        # Check type match
-        if type(user_value) != type(expected_value):
-            return False, f"Type mismatch: got {type(user_value).__name__}, expected {type(expected_value).__name__}"
+        Args:
+            solution: Reference solution code
+            setup_code: Exercise setup code
+            variables: Names of the variables to compare
 
-        # Numeric comparison with tolerance
-        if isinstance(expected_value, (int, float, np.number)):
-            if abs(user_value - expected_value) <= tolerance:
-                return True, "Correct! ✅"
-            else:
-                return False, f"Value mismatch: got {user_value}, expected {expected_value}"
+        Returns:
+            variable name -> reference value
 
-        # Exact comparison for other types
-        if user_value == expected_value:
-            return True, "Correct! ✅"
-        else:
-            return False, f"Value mismatch: got {user_value}, expected {expected_value}"
-
-    def _validate_type(self, result: Any, expected_type: str) -> Tuple[bool, str]:
-        """Validate type of result"""
-
-        type_map = {
-            'DataFrame': pd.DataFrame,
-            'Series': pd.Series,
-            'ndarray': np.ndarray,
-            'list': list,
-            'dict': dict,
-            'int': int,
-            'float': float,
-            'str': str,
-        }
+        Raises:
+            ValueError: If the solution doesn't define a variable
+            SandboxError: If the solution crashed its worker or its values
+                can't be sent back from it
+        """
+        variables = list(variables)
+        key = SolutionCache.key(setup_code, solution, variables)
+
+        values = self.solution_cache.get(key)
+        if values is None:
+            if self.sandbox is not None:
+                try:
+                    values = self.sandbox.reference_results(solution, setup_code, variables)
+                except SandboxUnavailable as e:
+                    print(f"Warning: {e}. Running submissions in the kernel.")
+                    self.sandbox = None
+            if values is None:
+                values = self.run_reference(solution, setup_code, variables)
+            self.solution_cache.put(key, values)
+
+        return values
+
+    def run_reference(self,
+                      solution: str,
+                      setup_code: str = '',
+                      variables: Iterable[str] = ('result',)) -> Dict[str, Any]:
+        """
+        Run a reference solution in this process, without the cache
 
-        expected_type_obj = type_map.get(expected_type)
-        if not expected_type_obj:
-            return False, f"Unknown expected type: {expected_type}"
+        The solution runs in a scratch directory, so files it saves don't
+        end up in the learner's working directory.
 
-        if isinstance(result, expected_type_obj):
-            return True, "Correct! ✅"
-        else:
-            return False, f"Type mismatch: got {type(result).__name__}, expected {expected_type}"
+        Args:
+            solution: Reference solution code
+            setup_code: Exercise setup code
+            variables: Names of the variables to return
 
-    def _validate_function(self, func: Any, test_cases: list) -> Tuple[bool, str]:
-        """Validate a function against test cases"""
+        Returns:
+            variable name -> reference value
 
-        if not callable(func):
-            return False, "Result is not a callable function"
+        Raises:
+            ValueError: If the solution doesn't define a variable
+        """
+        with self._time_limit(ResourceLimits()):
+            namespace = self._create_namespace(setup_code)
+            with scratch_directory(), redirect_stdout(StringIO()):
+                exec(solution, namespace)
+
+        missing = [name for name in variables if name not in namespace]
+        if missing:
+            raise ValueError(f"the solution doesn't define {', '.join(missing)}")
+
+        return {name: namespace[name] for name in variables}
+
+    def _validate_against_solution(self,
+                                   namespace: Dict,
+                                   solution: str,
+                                   plan: ValidationPlan,
+                                   setup_code: str) -> Tuple[bool, str]:
+        """
+        Compare the user's variables with the reference solution's
 
-        for i, test_case in enumerate(test_cases, 1):
-            inputs = test_case.get('input')
-            expected_output = test_case.get('output')
+        Args:
+            namespace: Execution namespace containing user's variables
+            solution: Reference solution code
+            plan: Compiled 'solution_check' rules (variables, tolerance)
+            setup_code: Exercise setup code
 
-            try:
-                # Call function with inputs
-                if isinstance(inputs, dict):
-                    actual_output = func(**inputs)
-                elif isinstance(inputs, (list, tuple)):
-                    actual_output = func(*inputs)
-                else:
-                    actual_output = func(inputs)
-
-                # Check output
-                if actual_output != expected_output:
-                    return False, f"Test case {i} failed: expected {expected_output}, got {actual_output}"
+        Returns:
+            (is_correct, feedback_message)
+        """
+        variables = plan.variables
 
-            except Exception as e:
-                return False, f"Test case {i} raised error: {str(e)}"
+        try:
+            expected = self.reference_results(solution or '', setup_code, variables)
+        except (ResourceLimitExceeded, MemoryError):
+            raise
+        except Exception as e:
+            return False, f"Reference solution failed ({type(e).__name__}: {str(e)}). This is a problem with the lesson, not your code."
 
-        return True, "All test cases passed! ✅"
+        tolerance = plan.tolerance
+        for name in variables:
+            if name not in namespace:
+                if name == 'result':
+                    return False, "Please store your answer in a variable called 'result'"
+                return False, f"Variable '{name}' not found"
 
-    def _validate_shape(self, result: Any, expected_shape: tuple) -> Tuple[bool, str]:
-        """Validate shape of array-like object"""
+            is_correct, message = self._compare_to_reference(namespace[name], expected[name], tolerance, name)
+            if not is_correct:
+                return False, message if len(variables) == 1 else f"Variable '{name}': {message}"
 
-        if not hasattr(result, 'shape'):
-            return False, f"Result has no shape attribute (type: {type(result).__name__})"
+        return True, "Correct! ✅"
 
-        expected_shape = tuple(expected_shape)
-        if result.shape != expected_shape:
-            return False, f"Shape mismatch: got {result.shape}, expected {expected_shape}"
+    def _compare_to_reference(self,
+                              user_value: Any,
+                              expected: Any,
+                              tolerance: float,
+                              name: str = 'result') -> Tuple[bool, str]:
+        """Compare a value with the reference solution's, with numeric tolerance"""
+        # Lists, arrays and Series holding the same values are interchangeable
+        array_likes = (list, tuple, np.ndarray, pd.Series)
+        if isinstance(expected, array_likes) and isinstance(user_value, array_likes) and \
+                not isinstance(user_value, type(expected)):
+            mismatch = find_mismatch(user_value, expected, rtol=tolerance, atol=tolerance, path=name)
+            if mismatch is not None:
+                return False, f"Value mismatch at {mismatch.path}: {mismatch.reason}"
+            return True, "Correct! ✅"
 
-        return True, "Correct! ✅"
+        if isinstance(expected, (pd.DataFrame, pd.Series)):
+            if type(user_value) is not type(expected):
+                return False, f"Expected pandas {type(expected).__name__}, got {type(user_value).__name__}"
+            if isinstance(expected, pd.DataFrame):
+                message = compare_frames(user_value, expected, rtol=tolerance, atol=tolerance)
+            else:
+                message = compare_series(user_value, expected, rtol=tolerance, atol=tolerance)
+            if message is not None:
+                return False, message
+            return True, "Correct! ✅"
 
-    def _validate_variables(self, namespace: Dict, checks: list) -> Tuple[bool, str]:
-        """
-        Validate multiple variables against expected values
+        if isinstance(expected, np.ndarray):
+            if not isinstance(user_value, np.ndarray):
+                return False, f"Expected numpy array, got {type(user_value).__name__}"
+            if user_value.shape != expected.shape:
+                return False, f"Shape mismatch: got {user_value.shape}, expected {expected.shape}"
+            if np.issubdtype(expected.dtype, np.number) and np.issubdtype(user_value.dtype, np.number):
+                matches = np.allclose(user_value, expected, rtol=tolerance, atol=tolerance, equal_nan=True)
+            else:
+                matches = np.array_equal(user_value, expected)
+            return (True, "Correct! ✅") if matches else (False, "Values don't match expected result")
+
+        # Nested dicts and lists report the path to the first difference
+        if isinstance(expected, (dict, list, tuple)) and isinstance(user_value, (dict, list, tuple)):
+            mismatch = find_mismatch(user_value, expected, rtol=tolerance, atol=tolerance, path=name)
+            if mismatch is not None:
+                return False, f"Value mismatch at {mismatch.path}: {mismatch.reason}"
+            return True, "Correct! ✅"
 
-        Args:
-            namespace: Execution namespace containing user's variables
-            checks: List of variable checks from YAML validation rules
+        # int, float and numpy scalars compare by value, not by exact type
+        if isinstance(expected, numbers.Number) and not isinstance(expected, bool):
+            if not isinstance(user_value, numbers.Number) or isinstance(user_value, bool):
+                return False, f"Type mismatch: got {type(user_value).__name__}, expected a number"
+            if abs(user_value - expected) <= tolerance:
+                return True, "Correct! ✅"
+            return False, f"Value mismatch: got {user_value}, expected {expected}"
 
-        Returns:
-            (is_correct, feedback_message)
-        """
-        errors = []
-
-        for check in checks:
-            var_name = check.get('variable')
-            expected_value = check.get('expected')
-            expected_type = check.get('type')
-
-            # Check if variable exists
-            if var_name not in namespace:
-                errors.append(f"Variable '{var_name}' not found")
-                continue
-
-            user_value = namespace[var_name]
-
-            # Check type
-            type_map = {'int': int, 'float': float, 'str': str, 'bool': bool}
-            if expected_type and expected_type in type_map:
-                if not isinstance(user_value, type_map[expected_type]):
-                    errors.append(f"Variable '{var_name}' has wrong type: expected {expected_type}, got {type(user_value).__name__}")
-                    continue
-
-            # Check value
-            if expected_value is not None:
-                if isinstance(expected_value, float):
-                    if abs(user_value - expected_value) > 0.001:
-                        errors.append(f"Variable '{var_name}' has wrong value: expected {expected_value}, got {user_value}")
-                else:
-                    if user_value != expected_value:
-                        errors.append(f"Variable '{var_name}' has wrong value: expected {expected_value}, got {user_value}")
-
-        if errors:
-            return False, "\n".join(errors)
-        else:
-            return True, "Correct! ✅ All variables match the expected values and types."
+        try:
+            return compare_value(user_value, expected, tolerance)
+        except (TypeError, ValueError):
+            return False, f"Value mismatch: got {user_value}, expected {expected}"
@@ -0,0 +1,805 @@
+"""
+Precompiled lesson catalog
+
+All ``lessons/**/*.yaml`` files are compiled into a single binary file so a
+kernel can load the curriculum without running the YAML parser. Each entry
+records the source file's mtime, size and content hash; files that changed
+since the catalog was built are detected and re-parsed from YAML.
+
+File layout::
+
+    header    magic, manifest offset, manifest length
+    blobs     one marshalled lesson per file
+    manifest  offset table (file -> offset, length, stamp, header) and id index
+
+The manifest also holds the full-text search index (see search.py), which
+is updated in place when lessons change and carried over between builds.
+Each exercise's validation block is compiled while building (see
+core/rules.py) and the problems found are recorded per file. They are
+printed by ``dstutor build-catalog``, not by the lazy build a kernel runs,
+and are available from authoring_problems().
+
+The file is opened read-only with mmap, so every kernel on a host shares
+the same page-cache pages and only deserializes the lessons it displays.
+Catalogs are replaced atomically, running kernels keep their old mapping.
+
+Build the catalog ahead of time with:
+
+    dstutor build-catalog [lessons_dir] [-o catalog_path]
+"""
+
+import hashlib
+import marshal
+import mmap
+import os
+import struct
+from pathlib import Path
+from typing import Dict, Iterable, List, NamedTuple, Optional, Set, Tuple
+
+import yaml
+
+from .lesson import lesson_header
+from .topics import TOPIC_INFO_FILE, build_topic_registry
+from .prerequisites import PrerequisiteGraph, build_prerequisite_graph
+from .search import SearchIndex, lesson_terms
+
+
+CATALOG_MAGIC = b'DSTCAT01'
+CATALOG_VERSION = 7
+
+# magic, manifest offset, manifest length
+_HEADER = struct.Struct('<8sQQ')
+
+
+class LessonIndexEntry(NamedTuple):
+    """Location of a lesson in the curriculum and in the catalog file"""
+    topic: str
+    position: int      # 0-based position within the topic
+    file: str          # YAML path relative to lessons_dir
+    offset: int        # byte offset of the compiled lesson, -1 if not compiled
+
+
+def default_catalog_path() -> Path:
+    """Return the catalog location (``$DSTUTOR_CATALOG`` or ~/.dstutor)"""
+    env_path = os.getenv('DSTUTOR_CATALOG')
+    if env_path:
+        return Path(env_path)
+    return Path.home() / ".dstutor" / "lesson_catalog.bin"
+
+
+def is_lesson_file(path: Path) -> bool:
+    """Lesson files are YAML files not starting with '_' (e.g. _topic.yaml)"""
+    return path.suffix == '.yaml' and not path.name.startswith('_')
+
+
+def read_topic_info(directory: Path) -> Optional[Dict]:
+    """Read a topic directory's _topic.yaml, None if absent or invalid"""
+    info_file = directory / TOPIC_INFO_FILE
+    if not info_file.exists():
+        return None
+    try:
+        with open(info_file, 'r', encoding='utf-8') as f:
+            info = yaml.safe_load(f)
+        return info if isinstance(info, dict) else None
+    except Exception as e:
+        print(f"Error loading topic info from {info_file}: {e}")
+        return None
+
+
+def parse_lesson_yaml(raw: bytes, filepath: Path) -> Optional[Dict]:
+    """
+    Parse the raw contents of a lesson YAML file
+
+    Args:
+        raw: File contents
+        filepath: Path the contents were read from (for error messages)
+
+    Returns:
+        Lesson dictionary or None
+    """
+    try:
+        lesson_data = yaml.safe_load(raw)
+        return lesson_data.get('lesson')
+    except Exception as e:
+        print(f"Error loading lesson from {filepath}: {e}")
+        return None
+
+
+def lesson_rule_problems(lesson: Optional[Dict]) -> List[str]:
+    """Problems in the validation block of a lesson's exercise (see rules.rule_problems)"""
+    exercise = (lesson or {}).get('exercise')
+    if not isinstance(exercise, dict) or 'validation' not in exercise:
+        return []
+
+    # Imported here: the rule compiler needs numpy and pandas
+    from ..core.rules import rule_problems
+    return rule_problems(exercise['validation'])
+
+
+class LessonCatalog:
+    """Binary catalog of compiled lessons with per-file staleness checks"""
+
+    def __init__(self, lessons_dir: Path, catalog_path: Optional[Path] = None):
+        """
+        Initialize lesson catalog
+
+        Args:
+            lessons_dir: Root directory containing lesson YAML files
+            catalog_path: Location of the compiled catalog file
+        """
+        self.lessons_dir = Path(lessons_dir)
+        self.catalog_path = Path(catalog_path) if catalog_path else default_catalog_path()
+
+        self._data = b''    # mmap of the catalog file, or bytes of an unsaved build
+        self._files = {}     # relative path -> file entry from the manifest
+        self._dirs = {}      # relative dir -> mtime_ns at build time
+        self._overlay = {}   # relative path -> (stamp, lesson) for re-parsed files
+        self._index = {}     # lesson id -> LessonIndexEntry
+        self._topic_ids = {}  # topic -> lesson ids in order
+        self._topic_info = {}  # relative dir -> _topic.yaml contents
+        self._registry = {}   # topic id -> topic entry
+        self._prerequisites = PrerequisiteGraph()
+        self._search = SearchIndex()  # full-text index keyed by relative path
+        self._index_dirty = False
+        self._loaded = False
+
+    # ------------------------------------------------------------------
+    # Loading
+    # ------------------------------------------------------------------
+
+    def load(self, build_if_missing: bool = True) -> bool:
+        """
+        Load the compiled catalog from disk
+
+        Args:
+            build_if_missing: Compile (and try to save) the catalog when the
+                file is missing, corrupt or built for another lessons dir
+
+        Returns:
+            True if a usable catalog is available
+        """
+        if self._loaded:
+            return True
+
+        if self._read_catalog_file():
+            self._loaded = True
+            return True
+
+        if build_if_missing:
+            self.build()
+            try:
+                self.save()
+            except OSError:
+                pass  # Read-only home or shared path, keep in-memory catalog
+            else:
+                # Swap the in-memory build for a shared mapping of the saved file
+                self._read_catalog_file()
+            return True
+
+        return False
+
+    def _read_catalog_file(self) -> bool:
+        """Map and verify the catalog file, returns False if unusable"""
+        try:
+            with open(self.catalog_path, 'rb') as f:
+                data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            return False  # Missing, unreadable or empty file
+
+        manifest = self._read_manifest(data)
+        if manifest is None or manifest.get('version') != CATALOG_VERSION or \
+                manifest.get('lessons_dir') != str(self.lessons_dir.resolve()):
+            data.close()
+            return False
+
+        self.close()
+        self._data = data
+        self._files = manifest['files']
+        self._dirs = manifest['dirs']
+        self._overlay = {}
+        self._index = {
+            lesson_id: LessonIndexEntry(*location)
+            for lesson_id, location in manifest['index'].items()
+        }
+        self._topic_ids = manifest['topics']
+        self._topic_info = manifest['topic_info']
+        self._registry = manifest['registry']
+        self._prerequisites = PrerequisiteGraph(manifest['prerequisites'])
+        self._search = SearchIndex(manifest['search'])
+        self._index_dirty = False
+        return True
+
+    @staticmethod
+    def _read_manifest(data) -> Optional[Dict]:
+        """Decode the manifest of a catalog buffer, None if it is not a catalog"""
+        if len(data) < _HEADER.size:
+            return None
+
+        magic, manifest_offset, manifest_length = _HEADER.unpack_from(data, 0)
+        if magic != CATALOG_MAGIC or manifest_offset + manifest_length > len(data):
+            return None
+
+        try:
+            return marshal.loads(data[manifest_offset:manifest_offset + manifest_length])
+        except (EOFError, ValueError, TypeError):
+            return None
+
+    def close(self):
+        """Release the catalog mapping"""
+        if isinstance(self._data, mmap.mmap):
+            self._data.close()
+        self._data = b''
+
+    # ------------------------------------------------------------------
+    # Lookups
+    # ------------------------------------------------------------------
+
+    @property
+    def lesson_count(self) -> int:
+        """Number of lesson files in the catalog"""
+        self.load()
+        return len(self._files)
+
+    def list_lesson_files(self, directory: Path) -> List[Path]:
+        """
+        List lesson files in a directory
+
+        Uses the manifest when the directory has not changed since the
+        catalog was built, otherwise rescans the directory first.
+
+        Args:
+            directory: Directory to list
+
+        Returns:
+            Sorted list of YAML file paths
+        """
+        self.load()
+        rel_dir = self._relative(directory)
+
+        try:
+            dir_mtime = directory.stat().st_mtime_ns
+        except OSError:
+            return []
+
+        if rel_dir is None:
+            return sorted(path for path in directory.glob('*.yaml') if is_lesson_file(path))
+
+        if self._dirs.get(rel_dir) != dir_mtime:
+            self._sync_dir(rel_dir, directory, dir_mtime)
+
+        return sorted(self.lessons_dir / rel for rel in self._files_in(rel_dir))
+
+    def lookup(self, lesson_id: str) -> Optional[LessonIndexEntry]:
+        """
+        Find a lesson in the id index
+
+        Args:
+            lesson_id: Lesson identifier (e.g., 'pandas_03')
+
+        Returns:
+            LessonIndexEntry or None if no lesson has this id
+        """
+        self.load()
+        self._ensure_index()
+
+        entry = self._index.get(lesson_id)
+        if entry is None and self._sync_changed_dirs():
+            self._ensure_index()
+            entry = self._index.get(lesson_id)
+        return entry
+
+    def topic_lesson_ids(self, topic: str) -> List[str]:
+        """
+        Get the ordered lesson ids of a topic
+
+        Args:
+            topic: Topic name (name of the topic directory)
+
+        Returns:
+            List of lesson ids sorted by lesson order
+        """
+        self.load()
+        self._ensure_index()
+        return self._topic_ids.get(topic, [])
+
+    def topics(self) -> Dict[str, Dict]:
+        """
+        Get the topic registry
+
+        Returns:
+            topic id -> topic entry (id, name, description, level, dir, status)
+        """
+        self.load()
+        self._ensure_index()
+        return self._registry
+
+    def prerequisites(self) -> PrerequisiteGraph:
+        """Get the prerequisite graph of all indexed lessons"""
+        self.load()
+        self._ensure_index()
+        return self._prerequisites
+
+    def search(self, query: str, limit: int = 10) -> List[Tuple[str, float]]:
+        """
+        Full-text search over lesson content
+
+        Args:
+            query: Search terms (the last one also matches as a prefix)
+            limit: Maximum number of results
+
+        Returns:
+            List of (lesson id, score), best match first
+        """
+        self.load()
+        self._ensure_index()
+
+        results = []
+        for rel, score in self._search.search(query, limit=None):
+            header = self._files[rel]['header'] if rel in self._files else None
+            if header and header.get('id') in self._index:
+                results.append((header['id'], score))
+                if len(results) >= limit:
+                    break
+        return results
+
+    def validation_problems(self) -> Dict[str, List[str]]:
+        """
+        Get the problems found when compiling exercise validation blocks
+
+        Returns:
+            lesson id (or file when the lesson has no id) -> messages
+        """
+        self.load()
+        problems = {}
+        for rel in sorted(self._files):
+            entry = self._files[rel]
+            if entry.get('rule_problems'):
+                header = entry['header'] or {}
+                problems[header.get('id') or rel] = entry['rule_problems']
+        return problems
+
+    def authoring_problems(self) -> List[str]:
+        """
+        Get the problems lesson authors should fix: prerequisite cycles,
+        unknown prerequisites and malformed validation blocks
+
+        Returns:
+            One message per problem
+        """
+        graph = self.prerequisites()
+        messages = [f"prerequisite cycle {' -> '.join(cycle)}" for cycle in graph.cycles]
+        messages.extend(f"{lesson_id} has unknown prerequisites {unknown}"
+                        for lesson_id, unknown in graph.missing.items())
+        messages.extend(f"{lesson_id} validation: {problem}"
+                        for lesson_id, problems in self.validation_problems().items()
+                        for problem in problems)
+        return messages
+
+    def get_topic(self, topic: str) -> Optional[Dict]:
+        """Look up one topic in the registry"""
+        return self.topics().get(topic)
+
+    def lesson_path(self, entry: LessonIndexEntry) -> Path:
+        """Absolute path of an indexed lesson's YAML file"""
+        return self.lessons_dir / entry.file
+
+    def get_lesson(self, filepath: Path, st: Optional[os.stat_result] = None) -> Optional[Dict]:
+        """
+        Get the lesson compiled from a YAML file
+
+        Args:
+            filepath: Path to YAML lesson file
+            st: Result of filepath.stat() if the caller already has it
+
+        Returns:
+            Lesson dictionary or None
+        """
+        self.load()
+        rel = self._relative(filepath)
+
+        if st is None:
+            try:
+                st = filepath.stat()
+            except OSError:
+                return None
+        stamp = (st.st_mtime_ns, st.st_size)
+
+        entry = self._files.get(rel) if rel is not None else None
+        if entry is not None and not entry['length']:
+            entry = None  # Not compiled (parse error or unmarshallable values)
+
+        if entry is not None and (entry['mtime_ns'], entry['size']) == stamp:
+            return self._read_blob(entry)
+
+        cached = self._overlay.get(rel)
+        if cached is not None and cached[0] == stamp:
+            return cached[1]
+
+        try:
+            raw = filepath.read_bytes()
+        except OSError as e:
+            print(f"Error loading lesson from {filepath}: {e}")
+            return None
+
+        # Touched but unchanged content: the compiled copy is still valid
+        if entry is not None and hashlib.sha1(raw).hexdigest() == entry['sha1']:
+            entry['mtime_ns'], entry['size'] = stamp
+            return self._read_blob(entry)
+
+        lesson = parse_lesson_yaml(raw, filepath)
+        if rel is not None:
+            self._overlay[rel] = (stamp, lesson)
+            self._update_header(rel, lesson)
+            if rel in self._files:
+                self._search.add(rel, lesson_terms(lesson))
+        return lesson
+
+    def get_header(self, filepath: Path, st: Optional[os.stat_result] = None) -> Optional[Dict]:
+        """
+        Get the header fields of a lesson without deserializing its body
+
+        Args:
+            filepath: Path to YAML lesson file
+            st: Result of filepath.stat() if the caller already has it
+
+        Returns:
+            Header dictionary (see LESSON_HEADER_FIELDS) or None
+        """
+        self.load()
+        rel = self._relative(filepath)
+
+        if st is None:
+            try:
+                st = filepath.stat()
+            except OSError:
+                return None
+
+        entry = self._files.get(rel) if rel is not None else None
+        if entry is not None and entry['length'] and \
+                (entry['mtime_ns'], entry['size']) == (st.st_mtime_ns, st.st_size):
+            return entry['header']
+
+        lesson = self.get_lesson(filepath, st)
+        return lesson_header(lesson) if lesson else None
+
+    def _read_blob(self, entry: Dict) -> Dict:
+        """Deserialize a compiled lesson"""
+        start = entry['offset']
+        return marshal.loads(self._data[start:start + entry['length']])
+
+    def _files_in(self, rel_dir: str) -> List[str]:
+        """Relative paths of the catalog files directly inside rel_dir"""
+        prefix = rel_dir + '/' if rel_dir else ''
+        return [
+            rel for rel in self._files
+            if rel.startswith(prefix) and '/' not in rel[len(prefix):]
+        ]
+
+    def _relative(self, path: Path) -> Optional[str]:
+        """Return path relative to lessons_dir in POSIX form"""
+        try:
+            rel = Path(path).relative_to(self.lessons_dir)
+        except ValueError:
+            try:
+                rel = Path(path).resolve().relative_to(self.lessons_dir.resolve())
+            except ValueError:
+                return None
+        rel_str = rel.as_posix()
+        return '' if rel_str == '.' else rel_str
+
+    # ------------------------------------------------------------------
+    # Index maintenance
+    # ------------------------------------------------------------------
+
+    def _update_header(self, rel: str, lesson: Optional[Dict]):
+        """Record id/order of a re-parsed file, marking the index dirty on change"""
+        entry = self._files.get(rel)
+        if entry is None:
+            return
+        entry['rule_problems'] = lesson_rule_problems(lesson)
+        header = lesson_header(lesson) if lesson else None
+        if entry['header'] != header:
+            entry['header'] = header
+            self._index_dirty = True
+
+    def _sync_dir(self, rel_dir: str, directory: Path, dir_mtime: int):
+        """Reconcile the manifest with a directory whose mtime changed"""
+        present = {}
+        for child in directory.iterdir():
+            if child.is_dir():
+                child_rel = f"{rel_dir}/{child.name}" if rel_dir else child.name
+                if child_rel not in self._dirs:
+                    self._sync_dir(child_rel, child, child.stat().st_mtime_ns)
+            elif is_lesson_file(child):
+                present[f"{rel_dir}/{child.name}" if rel_dir else child.name] = child
+
+        info = read_topic_info(directory)
+        if info is not None:
+            self._topic_info[rel_dir] = info
+        else:
+            self._topic_info.pop(rel_dir, None)
+
+        for rel in self._files_in(rel_dir):
+            if rel not in present:
+                self._drop_file(rel)
+
+        for rel, path in present.items():
+            if rel not in self._files:
+                self._files[rel] = {
+                    'mtime_ns': 0, 'size': -1, 'sha1': '', 'offset': 0, 'length': 0,
+                    'header': None, 'rule_problems': [],
+                }
+                self.get_lesson(path)
+
+        self._dirs[rel_dir] = dir_mtime
+        self._index_dirty = True
+
+    def _drop_file(self, rel: str):
+        """Forget a lesson file that was deleted"""
+        del self._files[rel]
+        self._overlay.pop(rel, None)
+        self._search.remove(rel)
+
+    def _sync_changed_dirs(self) -> bool:
+        """Rescan every known directory whose mtime changed, returns True if any did"""
+        changed = False
+        for rel_dir, mtime in list(self._dirs.items()):
+            directory = self.lessons_dir / rel_dir if rel_dir else self.lessons_dir
+            try:
+                current = directory.stat().st_mtime_ns
+            except OSError:
+                # Directory removed, drop its lessons
+                for rel in self._files_in(rel_dir):
+                    self._drop_file(rel)
+                del self._dirs[rel_dir]
+                self._index_dirty = changed = True
+                continue
+            if current != mtime:
+                self._sync_dir(rel_dir, directory, current)
+                changed = True
+        return changed
+
+    def refresh_paths(self, paths: Optional[Iterable[Path]] = None) -> Set[str]:
+        """
+        Re-read lesson files that changed on disk and patch the index in place
+
+        Args:
+            paths: Files reported as changed (e.g. by a file watcher). When
+                None, every known directory and file is checked (polling).
+
+        Returns:
+            Ids of lessons that were added, removed or modified
+        """
+        self.load()
+
+        headers_before = {rel: entry['header'] for rel, entry in self._files.items()}
+
+        if paths is None:
+            self._sync_changed_dirs()
+            candidates = list(self._files)
+        else:
+            candidates = []
+            for path in paths:
+                path = Path(path)
+                rel = self._relative(path)
+                if rel is None or not rel.endswith('.yaml'):
+                    continue
+                if rel not in self._files or not path.exists():
+                    # Added or removed file, reconcile its directory
+                    rel_dir = rel.rpartition('/')[0]
+                    try:
+                        self._sync_dir(rel_dir, path.parent, path.parent.stat().st_mtime_ns)
+                    except OSError:
+                        self._sync_changed_dirs()
+                candidates.append(rel)
+
+        changed_files = set()
+        for rel in candidates:
+            if rel in self._files:
+                # get_lesson re-parses the file only if its content changed,
+                # which stores a new overlay entry
+                overlay_before = self._overlay.get(rel)
+                self.get_lesson(self.lessons_dir / rel)
+                if self._overlay.get(rel) is not overlay_before:
+                    changed_files.add(rel)
+
+        changed_files.update(set(headers_before) ^ set(self._files))
+
+        changed = set()
+        for rel in changed_files:
+            after = self._files[rel]['header'] if rel in self._files else None
+            for header in (headers_before.get(rel), after):
+                if header and header.get('id'):
+                    changed.add(header['id'])
+        return changed
+
+    def _ensure_index(self):
+        """Rebuild the id index from the file headers if it is out of date"""
+        if self._index_dirty:
+            self._index, self._topic_ids, self._registry, graph = \
+                self._build_index(self._files, self._topic_info)
+            self._prerequisites = PrerequisiteGraph(graph)
+            self._index_dirty = False
+
+    @staticmethod
+    def _build_index(files: Dict[str, Dict], topic_info: Dict[str, Dict]):
+        """
+        Build the id index and topic registry from manifest file entries
+
+        Lessons are grouped by directory (the topic) and ordered the same way
+        the loader orders them: by file name, then by the 'order' field.
+
+        Returns:
+            (id -> LessonIndexEntry, topic -> ordered lesson ids, topic registry,
+             prerequisite graph)
+        """
+        by_dir = {}
+        for rel in sorted(files):
+            if files[rel]['header'] and files[rel]['header'].get('id'):
+                by_dir.setdefault(rel.rpartition('/')[0], []).append(rel)
+
+        registry = build_topic_registry(list(by_dir), topic_info)
+        topic_dirs = {topic['dir']: topic_id for topic_id, topic in registry.items()}
+
+        index = {}
+        topic_ids = {}
+        for rel_dir, rels in by_dir.items():
+            topic = topic_dirs.get(rel_dir)
+            if topic is None:
+                continue  # Shadowed by another directory with the same topic name
+            rels.sort(key=lambda rel: files[rel]['header'].get('order', 999))
+            ids = topic_ids.setdefault(topic, [])
+            for rel in rels:
+                entry = files[rel]
+                offset = entry['offset'] if entry['length'] else -1
+                index[entry['header']['id']] = LessonIndexEntry(topic, len(ids), rel, offset)
+                ids.append(entry['header']['id'])
+
+        prerequisites = {
+            lesson_id: (files[entry.file]['header'].get('metadata') or {}).get('prerequisites') or []
+            for lesson_id, entry in index.items()
+        }
+        return index, topic_ids, registry, build_prerequisite_graph(prerequisites)
+
+    # ------------------------------------------------------------------
+    # Building
+    # ------------------------------------------------------------------
+
+    def build(self, verbose: bool = False):
+        """
+        Compile every lesson YAML file under lessons_dir into memory
+
+        Files whose content hash matches the currently loaded catalog reuse
+        their compiled lesson and search terms instead of being re-parsed.
+
+        Args:
+            verbose: Print the authoring problems found (see
+                authoring_problems()); kernels build quietly
+        """
+        blobs = []
+        files = {}
+        dirs = {}
+        topic_info = {}
+        offset = _HEADER.size
+
+        previous = self._files if self._data else {}
+        search = self._search if self._data else SearchIndex()
+
+        if self.lessons_dir.exists():
+            # Single scan of the tree: directories, topic info and lesson files
+            for directory in [self.lessons_dir] + sorted(self.lessons_dir.rglob('*')):
+                if directory.is_dir():
+                    rel_dir = self._relative(directory)
+                    dirs[rel_dir] = directory.stat().st_mtime_ns
+                    info = read_topic_info(directory)
+                    if info is not None:
+                        topic_info[rel_dir] = info
+
+            for yaml_file in sorted(self.lessons_dir.rglob('*.yaml')):
+                if not is_lesson_file(yaml_file):
+                    continue
+                rel = yaml_file.relative_to(self.lessons_dir).as_posix()
+                st = yaml_file.stat()
+                raw = yaml_file.read_bytes()
+                sha1 = hashlib.sha1(raw).hexdigest()
+
+                prev = previous.get(rel)
+                if prev is not None and prev['length'] and prev['sha1'] == sha1 and \
+                        rel not in self._overlay:
+                    # Unchanged since the loaded build, search terms are current too
+                    blob = bytes(self._data[prev['offset']:prev['offset'] + prev['length']])
+                    header = prev['header']
+                    problems = prev['rule_problems']
+                else:
+                    lesson = parse_lesson_yaml(raw, yaml_file)
+                    try:
+                        blob = marshal.dumps(lesson) if lesson is not None else b''
+                    except ValueError:
+                        blob = b''  # Unmarshallable values, always read this file from YAML
+                    header = lesson_header(lesson) if lesson else None
+                    problems = lesson_rule_problems(lesson)
+                    search.add(rel, lesson_terms(lesson))
+
+                files[rel] = {
+                    'mtime_ns': st.st_mtime_ns,
+                    'size': st.st_size,
+                    'sha1': sha1,
+                    'offset': offset,
+                    'length': len(blob),
+                    'header': header,
+                    'rule_problems': problems,
+                }
+                blobs.append(blob)
+                offset += len(blob)
+
+        for rel in search.documents():
+            if rel not in files:
+                search.remove(rel)
+
+        index, topic_ids, registry, graph = self._build_index(files, topic_info)
+
+        manifest = {
+            'version': CATALOG_VERSION,
+            'lessons_dir': str(self.lessons_dir.resolve()),
+            'dirs': dirs,
+            'files': files,
+            'index': {lesson_id: tuple(entry) for lesson_id, entry in index.items()},
+            'topics': topic_ids,
+            'topic_info': topic_info,
+            'registry': registry,
+            'prerequisites': graph,
+            'search': search.to_dict(),
+        }
+        manifest_blob = marshal.dumps(manifest)
+
+        header = _HEADER.pack(CATALOG_MAGIC, offset, len(manifest_blob))
+        self.close()
+        self._data = header + b''.join(blobs) + manifest_blob
+        self._files = files
+        self._dirs = dirs
+        self._overlay = {}
+        self._index = index
+        self._topic_ids = topic_ids
+        self._topic_info = topic_info
+        self._registry = registry
+        self._prerequisites = PrerequisiteGraph(graph)
+        self._search = search
+        self._index_dirty = False
+        self._loaded = True
+
+        if verbose:
+            for message in self.authoring_problems():
+                print(f"Warning: {message}")
+
+    def save(self):
+        """Write the catalog to catalog_path atomically"""
+        self.catalog_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.catalog_path.with_name(f"{self.catalog_path.name}.{os.getpid()}.tmp")
+        with open(tmp_path, 'wb') as f:
+            f.write(self._data)
+        os.replace(tmp_path, self.catalog_path)
+
+    def refresh(self, verbose: bool = False):
+        """Recompile the catalog from YAML, save it and map the new file (see build())"""
+        self.build(verbose)
+        self.save()
+        self._read_catalog_file()
+
+
+def build_catalog(lessons_dir: Path,
+                  catalog_path: Optional[Path] = None,
+                  verbose: bool = False) -> LessonCatalog:
+    """
+    Compile all lessons into a catalog file
+
+    Args:
+        lessons_dir: Root directory containing lesson YAML files
+        catalog_path: Output file (defaults to default_catalog_path())
+        verbose: Print the authoring problems found
+
+    Returns:
+        The compiled LessonCatalog
+    """
+    catalog = LessonCatalog(lessons_dir, catalog_path)
+    catalog.refresh(verbose)
+    return catalog
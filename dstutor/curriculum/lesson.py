@@ -0,0 +1,82 @@
+"""
+Two-tier lesson representation: cheap header, lazily loaded body
+"""
+
+from collections.abc import Mapping
+from typing import Any, Callable, Dict, Iterator, Optional
+
+
+# Fields needed for listing topics and navigation
+LESSON_HEADER_FIELDS = ('id', 'level', 'topic', 'subtopic', 'order', 'metadata')
+
+
+def lesson_header(lesson: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Extract the header fields of a lesson
+
+    Args:
+        lesson: Full lesson dictionary
+
+    Returns:
+        dict with only the LESSON_HEADER_FIELDS present in the lesson
+    """
+    return {field: lesson[field] for field in LESSON_HEADER_FIELDS if field in lesson}
+
+
+class LazyLesson(Mapping):
+    """
+    Read-only lesson mapping that loads its body on first access
+
+    Header fields (id, order, topic, ...) are served without touching the
+    body. Any other key (content, exercise, ...) loads the full lesson
+    through body_loader once and keeps it.
+    """
+
+    __slots__ = ('_header', '_body_loader', '_lesson')
+
+    def __init__(self, header: Dict[str, Any], body_loader: Callable[[], Optional[Dict]]):
+        """
+        Initialize lazy lesson
+
+        Args:
+            header: Lesson header fields
+            body_loader: Callable returning the full lesson dictionary
+        """
+        self._header = header
+        self._body_loader = body_loader
+        self._lesson = None
+
+    @property
+    def is_loaded(self) -> bool:
+        """Whether the lesson body has been loaded"""
+        return self._lesson is not None
+
+    def load(self) -> Dict[str, Any]:
+        """
+        Load the full lesson
+
+        Returns:
+            Full lesson dictionary (the header alone if the body is gone)
+        """
+        if self._lesson is None:
+            self._lesson = self._body_loader() or dict(self._header)
+        return self._lesson
+
+    def __getitem__(self, key: str) -> Any:
+        if self._lesson is None and key in LESSON_HEADER_FIELDS:
+            return self._header[key]
+        return self.load()[key]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.load())
+
+    def __len__(self) -> int:
+        return len(self.load())
+
+    def __bool__(self) -> bool:
+        # A lesson is always truthy; avoid loading the body via __len__
+        return True
+
+    def __repr__(self) -> str:
+        state = 'loaded' if self.is_loaded else 'header only'
+        return f"<LazyLesson {self._header.get('id')!r} ({state})>"
@@ -0,0 +1,125 @@
+"""
+Bounded LRU cache for parsed lessons
+"""
+
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+
+DEFAULT_CACHE_MAX_BYTES = 16 * 1024 * 1024
+
+
+class LessonCache:
+    """
+    LRU cache with a memory cap and stamp-based invalidation
+
+    Every entry carries a stamp (e.g. the source file's mtime and size). A
+    lookup with a different stamp counts as a miss and drops the entry, so
+    callers only need to stat the source file to validate a hit.
+    """
+
+    def __init__(self, max_bytes: int = DEFAULT_CACHE_MAX_BYTES):
+        """
+        Initialize lesson cache
+
+        Args:
+            max_bytes: Approximate memory budget for cached values
+        """
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()  # key -> (stamp, size, value)
+        self._total_bytes = 0
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable, stamp: Tuple) -> Optional[Any]:
+        """
+        Look up a cached value
+
+        Args:
+            key: Cache key
+            stamp: Current stamp of the source
+
+        Returns:
+            Cached value or None on a miss
+        """
+        cached = self._entries.get(key)
+        if cached is None:
+            self.misses += 1
+            return None
+
+        if cached[0] != stamp:
+            self._remove(key)
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return cached[2]
+
+    def put(self, key: Hashable, stamp: Tuple, value: Any, size: int):
+        """
+        Store a value, evicting least recently used entries over the cap
+
+        Args:
+            key: Cache key
+            stamp: Stamp of the source the value was built from
+            value: Value to cache
+            size: Approximate size of the value in bytes
+        """
+        if key in self._entries:
+            self._remove(key)
+
+        if size > self.max_bytes:
+            return
+
+        self._entries[key] = (stamp, size, value)
+        self._total_bytes += size
+
+        while self._total_bytes > self.max_bytes:
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+            self.evictions += 1
+
+    def invalidate(self, key: Optional[Hashable] = None):
+        """
+        Drop one entry, or the whole cache when no key is given
+
+        Args:
+            key: Cache key to drop
+        """
+        if key is None:
+            self._entries.clear()
+            self._total_bytes = 0
+        elif key in self._entries:
+            self._remove(key)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get cache statistics
+
+        Returns:
+            dict with hit/miss/eviction counters and memory usage
+        """
+        lookups = self.hits + self.misses
+        return {
+            'entries': len(self._entries),
+            'bytes': self._total_bytes,
+            'max_bytes': self.max_bytes,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'hit_rate': (self.hits / lookups) if lookups > 0 else 0.0,
+        }
+
+    def _remove(self, key: Hashable):
+        """Remove an entry and release its size"""
+        _, size, _ = self._entries.pop(key)
+        self._total_bytes -= size
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._entries
@@ -4,19 +4,42 @@ Lesson loading and management system
 
 import yaml
 from pathlib import Path
-from typing import Dict, List, Optional, Any
+from typing import Callable, Dict, Iterable, List, Optional, Any, Set, Tuple
+import functools
 import os
+import threading
+from .catalog import LessonCatalog
+from .lesson_cache import LessonCache, DEFAULT_CACHE_MAX_BYTES
+from .lesson import LazyLesson
+from .topics import group_topics_by_level
+from .prerequisites import PrerequisiteGraph
+
+
+def _synchronized(method):
+    """Run a loader method under the loader lock (the watcher thread patches indexes)"""
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self._lock:
+            return method(self, *args, **kwargs)
+    return wrapper
 
 
 class LessonLoader:
     """Load and manage curriculum lessons"""
 
-    def __init__(self, lessons_dir: Optional[Path] = None):
+    def __init__(self,
+                 lessons_dir: Optional[Path] = None,
+                 catalog_path: Optional[Path] = None,
+                 cache_max_bytes: int = DEFAULT_CACHE_MAX_BYTES):
         """
         Initialize lesson loader
 
         Args:
             lessons_dir: Path to lessons directory (defaults to ../lessons)
+            catalog_path: Path to the compiled lesson catalog
+                (defaults to $DSTUTOR_CATALOG or ~/.dstutor/lesson_catalog.bin)
+            cache_max_bytes: Memory budget of the parsed lesson cache,
+                estimated from lesson file sizes
         """
         if lessons_dir is None:
             # Get path relative to this file
@@ -25,81 +48,26 @@ class LessonLoader:
             lessons_dir = project_root / "lessons"
 
         self.lessons_dir = Path(lessons_dir)
-        self._lesson_cache = {}
-        self._topics_index = None
+        self.catalog = LessonCatalog(self.lessons_dir, catalog_path)
+        self._lesson_cache = LessonCache(cache_max_bytes)
+        self._topics_index = {}  # topic -> (dir mtime, ordered lesson files)
+        self._lock = threading.RLock()
+        self._watcher = None
 
+    @_synchronized
     def get_all_topics(self) -> Dict[str, List[Dict]]:
         """
         Get all available topics organized by level
 
+        Topics are discovered from the lessons directory layout when the
+        catalog is built (see curriculum.topics).
+
         Returns:
             dict mapping level names to lists of topics
         """
-        topics = {
-            'Level 1: Foundations (Beginner)': [
-                {
-                    'name': 'Python Fundamentals',
-                    'id': 'python',
-                    'description': 'Review Python basics',
-                    'status': 'available'
-                },
-                {
-                    'name': 'NumPy Mastery',
-                    'id': 'numpy',
-                    'description': 'Array manipulation and operations',
-                    'status': 'available'
-                },
-                {
-                    'name': 'Pandas Deep Dive',
-                    'id': 'pandas',
-                    'description': 'Data manipulation with Pandas',
-                    'status': 'available'
-                },
-                {
-                    'name': 'Matplotlib & Seaborn',
-                    'id': 'matplotlib',
-                    'description': 'Data visualization',
-                    'status': 'available'
-                }
-            ],
-            'Level 2: Classical ML Pipeline (Intermediate)': [
-                {
-                    'name': 'Exploratory Data Analysis',
-                    'id': 'eda',
-                    'description': 'Understand and explore your data',
-                    'status': 'locked'
-                },
-                {
-                    'name': 'Data Preprocessing',
-                    'id': 'preprocessing',
-                    'description': 'Clean and prepare data for modeling',
-                    'status': 'locked'
-                },
-                {
-                    'name': 'Scikit-Learn Modeling',
-                    'id': 'sklearn',
-                    'description': 'Build machine learning models',
-                    'status': 'locked'
-                }
-            ],
-            'Level 3: Advanced Topics (Advanced)': [
-                {
-                    'name': 'Deep Learning with Keras',
-                    'id': 'keras',
-                    'description': 'Neural networks with Keras',
-                    'status': 'locked'
-                },
-                {
-                    'name': 'PyTorch Fundamentals',
-                    'id': 'pytorch',
-                    'description': 'Deep learning with PyTorch',
-                    'status': 'locked'
-                }
-            ]
-        }
-
-        return topics
+        return group_topics_by_level(self.catalog.topics())
 
+    @_synchronized
     def get_first_lesson(self, topic: str) -> Optional[Dict]:
         """
         Get the first lesson of a topic
@@ -118,10 +86,11 @@ class LessonLoader:
         # Fallback to sample lesson
         return self._get_sample_lesson(topic, 1)
 
+    @_synchronized
     def get_next_lesson(self, topic: str, current_lesson_id: str) -> Optional[Dict]:
         """Get the next lesson in a topic"""
-        lessons = self._load_topic_lessons_from_yaml(topic)
-        if not lessons:
+        lesson_ids = self._topic_lesson_ids(topic)
+        if not lesson_ids:
             # Fallback to sample lessons
             try:
                 current_num = int(current_lesson_id.split('_')[-1])
@@ -129,18 +98,13 @@ class LessonLoader:
             except (ValueError, IndexError):
                 return None
 
-        # Find current lesson and return next
-        for i, lesson in enumerate(lessons):
-            if lesson['id'] == current_lesson_id:
-                if i + 1 < len(lessons):
-                    return lessons[i + 1]
-                return None
-        return None
+        return self._get_neighbour_lesson(topic, current_lesson_id, 1)
 
+    @_synchronized
     def get_previous_lesson(self, topic: str, current_lesson_id: str) -> Optional[Dict]:
         """Get the previous lesson in a topic"""
-        lessons = self._load_topic_lessons_from_yaml(topic)
-        if not lessons:
+        lesson_ids = self._topic_lesson_ids(topic)
+        if not lesson_ids:
             # Fallback to sample lessons
             try:
                 current_num = int(current_lesson_id.split('_')[-1])
@@ -150,24 +114,81 @@ class LessonLoader:
             except (ValueError, IndexError):
                 return None
 
-        # Find current lesson and return previous
-        for i, lesson in enumerate(lessons):
-            if lesson['id'] == current_lesson_id:
-                if i > 0:
-                    return lessons[i - 1]
-                return None
-        return None
+        return self._get_neighbour_lesson(topic, current_lesson_id, -1)
+
+    @_synchronized
+    def get_lesson_position(self, topic: str, lesson_id: str) -> Tuple[int, int]:
+        """
+        Get the position of a lesson within its topic
+
+        Args:
+            topic: Topic name
+            lesson_id: Lesson identifier
 
+        Returns:
+            (0-based position, number of lessons in the topic)
+        """
+        lesson_ids = self._topic_lesson_ids(topic)
+        if lesson_ids:
+            entry = self.catalog.lookup(lesson_id)
+            position = entry.position if entry and entry.topic == topic else 0
+            return position, len(lesson_ids)
+
+        # Fallback to sample lessons
+        all_lessons = self.get_topic_lessons(topic)
+        position = next((i for i, l in enumerate(all_lessons) if l['id'] == lesson_id), 0)
+        return position, len(all_lessons)
+
+    @_synchronized
+    def get_topic_lesson_ids(self, topic: str) -> List[str]:
+        """
+        Get the ordered lesson ids of a topic without loading lessons
+
+        Args:
+            topic: Topic name
+
+        Returns:
+            List of lesson ids (empty for topics without YAML lessons)
+        """
+        return list(self._topic_lesson_ids(topic))
+
+    @_synchronized
+    def get_prerequisite_graph(self) -> PrerequisiteGraph:
+        """Get the prerequisite graph built with the catalog"""
+        return self.catalog.prerequisites()
+
+    @_synchronized
+    def search_lessons(self, query: str, limit: int = 10) -> List[Dict]:
+        """
+        Search lesson content without loading lessons
+
+        Args:
+            query: Search terms
+            limit: Maximum number of results
+
+        Returns:
+            List of dicts with id, topic, subtopic and score, best match first
+        """
+        results = []
+        for lesson_id, score in self.catalog.search(query, limit):
+            entry = self.catalog.lookup(lesson_id)
+            header = self.catalog.get_header(self.catalog.lesson_path(entry)) or {}
+            results.append({
+                'id': lesson_id,
+                'topic': entry.topic,
+                'subtopic': header.get('subtopic', ''),
+                'score': score,
+            })
+        return results
+
+    @_synchronized
     def get_lesson_by_id(self, lesson_id: str) -> Optional[Dict]:
         """Load a lesson by its ID"""
-        # Try all topics to find the lesson
-        all_topics = ['python', 'numpy', 'pandas', 'matplotlib', 'sklearn', 'eda', 'preprocessing']
-
-        for topic in all_topics:
-            lessons = self._load_topic_lessons_from_yaml(topic)
-            for lesson in lessons:
-                if lesson['id'] == lesson_id:
-                    return lesson
+        entry = self.catalog.lookup(lesson_id)
+        if entry is not None:
+            lesson = self._load_lesson_header(self.catalog.lesson_path(entry))
+            if lesson and lesson.get('id') == lesson_id:
+                return lesson
 
         # Fallback to sample lesson
         try:
@@ -178,6 +199,7 @@ class LessonLoader:
         except (ValueError, IndexError):
             return None
 
+    @_synchronized
     def get_topic_lessons(self, topic: str) -> List[Dict]:
         """Get all lessons for a topic"""
         # Try to load from YAML files first
@@ -193,6 +215,133 @@ class LessonLoader:
                 sample_lessons.append(lesson)
         return sample_lessons
 
+    def cache_stats(self) -> Dict[str, Any]:
+        """
+        Get lesson cache statistics
+
+        Returns:
+            dict with hit/miss/eviction counters and memory usage
+        """
+        return self._lesson_cache.stats()
+
+    @_synchronized
+    def clear_cache(self):
+        """Drop all cached lessons and topic listings"""
+        self._lesson_cache.invalidate()
+        self._topics_index.clear()
+
+    @_synchronized
+    def reload_lessons(self, paths: Optional[Iterable[Path]] = None) -> Set[str]:
+        """
+        Re-parse lesson files that changed and patch the indexes in place
+
+        Args:
+            paths: Files known to have changed; None checks every lesson file
+
+        Returns:
+            Ids of lessons that were added, removed or modified
+        """
+        changed = self.catalog.refresh_paths(paths)
+        if changed:
+            # Cache entries are stat-validated; dropping listings is enough
+            self._topics_index.clear()
+        return changed
+
+    def watch(self,
+              on_change: Optional[Callable[[Set[str]], None]] = None,
+              interval: float = 1.0,
+              use_polling: bool = False):
+        """
+        Start hot-reloading lessons when their YAML files change
+
+        Args:
+            on_change: Called from the watcher thread with changed lesson ids
+            interval: Polling interval in seconds
+            use_polling: Poll file stamps even if watchdog is installed
+        """
+        from .watcher import LessonWatcher
+
+        self.unwatch()
+        self._watcher = LessonWatcher(self, on_change=on_change, interval=interval,
+                                      use_polling=use_polling)
+        self._watcher.start()
+
+    def unwatch(self):
+        """Stop hot-reloading lessons"""
+        if self._watcher is not None:
+            self._watcher.stop()
+            self._watcher = None
+
+    @property
+    def is_watching(self) -> bool:
+        """Whether lesson files are being watched"""
+        return self._watcher is not None and self._watcher.is_running
+
+    @_synchronized
+    def _load_lesson_file(self, filepath: Path) -> Optional[Dict]:
+        """
+        Load a lesson through the in-process cache
+
+        The cache entry is keyed by path and validated against the file's
+        mtime and size, so edited files are picked up without a restart.
+
+        Args:
+            filepath: Path to YAML lesson file
+
+        Returns:
+            Lesson dictionary or None
+        """
+        try:
+            st = filepath.stat()
+        except OSError:
+            return None
+        stamp = (st.st_mtime_ns, st.st_size)
+
+        lesson = self._lesson_cache.get(filepath, stamp)
+        if lesson is None:
+            lesson = self.catalog.get_lesson(filepath, st)
+            if lesson is not None:
+                self._lesson_cache.put(filepath, stamp, lesson, st.st_size)
+        return lesson
+
+    def _load_lesson_header(self, filepath: Path) -> Optional[LazyLesson]:
+        """
+        Load a lesson's header, deferring its body until first access
+
+        Args:
+            filepath: Path to YAML lesson file
+
+        Returns:
+            LazyLesson or None
+        """
+        header = self.catalog.get_header(filepath)
+        if header is None:
+            return None
+        return LazyLesson(header, lambda: self._load_lesson_file(filepath))
+
+    def _topic_lesson_ids(self, topic: str) -> List[str]:
+        """Ordered lesson ids of a topic from the catalog index"""
+        return self.catalog.topic_lesson_ids(topic)
+
+    def _get_neighbour_lesson(self, topic: str, lesson_id: str, step: int) -> Optional[Dict]:
+        """Get the lesson `step` positions away from lesson_id within a topic"""
+        entry = self.catalog.lookup(lesson_id)
+        if entry is None or entry.topic != topic:
+            return None
+
+        lesson_ids = self.catalog.topic_lesson_ids(topic)
+        position = entry.position + step
+        if 0 <= position < len(lesson_ids):
+            return self.get_lesson_by_id(lesson_ids[position])
+        return None
+
+    def _topic_dir(self, topic: str) -> Optional[Path]:
+        """Directory of a topic from the topic registry"""
+        entry = self.catalog.get_topic(topic)
+        if entry is None or entry['dir'] is None:
+            return None
+        return self.lessons_dir / entry['dir']
+
     def _load_topic_lessons_from_yaml(self, topic: str) -> List[Dict]:
         """
         Load all lessons for a topic from YAML files
@@ -205,26 +354,26 @@ class LessonLoader:
         """
         lessons = []
 
-        # Map topic names to directory paths
-        topic_dirs = {
-            'python': self.lessons_dir / 'foundations' / 'python',
-            'numpy': self.lessons_dir / 'foundations' / 'numpy',
-            'pandas': self.lessons_dir / 'foundations' / 'pandas',
-            'matplotlib': self.lessons_dir / 'foundations' / 'matplotlib',
-            'sklearn': self.lessons_dir / 'intermediate' / 'sklearn',
-            'eda': self.lessons_dir / 'intermediate' / 'eda',
-            'preprocessing': self.lessons_dir / 'intermediate' / 'preprocessing',
-        }
+        topic_dir = self._topic_dir(topic)
+        if not topic_dir:
+            return []
 
-        topic_dir = topic_dirs.get(topic)
-        if not topic_dir or not topic_dir.exists():
+        try:
+            dir_mtime = topic_dir.stat().st_mtime_ns
+        except OSError:
             return []
 
-        # Load all YAML files in the topic directory
-        yaml_files = sorted(topic_dir.glob('*.yaml'))
+        # Reuse the topic's file listing until files are added or removed
+        cached = self._topics_index.get(topic)
+        if cached is not None and cached[0] == dir_mtime:
+            yaml_files = cached[1]
+        else:
+            yaml_files = self.catalog.list_lesson_files(topic_dir)
+            self._topics_index[topic] = (dir_mtime, yaml_files)
 
+        # Only headers are read here, bodies load when a lesson is rendered
         for yaml_file in yaml_files:
-            lesson = self.load_lesson_from_yaml(yaml_file)
+            lesson = self._load_lesson_header(yaml_file)
             if lesson:
                 lessons.append(lesson)
 
@@ -0,0 +1,211 @@
+"""
+Background prefetching of the next lesson
+"""
+
+import ast
+import importlib
+import importlib.util
+import os
+import sys
+import threading
+from typing import Dict, List, Optional
+
+from .lesson import LazyLesson
+
+
+# pyplot and seaborn pick a backend on import, which must happen on the
+# kernel's main thread; only their package is warmed in the background
+_MAIN_THREAD_IMPORTS = {
+    'matplotlib.pyplot': 'matplotlib',
+    'pylab': 'matplotlib',
+    'seaborn': None,
+}
+
+# Data files a lesson reads (e.g. '../data/sample_datasets/sales.csv')
+DATA_EXTENSIONS = ('.csv', '.tsv', '.txt', '.json', '.parquet', '.xlsx', '.xls')
+
+# Larger files are left to be read on demand
+MAX_WARM_BYTES = 64 * 1024 * 1024
+
+
+def lesson_code(lesson: Dict) -> List[str]:
+    """Code snippets of a lesson (examples, setup and starter code)"""
+    content = lesson.get('content') or {}
+    exercise = lesson.get('exercise') or {}
+
+    snippets = [example.get('code', '') for example in content.get('examples') or []
+                if isinstance(example, dict)]
+    snippets += [exercise.get('setup_code', ''), exercise.get('starter_code', '')]
+    return [snippet for snippet in snippets if snippet]
+
+
+def lesson_imports(lesson: Dict) -> List[str]:
+    """
+    Find the modules a lesson's code imports
+
+    Args:
+        lesson: Full lesson dictionary
+
+    Returns:
+        Module names in import order
+    """
+    modules = []
+
+    for tree in _parsed_code(lesson):
+        for node in ast.walk(tree):
+            if isinstance(node, ast.Import):
+                modules.extend(alias.name for alias in node.names)
+            elif isinstance(node, ast.ImportFrom) and node.module and not node.level:
+                modules.append(node.module)
+
+    return list(dict.fromkeys(modules))
+
+
+def lesson_data_files(lesson: Dict) -> List[str]:
+    """
+    Find the data files a lesson's code reads
+
+    Args:
+        lesson: Full lesson dictionary
+
+    Returns:
+        Paths as written in the code (relative to the notebook), in order
+    """
+    paths = []
+
+    for tree in _parsed_code(lesson):
+        for node in ast.walk(tree):
+            if (isinstance(node, ast.Constant) and isinstance(node.value, str)
+                    and node.value.lower().endswith(DATA_EXTENSIONS) and '\n' not in node.value):
+                paths.append(node.value)
+
+    return list(dict.fromkeys(paths))
+
+
+def _parsed_code(lesson: Dict) -> List[ast.AST]:
+    """Syntax trees of a lesson's code snippets that parse"""
+    trees = []
+    for snippet in lesson_code(lesson):
+        try:
+            trees.append(ast.parse(snippet))
+        except SyntaxError:
+            continue  # Starter code with blanks to fill in
+    return trees
+
+
+class LessonPrefetcher:
+    """
+    Warm the next lesson in a worker thread while the learner reads the current one
+
+    Prefetching loads the next lesson's body into the loader cache, imports
+    the modules its code uses and reads the data files it opens into the OS
+    page cache, so moving on doesn't pay for parsing, cold imports or cold
+    disk reads. Datasets are not parsed into the kernel's namespace: the
+    learner's own code loads them. Nothing is rendered ahead: lessons are
+    displayed as Markdown and HTML that the notebook front end renders. A
+    new prefetch or cancel() stops the previous one between steps.
+    """
+
+    def __init__(self, loader):
+        """
+        Initialize lesson prefetcher
+
+        Args:
+            loader: LessonLoader to prefetch lessons from
+        """
+        self.loader = loader
+        self._lock = threading.Lock()
+        self._cancelled = threading.Event()
+        self._thread = None
+        self.prefetched_id = None  # Id of the last fully prefetched lesson
+
+    @property
+    def is_running(self) -> bool:
+        """Whether a prefetch is in progress"""
+        return self._thread is not None and self._thread.is_alive()
+
+    def prefetch(self, topic: str, lesson_id: str):
+        """
+        Start prefetching the lesson after lesson_id in the background
+
+        Args:
+            topic: Current topic
+            lesson_id: Current lesson id
+        """
+        with self._lock:
+            self._cancelled.set()
+            self._cancelled = cancelled = threading.Event()
+            self._thread = threading.Thread(
+                target=self._run,
+                args=(topic, lesson_id, cancelled),
+                name='dstutor-prefetch',
+                daemon=True
+            )
+            self._thread.start()
+
+    def cancel(self):
+        """Stop the running prefetch (e.g. when the learner jumps elsewhere)"""
+        with self._lock:
+            self._cancelled.set()
+
+    def wait(self, timeout: Optional[float] = None):
+        """Wait for the running prefetch to finish"""
+        thread = self._thread
+        if thread is not None:
+            thread.join(timeout)
+
+    def _run(self, topic: str, lesson_id: str, cancelled: threading.Event):
+        """Worker thread: load the next lesson, then warm its imports and data files"""
+        try:
+            lesson = self.loader.get_next_lesson(topic, lesson_id)
+            if lesson is None or cancelled.is_set():
+                return
+            if isinstance(lesson, LazyLesson):
+                lesson = lesson.load()
+
+            for module in lesson_imports(lesson):
+                if cancelled.is_set():
+                    return
+                self._warm_import(module)
+
+            for path in lesson_data_files(lesson):
+                if cancelled.is_set():
+                    return
+                self._warm_file(path)
+
+            if not cancelled.is_set():
+                self.prefetched_id = lesson.get('id')
+        except Exception:
+            pass  # Prefetching is best-effort, the lesson loads normally on demand
+
+    @staticmethod
+    def _warm_import(module: str):
+        """Import a module ahead of time if it is installed and not yet imported"""
+        if module in _MAIN_THREAD_IMPORTS:
+            module = _MAIN_THREAD_IMPORTS[module]
+            if module is None:
+                return
+        if module in sys.modules:
+            return
+        try:
+            if importlib.util.find_spec(module.partition('.')[0]) is None:
+                return
+            importlib.import_module(module)
+        except Exception:
+            pass  # Missing optional dependency or failing import, the lesson will report it
+
+    @staticmethod
+    def _warm_file(path: str):
+        """Read a data file into the OS page cache, without parsing it"""
+        try:
+            # Relative paths resolve like in the learner's code: from the notebook
+            if os.path.getsize(path) > MAX_WARM_BYTES:
+                return
+            with open(path, 'rb') as f:
+                if hasattr(os, 'posix_fadvise'):
+                    os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_WILLNEED)
+                else:
+                    while f.read(1 << 20):
+                        pass
+        except OSError:
+            pass  # Missing file or a literal that isn't a path
@@ -0,0 +1,148 @@
+"""
+Prerequisite graph over lessons
+
+Built from each lesson's ``metadata.prerequisites`` when the catalog is
+compiled. Lessons get a bit in topological order and every lesson stores the
+transitive closure of its prerequisites as an integer bitmask, so checking
+whether a lesson is unlocked is one AND against the learner's completed mask.
+"""
+
+from typing import Dict, Iterable, List, Optional
+
+
+def build_prerequisite_graph(prerequisites: Dict[str, List[str]]) -> Dict:
+    """
+    Build the prerequisite DAG and its transitive closure
+
+    Cycles are broken by dropping the edge that closes them, and
+    prerequisites naming unknown lessons are ignored; both are reported.
+
+    Args:
+        prerequisites: lesson id -> ids of its direct prerequisites
+
+    Returns:
+        dict with 'ids' (topological order, index = bit), 'closure'
+        (prerequisite masks aligned with ids), 'cycles' and 'missing'
+    """
+    missing = {}
+    edges = {}
+    for lesson_id in sorted(prerequisites):
+        known = []
+        for prereq in prerequisites[lesson_id] or []:
+            if prereq in prerequisites:
+                if prereq != lesson_id and prereq not in known:
+                    known.append(prereq)
+            else:
+                missing.setdefault(lesson_id, []).append(prereq)
+        edges[lesson_id] = known
+
+    # Depth-first search in post-order puts prerequisites before dependents
+    order = []
+    cycles = []
+    state = {}  # lesson id -> 1 while on the stack, 2 when finished
+
+    for root in edges:
+        if root in state:
+            continue
+        state[root] = 1
+        stack = [(root, iter(list(edges[root])))]
+        while stack:
+            node, children = stack[-1]
+            for child in children:
+                child_state = state.get(child)
+                if child_state is None:
+                    state[child] = 1
+                    stack.append((child, iter(list(edges[child]))))
+                    break
+                if child_state == 1:
+                    # Back edge: record the cycle and drop the edge
+                    path = [n for n, _ in stack]
+                    cycles.append(path[path.index(child):] + [child])
+                    edges[node].remove(child)
+            else:
+                state[node] = 2
+                order.append(node)
+                stack.pop()
+
+    bits = {lesson_id: i for i, lesson_id in enumerate(order)}
+    closure = []
+    for lesson_id in order:
+        mask = 0
+        for prereq in edges[lesson_id]:
+            mask |= (1 << bits[prereq]) | closure[bits[prereq]]
+        closure.append(mask)
+
+    return {
+        'ids': order,
+        'closure': closure,
+        'cycles': cycles,
+        'missing': missing,
+    }
+
+
+class PrerequisiteGraph:
+    """Bitset view of the prerequisite graph for instant unlock checks"""
+
+    def __init__(self, graph: Optional[Dict] = None):
+        """
+        Initialize prerequisite graph
+
+        Args:
+            graph: Output of build_prerequisite_graph()
+        """
+        graph = graph or {'ids': [], 'closure': [], 'cycles': [], 'missing': {}}
+        self.ids = graph['ids']
+        self.closure = graph['closure']
+        self.cycles = graph['cycles']
+        self.missing = graph['missing']
+        self._bits = {lesson_id: i for i, lesson_id in enumerate(self.ids)}
+
+    def mask(self, lesson_ids: Iterable[str]) -> int:
+        """
+        Convert lesson ids to a bitmask
+
+        Args:
+            lesson_ids: Lesson identifiers (unknown ids are ignored)
+
+        Returns:
+            Integer bitmask
+        """
+        mask = 0
+        for lesson_id in lesson_ids:
+            bit = self._bits.get(lesson_id)
+            if bit is not None:
+                mask |= 1 << bit
+        return mask
+
+    def prerequisite_mask(self, lesson_id: str) -> int:
+        """Mask of all direct and indirect prerequisites of a lesson"""
+        bit = self._bits.get(lesson_id)
+        return self.closure[bit] if bit is not None else 0
+
+    def is_unlocked(self, lesson_id: str, completed_mask: int) -> bool:
+        """
+        Check whether every prerequisite of a lesson is completed
+
+        Args:
+            lesson_id: Lesson identifier
+            completed_mask: Mask of the learner's completed lessons
+
+        Returns:
+            True if the lesson is unlocked
+        """
+        required = self.prerequisite_mask(lesson_id)
+        return required & completed_mask == required
+
+    def missing_prerequisites(self, lesson_id: str, completed_mask: int) -> List[str]:
+        """
+        List the prerequisites a learner still has to complete
+
+        Args:
+            lesson_id: Lesson identifier
+            completed_mask: Mask of the learner's completed lessons
+
+        Returns:
+            Lesson ids in topological order
+        """
+        remaining = self.prerequisite_mask(lesson_id) & ~completed_mask
+        return [lesson_id for i, lesson_id in enumerate(self.ids) if remaining >> i & 1]
@@ -0,0 +1,204 @@
+"""
+Full-text search over lesson content
+
+The catalog keeps an inverted index (token -> {lesson file: term frequency})
+over lesson introductions, concepts, example code and hints. Queries are
+ranked with BM25 and the last query term also matches as a prefix, so
+``cross_val`` finds lessons mentioning ``cross_val_score``.
+"""
+
+import math
+import re
+from bisect import bisect_left
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+
+
+# BM25 parameters
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+# Prefix expansions score lower than exact matches
+PREFIX_WEIGHT = 0.5
+MAX_PREFIX_EXPANSIONS = 50
+
+# Titles are repeated so matches in them weigh more than in body text
+TITLE_WEIGHT = 3
+
+_TOKEN_RE = re.compile(r'[a-z_][a-z0-9_]*|\d+(?:\.\d+)?')
+
+_STOPWORDS = frozenset(
+    'a an and are as at be by can do for from has have how if in into is it its '
+    'of on or so that the their then this to use used using we what when which '
+    'will with you your'.split()
+)
+
+
+def tokenize(text: str, split_identifiers: bool = True) -> List[str]:
+    """
+    Split text into search tokens
+
+    Identifiers are kept whole and also split on underscores, so
+    'cross_val_score' yields cross_val_score, cross, val and score.
+
+    Args:
+        text: Text or code
+        split_identifiers: Also emit the underscore-separated parts
+
+    Returns:
+        List of lowercase tokens
+    """
+    tokens = []
+    for token in _TOKEN_RE.findall(text.lower()):
+        token = token.strip('_')
+        if len(token) < 2 or token in _STOPWORDS:
+            continue
+        tokens.append(token)
+        if split_identifiers and '_' in token:
+            tokens.extend(part for part in token.split('_') if len(part) > 1 and part not in _STOPWORDS)
+    return tokens
+
+
+def lesson_terms(lesson: Optional[Dict]) -> Dict[str, int]:
+    """
+    Extract term frequencies from the searchable fields of a lesson
+
+    Args:
+        lesson: Lesson dictionary
+
+    Returns:
+        token -> term frequency
+    """
+    if not lesson:
+        return {}
+
+    content = lesson.get('content') or {}
+    exercise = lesson.get('exercise') or {}
+
+    titles = [str(lesson.get('subtopic', '')), str(exercise.get('title', ''))]
+    texts = [str(content.get('introduction', '')), str(content.get('concept', ''))]
+
+    for example in content.get('examples') or []:
+        if isinstance(example, dict):
+            titles.append(str(example.get('title', '')))
+            texts.append(str(example.get('code', '')))
+
+    for hint in exercise.get('hints') or []:
+        texts.append(str(hint.get('text', '')) if isinstance(hint, dict) else str(hint))
+
+    terms = Counter()
+    for title in titles:
+        for token in tokenize(title):
+            terms[token] += TITLE_WEIGHT
+    for text in texts:
+        terms.update(tokenize(text))
+    return dict(terms)
+
+
+class SearchIndex:
+    """Inverted index with BM25 ranking and prefix matching"""
+
+    def __init__(self, data: Optional[Dict] = None):
+        """
+        Initialize search index
+
+        Args:
+            data: Output of to_dict() stored in the catalog manifest
+        """
+        data = data or {'postings': {}, 'lengths': {}}
+        self._postings = data['postings']  # token -> {doc: term frequency}
+        self._lengths = data['lengths']    # doc -> number of tokens
+        self._total_length = sum(self._lengths.values())
+        self._vocabulary = None            # sorted tokens, for prefix lookups
+
+    def __len__(self) -> int:
+        return len(self._lengths)
+
+    def to_dict(self) -> Dict:
+        """Serializable form of the index"""
+        return {'postings': self._postings, 'lengths': self._lengths}
+
+    def add(self, doc: str, terms: Dict[str, int]):
+        """
+        Index a document, replacing any previous version
+
+        Args:
+            doc: Document key (lesson file relative to lessons_dir)
+            terms: token -> term frequency, see lesson_terms()
+        """
+        self.remove(doc)
+        if not terms:
+            return
+        for token, count in terms.items():
+            self._postings.setdefault(token, {})[doc] = count
+        self._lengths[doc] = sum(terms.values())
+        self._total_length += self._lengths[doc]
+        self._vocabulary = None
+
+    def remove(self, doc: str):
+        """Drop a document from the index"""
+        length = self._lengths.pop(doc, None)
+        if length is None:
+            return
+        self._total_length -= length
+        for token in [token for token, docs in self._postings.items() if doc in docs]:
+            docs = self._postings[token]
+            del docs[doc]
+            if not docs:
+                del self._postings[token]
+        self._vocabulary = None
+
+    def documents(self) -> List[str]:
+        """Keys of the indexed documents"""
+        return list(self._lengths)
+
+    def search(self, query: str, limit: Optional[int] = 10) -> List[Tuple[str, float]]:
+        """
+        Rank documents against a query
+
+        Args:
+            query: Search terms
+            limit: Maximum number of results, None for all
+
+        Returns:
+            List of (doc, score) sorted by descending score
+        """
+        # Query identifiers stay whole, their parts are matched via the index
+        query_tokens = list(dict.fromkeys(tokenize(query, split_identifiers=False)))
+        if not query_tokens or not self._lengths:
+            return []
+
+        doc_count = len(self._lengths)
+        avg_length = self._total_length / doc_count
+        scores = {}
+
+        for i, query_token in enumerate(query_tokens):
+            # Prefix-match the last term, the one still being typed
+            matches = [(query_token, 1.0)] if query_token in self._postings else []
+            if i == len(query_tokens) - 1:
+                matches += [(token, PREFIX_WEIGHT) for token in self._expand_prefix(query_token)]
+
+            for token, weight in matches:
+                docs = self._postings[token]
+                idf = math.log(1 + (doc_count - len(docs) + 0.5) / (len(docs) + 0.5))
+                for doc, tf in docs.items():
+                    norm = BM25_K1 * (1 - BM25_B + BM25_B * self._lengths[doc] / avg_length)
+                    scores[doc] = scores.get(doc, 0.0) + weight * idf * tf * (BM25_K1 + 1) / (tf + norm)
+
+        ranked = sorted(scores.items(), key=lambda item: (-item[1], item[0]))
+        return ranked[:limit]
+
+    def _expand_prefix(self, prefix: str) -> List[str]:
+        """Vocabulary tokens starting with prefix (excluding prefix itself)"""
+        if self._vocabulary is None:
+            self._vocabulary = sorted(self._postings)
+
+        expansions = []
+        start = bisect_left(self._vocabulary, prefix)
+        for i in range(start, len(self._vocabulary)):
+            token = self._vocabulary[i]
+            if not token.startswith(prefix) or len(expansions) >= MAX_PREFIX_EXPANSIONS:
+                break
+            if token != prefix:
+                expansions.append(token)
+        return expansions
@@ -0,0 +1,128 @@
+"""
+Topic registry discovered from the lessons directory layout
+
+Lessons live in ``lessons/<level>/<topic>/*.yaml``. Every directory holding
+lesson files is a topic; its id is the directory name. A topic directory may
+contain a ``_topic.yaml`` file to set its display name, description and
+status, which lets third-party lesson packs register themselves by being
+copied into the lessons directory.
+"""
+
+from typing import Dict, List, Optional
+
+
+TOPIC_INFO_FILE = '_topic.yaml'
+
+# Level directory -> (display label, default topic status)
+LEVELS = {
+    'foundations': ('Level 1: Foundations (Beginner)', 'available'),
+    'intermediate': ('Level 2: Classical ML Pipeline (Intermediate)', 'locked'),
+    'advanced': ('Level 3: Advanced Topics (Advanced)', 'locked'),
+}
+
+# Display defaults for the bundled topics (overridden by _topic.yaml)
+KNOWN_TOPICS = {
+    'python': ('Python Fundamentals', 'Review Python basics'),
+    'numpy': ('NumPy Mastery', 'Array manipulation and operations'),
+    'pandas': ('Pandas Deep Dive', 'Data manipulation with Pandas'),
+    'matplotlib': ('Matplotlib & Seaborn', 'Data visualization'),
+    'eda': ('Exploratory Data Analysis', 'Understand and explore your data'),
+    'preprocessing': ('Data Preprocessing', 'Clean and prepare data for modeling'),
+    'sklearn': ('Scikit-Learn Modeling', 'Build machine learning models'),
+    'keras': ('Deep Learning with Keras', 'Neural networks with Keras'),
+    'pytorch': ('PyTorch Fundamentals', 'Deep learning with PyTorch'),
+}
+
+# Topics announced in the topic list before their lessons exist
+PLANNED_TOPICS = {
+    'advanced': ['keras', 'pytorch'],
+}
+
+# Bundled topics are listed in curriculum order, others alphabetically after
+_TOPIC_ORDER = {topic_id: i for i, topic_id in enumerate(KNOWN_TOPICS)}
+
+
+def make_topic(topic_id: str, level: str, rel_dir: Optional[str], info: Optional[Dict] = None) -> Dict:
+    """
+    Build a topic registry entry
+
+    Args:
+        topic_id: Topic id (directory name)
+        level: Level directory name (e.g. 'foundations')
+        rel_dir: Topic directory relative to the lessons dir, None if planned
+        info: Contents of the topic's _topic.yaml, if any
+
+    Returns:
+        dict with id, name, description, level, dir and status
+    """
+    info = info or {}
+    name, description = KNOWN_TOPICS.get(topic_id, (topic_id.replace('_', ' ').title(), ''))
+    default_status = LEVELS.get(level, ('', 'available'))[1]
+
+    return {
+        'id': topic_id,
+        'name': info.get('name', name),
+        'description': info.get('description', description),
+        'level': level,
+        'dir': rel_dir,
+        'status': info.get('status', default_status if rel_dir is not None else 'locked'),
+    }
+
+
+def build_topic_registry(topic_dirs: List[str], topic_info: Dict[str, Dict]) -> Dict[str, Dict]:
+    """
+    Build the topic registry from the directories that contain lessons
+
+    Args:
+        topic_dirs: Lesson directories relative to the lessons dir
+        topic_info: rel_dir -> parsed _topic.yaml contents
+
+    Returns:
+        topic id -> topic entry, in display order
+    """
+    topics = {}
+    for rel_dir in sorted(topic_dirs):
+        parts = rel_dir.split('/')
+        topic_id = parts[-1]
+        if not topic_id or topic_id in topics:
+            continue  # Lessons at the root, or a duplicate topic name
+        level = parts[0] if len(parts) > 1 else ''
+        topics[topic_id] = make_topic(topic_id, level, rel_dir, topic_info.get(rel_dir))
+
+    return dict(sorted(
+        topics.items(),
+        key=lambda item: (_TOPIC_ORDER.get(item[0], len(_TOPIC_ORDER)), item[0])
+    ))
+
+
+def group_topics_by_level(registry: Dict[str, Dict]) -> Dict[str, List[Dict]]:
+    """
+    Group registry topics by level for display, adding planned topics
+
+    Args:
+        registry: topic id -> topic entry
+
+    Returns:
+        dict mapping level labels to lists of topics
+    """
+    by_level = {}
+    for topic in registry.values():
+        by_level.setdefault(topic['level'], []).append(topic)
+
+    for level, planned in PLANNED_TOPICS.items():
+        for topic_id in planned:
+            if topic_id not in registry:
+                by_level.setdefault(level, []).append(make_topic(topic_id, level, None))
+
+    level_names = list(LEVELS) + sorted(level for level in by_level if level not in LEVELS)
+
+    grouped = {}
+    for level in level_names:
+        if level not in by_level:
+            continue
+        label = LEVELS[level][0] if level in LEVELS else (level.replace('_', ' ').title() or 'Other')
+        grouped[label] = [
+            {key: topic[key] for key in ('name', 'id', 'description', 'status')}
+            for topic in by_level[level]
+        ]
+    return grouped
@@ -0,0 +1,158 @@
+"""
+File watcher for hot-reloading lessons while authoring
+"""
+
+import queue
+import threading
+from pathlib import Path
+from typing import Callable, Optional, Set
+
+# watchdog (inotify on Linux) is optional, fall back to polling without it
+try:
+    from watchdog.events import FileSystemEventHandler
+    from watchdog.observers import Observer
+    WATCHDOG_AVAILABLE = True
+except ImportError:
+    FileSystemEventHandler = object
+    Observer = None
+    WATCHDOG_AVAILABLE = False
+
+
+class _LessonEventHandler(FileSystemEventHandler):
+    """Forward YAML file events to the watcher queue"""
+
+    def __init__(self, events: queue.Queue):
+        super().__init__()
+        self.events = events
+
+    def on_any_event(self, event):
+        if event.is_directory:
+            return
+        for path in (getattr(event, 'src_path', None), getattr(event, 'dest_path', None)):
+            if path and str(path).endswith('.yaml'):
+                self.events.put(Path(path))
+
+
+class LessonWatcher:
+    """
+    Watch the lessons directory and reload changed lessons
+
+    Uses watchdog (inotify, FSEvents, ...) when installed, otherwise polls
+    file stamps every `interval` seconds. Changes are applied through
+    LessonLoader.reload_lessons(), so only the changed files are re-parsed.
+    """
+
+    def __init__(self,
+                 loader,
+                 on_change: Optional[Callable[[Set[str]], None]] = None,
+                 interval: float = 1.0,
+                 use_polling: bool = False):
+        """
+        Initialize lesson watcher
+
+        Args:
+            loader: LessonLoader whose lessons should be kept up to date
+            on_change: Called with the ids of changed lessons
+            interval: Polling interval in seconds
+            use_polling: Poll even if watchdog is available
+        """
+        self.loader = loader
+        self.on_change = on_change
+        self.interval = interval
+        self.use_polling = use_polling or not WATCHDOG_AVAILABLE
+
+        self._events = queue.Queue()
+        self._stop_event = threading.Event()
+        self._thread = None
+        self._observer = None
+
+    @property
+    def is_running(self) -> bool:
+        """Whether the watcher thread is running"""
+        return self._thread is not None and self._thread.is_alive()
+
+    @property
+    def mode(self) -> str:
+        """'polling' or 'events'"""
+        return 'polling' if self.use_polling else 'events'
+
+    def start(self):
+        """Start watching in a background thread"""
+        if self.is_running:
+            return
+
+        self._stop_event.clear()
+
+        if not self.use_polling:
+            self._observer = Observer()
+            self._observer.schedule(
+                _LessonEventHandler(self._events),
+                str(self.loader.lessons_dir),
+                recursive=True
+            )
+            self._observer.daemon = True
+            self._observer.start()
+
+        self._thread = threading.Thread(target=self._run, name='dstutor-lesson-watcher', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop watching"""
+        self._stop_event.set()
+
+        if self._observer is not None:
+            self._observer.stop()
+            self._observer.join(timeout=2)
+            self._observer = None
+
+        if self._thread is not None:
+            self._thread.join(timeout=2)
+            self._thread = None
+
+    def poll(self) -> Set[str]:
+        """
+        Check for changes once and apply them
+
+        Returns:
+            Ids of lessons that changed
+        """
+        if self.use_polling:
+            return self.loader.reload_lessons()
+
+        paths = self._drain_events()
+        if not paths:
+            return set()
+        return self.loader.reload_lessons(paths)
+
+    def _drain_events(self, timeout: float = 0.0) -> Set[Path]:
+        """Collect queued file events, waiting up to timeout for the first one"""
+        paths = set()
+        try:
+            paths.add(self._events.get(timeout=timeout) if timeout else self._events.get_nowait())
+        except queue.Empty:
+            return paths
+
+        # Editors emit bursts of events per save, let the burst settle
+        self._stop_event.wait(0.1)
+        while True:
+            try:
+                paths.add(self._events.get_nowait())
+            except queue.Empty:
+                return paths
+
+    def _run(self):
+        """Watcher thread loop"""
+        while not self._stop_event.is_set():
+            if self.use_polling:
+                if self._stop_event.wait(self.interval):
+                    break
+                changed = self.loader.reload_lessons()
+            else:
+                paths = self._drain_events(timeout=self.interval)
+                changed = self.loader.reload_lessons(paths) if paths else set()
+
+            if changed and self.on_change:
+                try:
+                    self.on_change(changed)
+                except Exception as e:
+                    print(f"Error reloading lessons: {e}")
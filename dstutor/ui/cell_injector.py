@@ -14,7 +14,8 @@ class CellInjector:
         Inject complete lesson structure into notebook
 
         Args:
-            lesson: Lesson dictionary with content, examples, and exercises
+            lesson: Lesson mapping with content, examples, and exercises
+                (a LazyLesson loads its body here)
             tutor_engine: Reference to TutorEngine for interactive widgets
         """
         content = lesson.get('content', {})
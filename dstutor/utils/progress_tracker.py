@@ -5,7 +5,7 @@ Progress tracking system using SQLite
 import sqlite3
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, Optional, List
+from typing import Dict, Optional, List, Set
 
 
 class ProgressTracker:
@@ -234,6 +234,26 @@ class ProgressTracker:
 
         return result[0] if result else 'not_started'
 
+    def get_completed_lessons(self) -> Set[str]:
+        """
+        Get the ids of all completed lessons
+
+        Returns:
+            Set of lesson identifiers
+        """
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+
+        cursor.execute("""
+            SELECT lesson_id FROM lessons
+            WHERE user_id = ? AND status = 'completed'
+        """, (self.user_id,))
+
+        completed = {row[0] for row in cursor.fetchall()}
+        conn.close()
+
+        return completed
+
     def get_topic_progress(self, topic: str) -> Dict:
         """
         Get progress for a specific topic
@@ -41,6 +41,9 @@ setup(
             "flake8>=6.0.0",
             "mypy>=1.0.0",
         ],
+        "authoring": [
+            "watchdog>=3.0.0",
+        ],
         "advanced": [
             "xgboost>=1.7.0",
             "lightgbm>=4.0.0",
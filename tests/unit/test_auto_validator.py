@@ -0,0 +1,70 @@
+"""Tests for automatic validation of executed cells (dstutor/core/auto_validator.py)"""
+
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from dstutor.core.auto_validator import AutoValidator
+
+
+class FakeEngine:
+    """Stands in for TutorEngine: records the checks it is asked to run"""
+
+    def __init__(self, variables=('result',), plot=False):
+        self.variables = variables
+        self.plot = plot
+        self.validator = SimpleNamespace(sandbox=object())
+        self.current_lesson_id = 'lesson_01'
+        self.checked = []
+        self.done = threading.Event()
+
+    def checked_variables(self):
+        return self.variables
+
+    def checks_plot(self):
+        return self.plot
+
+    def validate_exercise(self, code, ai_feedback=True, record_attempt=True):
+        self.checked.append((code, ai_feedback, record_attempt))
+        self.done.set()
+        return {'success': True, 'is_correct': True, 'feedback': 'ok'}
+
+
+@pytest.mark.parametrize('code, relevant', [
+    ("result = df.mean()", True),
+    ("results = 1", False),
+    ("x = 1", False),
+    ("%dstutor check", False),
+    ("", False),
+])
+def test_cells_mentioning_checked_variables_are_relevant(code, relevant):
+    assert AutoValidator(FakeEngine(), str).is_relevant(code) is relevant
+
+
+@pytest.mark.parametrize('code, relevant', [
+    ("plt.plot(x, y)", True),
+    ("fig, ax = plt.subplots()\nax.set_title('Sales')", True),
+    ("x = np.arange(10)", False),
+])
+def test_plot_cells_are_relevant_in_plot_exercises(code, relevant):
+    assert AutoValidator(FakeEngine(variables=(), plot=True), str).is_relevant(code) is relevant
+
+
+def test_rerun_within_delay_replaces_pending_check():
+    engine = FakeEngine()
+    validator = AutoValidator(engine, str, delay=0.2)
+    validator.schedule("result = 1")
+    validator.schedule("result = 2")
+    assert engine.done.wait(5)
+    time.sleep(0.3)  # The first check would have run by now
+    assert engine.checked == [("result = 2", False, False)]
+
+
+def test_cancel_drops_pending_check():
+    engine = FakeEngine()
+    validator = AutoValidator(engine, str, delay=0.1)
+    validator.schedule("result = 1")
+    validator.cancel()
+    assert not engine.done.wait(0.5)
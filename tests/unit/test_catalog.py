@@ -0,0 +1,120 @@
+"""Tests for the compiled lesson catalog (dstutor/curriculum/catalog.py)"""
+
+import os
+import textwrap
+
+import pytest
+
+from dstutor.curriculum.catalog import LessonCatalog, build_catalog
+
+
+def _write_lesson(directory, lesson_id, order, title='Lesson', validation='type: "value_check"',
+                  prerequisites='[]'):
+    path = directory / f"{lesson_id}.yaml"
+    path.write_text(textwrap.dedent(f"""\
+        lesson:
+          id: "{lesson_id}"
+          title: "{title}"
+          order: {order}
+          metadata:
+            prerequisites: {prerequisites}
+          content:
+            introduction: "About {title}"
+          exercise:
+            solution: "result = 1"
+            validation:
+              {validation}
+        """), encoding='utf-8')
+    return path
+
+
+@pytest.fixture
+def lessons_dir(tmp_path):
+    topic = tmp_path / 'lessons' / 'foundations' / 'numpy'
+    topic.mkdir(parents=True)
+    _write_lesson(topic, 'numpy_01', 1, 'Arrays')
+    _write_lesson(topic, 'numpy_02', 2, 'Indexing', prerequisites='["numpy_01"]')
+    return tmp_path / 'lessons'
+
+
+def test_build_and_load_round_trip(lessons_dir, tmp_path):
+    """A saved catalog loads in a new instance with the same lessons"""
+    catalog_path = tmp_path / 'catalog.bin'
+    built = build_catalog(lessons_dir, catalog_path)
+    assert catalog_path.exists()
+
+    loaded = LessonCatalog(lessons_dir, catalog_path)
+    assert loaded.load(build_if_missing=False)
+    assert loaded.lesson_count == built.lesson_count == 2
+    assert loaded.topic_lesson_ids('numpy') == ['numpy_01', 'numpy_02']
+
+    entry = loaded.lookup('numpy_02')
+    assert (entry.topic, entry.position) == ('numpy', 1)
+    lesson = loaded.get_lesson(loaded.lesson_path(entry))
+    assert lesson['title'] == 'Indexing'
+    assert lesson['exercise']['solution'] == 'result = 1'
+    loaded.close()
+    built.close()
+
+
+def test_catalog_for_another_lessons_dir_is_rejected(lessons_dir, tmp_path):
+    catalog_path = tmp_path / 'catalog.bin'
+    build_catalog(lessons_dir, catalog_path).close()
+    other = tmp_path / 'other'
+    other.mkdir()
+    assert not LessonCatalog(other, catalog_path).load(build_if_missing=False)
+
+
+def test_corrupt_catalog_is_rebuilt(lessons_dir, tmp_path):
+    catalog_path = tmp_path / 'catalog.bin'
+    catalog_path.write_bytes(b'not a catalog')
+    catalog = LessonCatalog(lessons_dir, catalog_path)
+    assert catalog.load()
+    assert catalog.lesson_count == 2
+    catalog.close()
+
+
+def test_edited_lesson_is_reparsed(lessons_dir, tmp_path):
+    """Files changed after the build are read from YAML again"""
+    catalog_path = tmp_path / 'catalog.bin'
+    build_catalog(lessons_dir, catalog_path).close()
+
+    path = _write_lesson(lessons_dir / 'foundations' / 'numpy', 'numpy_01', 1, 'Arrays, edited')
+    st = path.stat()
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+
+    catalog = LessonCatalog(lessons_dir, catalog_path)
+    assert catalog.get_lesson(path)['title'] == 'Arrays, edited'
+    catalog.close()
+
+
+def test_new_lesson_is_found(lessons_dir, tmp_path):
+    catalog_path = tmp_path / 'catalog.bin'
+    build_catalog(lessons_dir, catalog_path).close()
+
+    topic = lessons_dir / 'foundations' / 'numpy'
+    _write_lesson(topic, 'numpy_03', 3, 'Broadcasting')
+    st = topic.stat()
+    os.utime(topic, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+
+    catalog = LessonCatalog(lessons_dir, catalog_path)
+    assert catalog.lookup('numpy_03') is not None
+    catalog.close()
+
+
+def test_authoring_problems_are_recorded_not_printed(lessons_dir, tmp_path, capsys):
+    topic = lessons_dir / 'foundations' / 'numpy'
+    _write_lesson(topic, 'numpy_03', 3, validation='type: "file_check"', prerequisites='["numpy_99"]')
+
+    catalog = LessonCatalog(lessons_dir, tmp_path / 'catalog.bin')
+    catalog.load()
+    assert capsys.readouterr().out == ''
+    assert catalog.validation_problems() == {'numpy_03': ['Unknown validation type: file_check']}
+    assert catalog.authoring_problems() == [
+        "numpy_03 has unknown prerequisites ['numpy_99']",
+        'numpy_03 validation: Unknown validation type: file_check',
+    ]
+
+    catalog.build(verbose=True)
+    assert 'Warning: numpy_03 validation: Unknown validation type: file_check' in capsys.readouterr().out
+    catalog.close()
@@ -0,0 +1,38 @@
+"""Tests for the executed-cell ring buffer (dstutor/core/cell_history.py)"""
+
+from types import SimpleNamespace
+
+from dstutor.core.cell_history import CellHistory
+
+
+def _result(code, success=True, execution_count=None):
+    """Stand-in for IPython's ExecutionResult"""
+    return SimpleNamespace(info=SimpleNamespace(raw_cell=code), success=success,
+                           execution_count=execution_count)
+
+
+def test_oldest_cells_are_dropped():
+    history = CellHistory(max_cells=3)
+    for i in range(5):
+        history.add(f'x = {i}')
+    assert [record.code for record in history.cells()] == ['x = 2', 'x = 3', 'x = 4']
+
+
+def test_magics_and_blank_cells_are_not_recorded():
+    history = CellHistory()
+    history.post_run_cell(_result('result = 1', execution_count=1))
+    history.post_run_cell(_result('%dstutor check'))
+    history.post_run_cell(_result('   \n'))
+    assert len(history) == 1
+    assert history.last().execution_count == 1
+
+
+def test_last_successful_skips_failed_cells():
+    history = CellHistory()
+    history.post_run_cell(_result('result = 1'))
+    history.post_run_cell(_result('result = 1 / 0', success=False))
+    assert history.last().code == 'result = 1 / 0'
+    assert history.last(successful=True).code == 'result = 1'
+
+    history.clear()
+    assert history.last() is None
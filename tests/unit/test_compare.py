@@ -0,0 +1,103 @@
+"""Tests for nested result comparison (dstutor/core/compare.py)"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from dstutor.core.compare import compare_frames, compare_series, find_mismatch, mismatch_mask
+
+
+def test_frames_compare_column_by_column():
+    expected = pd.DataFrame({'a': [1.0, 2.0], 'b': ['x', 'y']})
+    assert compare_frames(expected.copy(), expected) is None
+    assert find_mismatch(expected.copy(), expected) is None
+    assert "Column 'b'" in compare_frames(expected.assign(b=['x', 'z']), expected)
+    assert 'Shape mismatch' in compare_frames(expected.head(1), expected)
+
+
+def test_frames_match_within_tolerance():
+    expected = pd.DataFrame({'a': [0.1 + 0.2, np.nan]})
+    assert compare_frames(pd.DataFrame({'a': [0.3, np.nan]}), expected) is None
+    assert compare_frames(pd.DataFrame({'a': [0.31, np.nan]}), expected) is not None
+    assert compare_frames(pd.DataFrame({'a': [0.31, np.nan]}), expected, atol=0.05) is None
+
+
+def test_labels_are_optional():
+    expected = pd.DataFrame({'a': [1, 2]})
+    renamed = pd.DataFrame({'x': [1, 2]}, index=[5, 6])
+    assert 'Column mismatch' in compare_frames(renamed, expected)
+    assert compare_frames(renamed, expected, check_labels=False) is None
+
+
+def test_differing_rows_are_summarised():
+    message = compare_series(pd.Series(range(10)), pd.Series(range(10)) * 2, name='n')
+    assert message.startswith("Column 'n' doesn't match the expected result: 9 of 10 rows differ")
+    assert message.endswith('row 3: got 3, expected 6; and 6 more)')
+
+
+@pytest.mark.parametrize('actual, expected', [
+    (pd.Series([1, None], dtype='Int64'), pd.Series([1.0, np.nan])),
+    (pd.Series(['a', None], dtype='string'), pd.Series(['a', None], dtype='string')),
+    (np.array([1, 2], dtype=object), np.array([1.0, 2.0])),
+])
+def test_missing_values_and_dtypes_compare_by_value(actual, expected):
+    assert not mismatch_mask(actual, expected).any()
+
+
+def test_equal_nested_values_match():
+    value = {'mean': [1.0, 2.0, float('nan')], 'count': 3, 'tags': {'a', 'b'}, 'ok': True}
+    assert find_mismatch(value, {'mean': [1.0, 2.0, float('nan')], 'count': 3, 'tags': {'a', 'b'}, 'ok': True}) is None
+
+
+def test_reports_path_of_first_difference():
+    mismatch = find_mismatch({'mean': [1.0, 2.0, 2.5]}, {'mean': [1.0, 2.0, 2.0]})
+    assert mismatch.path == "result['mean'][2]"
+    assert mismatch.reason == 'got 2.5, expected 2.0'
+
+
+def test_numbers_match_within_tolerance():
+    assert find_mismatch(1.0 + 1e-9, 1.0) is None
+    assert find_mismatch(1.1, 1.0, atol=0.2) is None
+    assert find_mismatch(1.1, 1.0) is not None
+
+
+@pytest.mark.parametrize('actual, expected, reason', [
+    ({'a': 1}, {'a': 1, 'b': 2}, "missing key 'b'"),
+    ({'a': 1, 'c': 3}, {'a': 1}, "unexpected key 'c'"),
+    ([1, 2], [1, 2, 3], '2 items, expected 3'),
+    ({1, 2}, {1, 2, 3}, 'missing 3'),
+    (5, [5], 'expected a list, got number'),
+    (None, 1, 'expected a number, got None'),
+    (1, True, 'got 1, expected True'),
+])
+def test_mismatch_reasons(actual, expected, reason):
+    assert find_mismatch(actual, expected).reason == reason
+
+
+def test_yaml_null_mapping_is_a_set():
+    """YAML writes {4, 5} as a mapping to nulls"""
+    assert find_mismatch({4, 5}, {4: None, 5: None}) is None
+
+
+def test_lists_and_tuples_are_interchangeable():
+    assert find_mismatch((1, 2), [1, 2]) is None
+
+
+@pytest.mark.parametrize('actual', [np.array([1.0, 2.0, 3.0]), pd.Series([1, 2, 3]), [1, 2, 3]])
+def test_array_likes_are_interchangeable(actual):
+    """Arrays, Series and lists holding the same values match each other"""
+    assert find_mismatch(actual, [1, 2, 3]) is None
+    assert find_mismatch(actual, np.array([1, 2, 3])) is None
+    assert find_mismatch(actual, pd.Series([1, 2, 3])) is None
+
+
+def test_array_like_values_still_compared():
+    mismatch = find_mismatch(np.array([1.0, 2.0, 4.0]), [1, 2, 3])
+    assert mismatch.path == 'result[2]'
+    assert find_mismatch(np.array(['a', 'b']), ['a', 'c']).path == 'result[1]'
+    assert find_mismatch(np.array([1, 2]), [1, 2, 3]) is not None
+
+
+def test_ndarray_mismatch_uses_numpy_index():
+    mismatch = find_mismatch(np.array([[1, 2], [3, 5]]), np.array([[1, 2], [3, 4]]))
+    assert mismatch.path == 'result[1, 1]'
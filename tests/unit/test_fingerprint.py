@@ -0,0 +1,37 @@
+"""Tests for fingerprints of large expected results (dstutor/core/fingerprint.py)"""
+
+import numpy as np
+import pandas as pd
+
+from dstutor.core.fingerprint import compare_sketches, fingerprint, fingerprint_check, summarize
+from dstutor.core.rules import get_plan
+
+
+def test_fingerprint_ignores_noise_below_the_rounding():
+    values = np.linspace(0, 1, 1000)
+    assert fingerprint(values + 1e-12) == fingerprint(values)
+    assert fingerprint(np.array([-0.0, np.nan])) == fingerprint(np.array([0.0, np.nan]))
+    assert fingerprint(values[::-1]) != fingerprint(values)
+
+
+def test_frame_fingerprint_covers_shape_and_column_names():
+    frame = pd.DataFrame({'a': [1.0, 2.0], 'b': ['x', 'y']})
+    assert fingerprint(frame) == fingerprint(frame.copy())
+    assert fingerprint(frame.rename(columns={'b': 'c'})) != fingerprint(frame)
+    assert fingerprint(frame['a'].to_numpy()) != fingerprint(frame['a'].to_numpy().reshape(2, 1))
+
+
+def test_sketches_tolerate_noise_but_not_reordering():
+    values = np.random.default_rng(0).normal(size=10_000)
+    _, expected = summarize(values)
+    assert compare_sketches(summarize(values * (1 + 1e-9))[1], expected) is None
+
+    message = compare_sketches(summarize(values[::-1])[1], expected)
+    assert message.startswith("Column '0' doesn't match") and 'weighted_sum' in message
+
+
+def test_fingerprint_check_in_a_validation_plan():
+    expected = np.arange(100_000) / 7
+    plan = get_plan({'type': 'array_check', 'checks': [fingerprint_check(expected)]})
+    assert plan.check_result(expected.copy(), None)[0]
+    assert not plan.check_result(expected + 1, None)[0]
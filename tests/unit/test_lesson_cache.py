@@ -0,0 +1,42 @@
+"""Tests for the bounded lesson cache (dstutor/curriculum/lesson_cache.py)"""
+
+from dstutor.curriculum.lesson_cache import LessonCache
+
+
+def test_hit_requires_matching_stamp():
+    cache = LessonCache()
+    cache.put('numpy_01', (1.0, 100), {'id': 'numpy_01'}, 100)
+    assert cache.get('numpy_01', (1.0, 100)) == {'id': 'numpy_01'}
+
+    # The file changed: the stale entry is dropped
+    assert cache.get('numpy_01', (2.0, 120)) is None
+    assert 'numpy_01' not in cache
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = LessonCache(max_bytes=250)
+    cache.put('a', (), 'A', 100)
+    cache.put('b', (), 'B', 100)
+    cache.get('a', ())  # 'b' is now the oldest
+    cache.put('c', (), 'C', 100)
+
+    assert 'a' in cache and 'c' in cache and 'b' not in cache
+    assert cache.stats()['bytes'] == 200
+    assert cache.evictions == 1
+
+
+def test_oversized_value_is_not_cached():
+    cache = LessonCache(max_bytes=50)
+    cache.put('big', (), 'x', 100)
+    assert len(cache) == 0
+
+
+def test_replacing_an_entry_releases_its_size():
+    cache = LessonCache()
+    cache.put('a', (1,), 'old', 100)
+    cache.put('a', (2,), 'new', 30)
+    assert cache.stats()['bytes'] == 30
+
+    cache.invalidate()
+    assert len(cache) == 0 and cache.stats()['bytes'] == 0
@@ -0,0 +1,67 @@
+"""Tests for figure validation (dstutor/core/plot_check.py)"""
+
+import matplotlib
+matplotlib.use('Agg')
+
+import matplotlib.pyplot as plt  # noqa: E402
+import numpy as np  # noqa: E402
+import pytest  # noqa: E402
+
+from dstutor.core.rules import get_plan  # noqa: E402
+from dstutor.core.validator import CodeValidator  # noqa: E402
+
+
+def _plot_rules(*checks):
+    return {'type': 'plot_check', 'checks': list(checks)}
+
+
+@pytest.fixture
+def figure():
+    fig, (left, right) = plt.subplots(1, 2)
+    left.plot([0, 1, 2], [0, 1, 4])
+    left.set_xlabel('X-axis')
+    right.hist(np.random.default_rng(0).normal(size=100))
+    right.set_title('Distribution')
+    yield fig
+    plt.close(fig)
+
+
+def test_artist_and_text_checks(figure):
+    plan = get_plan(_plot_rules(
+        {'type': 'subplot_count', 'expected': 2},
+        {'type': 'has_lines', 'expected': True, 'axes': 0},
+        {'type': 'has_histogram', 'expected': True},
+        {'type': 'xlabel', 'expected': 'x-axis'},
+        {'type': 'title', 'expected': True, 'axes': 1},
+    ))
+    assert plan.check_result(figure, None)[0]
+
+
+@pytest.mark.parametrize('check, message', [
+    ({'type': 'subplot_count', 'expected': 4}, 'Expected 4 subplots, found 2'),
+    ({'type': 'has_scatter', 'expected': True}, 'No scatter plot found in your plot'),
+    ({'type': 'has_lines', 'expected': True, 'axes': 1}, 'No line found in subplot 1'),
+    ({'type': 'title', 'expected': 'Sales'}, "The title should be 'Sales' (found 'Distribution')"),
+    ({'type': 'ylabel', 'expected': True, 'axes': 5}, 'Subplot 5 not found'),
+])
+def test_failed_checks_explain_what_is_missing(figure, check, message):
+    is_correct, feedback = get_plan(_plot_rules(check)).check_result(figure, None)
+    assert not is_correct and message in feedback
+
+
+def test_data_limits(figure):
+    assert get_plan(_plot_rules({'type': 'data_limits', 'x': [0, 2], 'y': [0, 4], 'axes': 0})) \
+        .check_result(figure, None)[0]
+    is_correct, feedback = get_plan(_plot_rules({'type': 'data_limits', 'y': [0, 9], 'axes': 0})) \
+        .check_result(figure, None)
+    assert not is_correct and 'should range from 0 to 9' in feedback
+
+
+def test_each_submission_draws_on_a_fresh_figure():
+    validator = CodeValidator()
+    rules = _plot_rules({'type': 'has_lines', 'expected': 1}, {'type': 'has_scatter', 'expected': False})
+    before = plt.get_fignums()
+
+    assert validator.validate("plt.plot([1, 2], [3, 4])", None, rules)[0]
+    assert validator.validate("x = 1", None, rules) == (False, 'Expected at least 1 line in your plot, found 0')
+    assert plt.get_fignums() == before
@@ -0,0 +1,31 @@
+"""Tests for next-lesson prefetching (dstutor/curriculum/prefetch.py)"""
+
+from dstutor.curriculum.prefetch import LessonPrefetcher, lesson_data_files, lesson_imports
+
+
+LESSON = {
+    'content': {'examples': [
+        {'code': "import pandas as pd\ndf = pd.read_csv('../data/sample_datasets/sales.csv')"},
+        {'code': "from sklearn.datasets import load_iris\nprint('done')"},
+    ]},
+    'exercise': {
+        'setup_code': "import numpy as np",
+        'starter_code': "df = pd.read_json('products.json')\nresult = ___ +",
+    },
+}
+
+
+def test_lesson_imports_in_order():
+    assert lesson_imports(LESSON) == ['pandas', 'sklearn.datasets', 'numpy']
+
+
+def test_lesson_data_files_skip_code_that_does_not_parse():
+    assert lesson_data_files(LESSON) == ['../data/sample_datasets/sales.csv']
+
+
+def test_warm_file_ignores_missing_files(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / 'sales.csv').write_text('a\n1\n')
+    LessonPrefetcher._warm_file('sales.csv')
+    LessonPrefetcher._warm_file('missing.csv')
+    assert sorted(p.name for p in tmp_path.iterdir()) == ['sales.csv']
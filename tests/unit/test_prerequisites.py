@@ -0,0 +1,31 @@
+"""Tests for the prerequisite graph (dstutor/curriculum/prerequisites.py)"""
+
+from dstutor.curriculum.prerequisites import PrerequisiteGraph, build_prerequisite_graph
+
+
+def _graph(prerequisites):
+    return PrerequisiteGraph(build_prerequisite_graph(prerequisites))
+
+
+def test_closure_includes_indirect_prerequisites():
+    graph = _graph({'a': [], 'b': ['a'], 'c': ['b'], 'd': []})
+    assert graph.prerequisite_mask('c') == graph.mask(['a', 'b'])
+    assert graph.ids.index('a') < graph.ids.index('b') < graph.ids.index('c')
+
+
+def test_unlock_needs_every_prerequisite():
+    graph = _graph({'a': [], 'b': ['a'], 'c': ['b']})
+    assert graph.is_unlocked('a', 0)
+    assert not graph.is_unlocked('c', graph.mask(['b']))
+    assert graph.is_unlocked('c', graph.mask(['a', 'b']))
+    assert graph.missing_prerequisites('c', graph.mask(['b'])) == ['a']
+
+
+def test_cycles_and_unknown_prerequisites_are_reported():
+    result = build_prerequisite_graph({'a': ['b'], 'b': ['a'], 'c': ['nope']})
+    assert result['cycles'] == [['a', 'b', 'a']]
+    assert result['missing'] == {'c': ['nope']}
+
+    graph = PrerequisiteGraph(result)
+    assert graph.is_unlocked('c', 0)
+    assert graph.prerequisite_mask('unknown') == 0
@@ -0,0 +1,96 @@
+"""Tests for the validation rule compiler (dstutor/core/rules.py)"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from dstutor.core.rules import RuleError, compile_rules, get_plan, rule_problems
+
+
+def test_get_plan_caches_by_content():
+    """Equal rule blocks (e.g. one lesson loaded twice) share one compiled plan"""
+    def rules():
+        return {'type': 'array_check', 'checks': [{'type': 'shape', 'expected': [2, 2]}]}
+    assert get_plan(rules()) is get_plan(rules())
+
+
+def test_get_plan_targets():
+    """Each validation type selects what the checks receive"""
+    assert get_plan({'type': 'value_check'}).target == 'result'
+    assert get_plan({'type': 'solution_check', 'variables': 'x'}).variables == ('x',)
+    assert get_plan({'type': 'plot_check', 'checks': [{'type': 'has_lines'}]}).target == 'plot'
+
+    plan = get_plan({'checks': [{'variable': 'a', 'expected': 1}, {'variable': 'b', 'type': 'int'}]})
+    assert plan.target == 'variables'
+    assert plan.variables == ('a', 'b')
+
+
+def test_array_check_passes_and_fails():
+    """Compiled array checks report the first failing check"""
+    plan = get_plan({'type': 'array_check', 'checks': [
+        {'type': 'shape', 'expected': [3]},
+        {'type': 'values', 'expected': [1, 2, 3]},
+    ]})
+    assert plan.check_result(np.array([1, 2, 3]), None) == (True, plan.success)
+
+    is_correct, message = plan.check_result(np.array([1, 2]), None)
+    assert not is_correct and 'Shape mismatch' in message
+
+    is_correct, message = plan.check_result([1, 2, 3], None)
+    assert not is_correct and 'Expected numpy array' in message
+
+
+def test_dataframe_check_columns():
+    plan = get_plan({'type': 'dataframe_check', 'checks': [{'type': 'columns', 'expected': ['a', 'b']}]})
+    assert plan.check_result(pd.DataFrame({'a': [1], 'b': [2]}), None)[0]
+    assert not plan.check_result(pd.DataFrame({'b': [1], 'a': [2]}), None)[0]
+
+
+def test_variable_checks_report_every_failure():
+    plan = get_plan({'checks': [{'variable': 'a', 'expected': 1}, {'variable': 'b', 'expected': 2}]})
+    is_correct, message = plan.check_variables({'a': 0})
+    assert not is_correct
+    assert message.splitlines() == ["Variable 'a' has wrong value: expected 1, got 0", "Variable 'b' not found"]
+
+
+def test_forbid_and_require_are_compiled():
+    plan = get_plan({'type': 'value_check', 'forbid': ['loop'],
+                     'require': [{'construct': 'np.where', 'message': 'Use np.where'}]})
+    assert plan.forbidden == (('loop', ''),)
+    assert plan.required == (('np.where', 'Use np.where'),)
+
+
+@pytest.mark.parametrize('rules, fragment', [
+    ({'type': 'no_such_check'}, 'Unknown validation type'),
+    ({'type': 'dataframe_check', 'checks': [{'type': 'columns', 'expected': 5}]}, 'must be a list'),
+    ({'type': 'dataframe_check', 'checks': [{'type': 'values', 'expected_values': [[1]], 'rtol': 'x'}]},
+     'rtol must be a number'),
+    ({'type': 'array_check', 'checks': [{'type': 'shape'}]}, "needs 'expected'"),
+    ({'type': 'array_check', 'checks': [{'type': 'min_max', 'min': 'low'}]}, 'min must be a number'),
+    ({'type': 'array_check', 'checks': [{'type': 'fingerprint', 'expected': 'abc', 'atol': []}]},
+     'atol must be a number'),
+    ({'type': 'plot_check', 'checks': [{'type': 'data_limits', 'x': [0, 1], 'rtol': [1]}]},
+     'rtol must be a number'),
+    ({'type': 'solution_check', 'variables': 5}, 'variables must be a list'),
+    ({'type': 'type_check', 'expected_type': ['list']}, 'Unknown expected type'),
+    ({'type': 'value_check', 'tolerance': 'tight'}, 'tolerance must be a number'),
+    ({'type': 'value_check', 'checks': 'shape'}, "'checks' must be a list"),
+    ({'type': 'value_check', 'forbid': 5}, "'forbid' must be a list"),
+])
+def test_malformed_rules_raise_rule_error(rules, fragment):
+    """Malformed blocks raise RuleError, never TypeError or ValueError"""
+    with pytest.raises(RuleError, match=fragment):
+        compile_rules(rules)
+
+    problems = rule_problems(rules)
+    assert len(problems) == 1 and fragment in problems[0]
+
+
+def test_rule_problems_lists_ignored_checks():
+    rules = {'type': 'dataframe_check', 'checks': [{'type': 'index_type', 'expected': 'RangeIndex'}]}
+    assert rule_problems(rules) == ["unknown check 'index_type' is ignored"]
+
+
+def test_rule_problems_empty_for_valid_block():
+    assert rule_problems({'type': 'value_check'}) == []
+    assert rule_problems(None) == []
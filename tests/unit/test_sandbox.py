@@ -0,0 +1,119 @@
+"""Tests for the sandbox worker pool and its resource limits (dstutor/core/sandbox.py)"""
+
+import os
+import sys
+import time
+
+import pytest
+
+from dstutor.core.rules import RuleError, compile_rules
+from dstutor.core.sandbox import (
+    MemoryExceeded, OutputLimitExceeded, ResourceLimits, SandboxPool, TimeoutExceeded
+)
+from dstutor.core.solution_cache import SolutionCache
+from dstutor.core.validator import CodeValidator
+
+
+@pytest.fixture(scope='module')
+def pool():
+    # Nothing preloaded: the workers start faster and import what a test uses
+    pool = SandboxPool(workers=1, preload=('dstutor.core.sandbox_worker',))
+    pool.start(wait=True)
+    yield pool
+    pool.shutdown()
+
+
+def _rules(**limits):
+    return {'type': 'value_check', 'limits': limits}
+
+
+def test_limits_from_rules():
+    limits = ResourceLimits.from_rules(_rules(timeout=30, memory_mb='2048'))
+    assert limits.timeout == 30.0
+    assert limits.memory_mb == 2048
+    assert limits.cpu_seconds == ResourceLimits().cpu_seconds
+
+
+@pytest.mark.parametrize('limits, fragment', [
+    (30, 'limits must be a mapping'),
+    ({'timout': 30}, "unknown limit 'timout'"),
+    ({'timeout': 'long'}, 'timeout must be a number'),
+    ({'memory_mb': 0}, 'memory_mb must be positive'),
+])
+def test_malformed_limits_are_rule_errors(limits, fragment):
+    with pytest.raises(RuleError, match=fragment):
+        compile_rules({'type': 'value_check', 'limits': limits})
+
+
+def test_run_validates_in_worker(pool):
+    assert pool.run('result = 42', 42, _rules()) == (True, 'Correct! ✅')
+    assert pool.run('result = 41', 42, _rules())[0] is False
+
+
+def test_submissions_run_outside_the_kernel(pool):
+    assert pool.run('import os\nresult = os.getpid()', os.getpid(), _rules())[0] is False
+    assert pool.stats()['workers'] == 1
+
+
+def test_wall_clock_timeout(pool):
+    start = time.monotonic()
+    with pytest.raises(TimeoutExceeded):
+        pool.run('import time\ntime.sleep(30)\nresult = 1', 1, _rules(timeout=1))
+    assert time.monotonic() - start < 5
+    assert pool.run('result = 1', 1, _rules()) == (True, 'Correct! ✅')  # Replaced worker
+
+
+@pytest.mark.skipif(not sys.platform.startswith('linux'), reason="RLIMIT_CPU/RLIMIT_AS enforced on Linux")
+def test_cpu_limit(pool):
+    start = time.monotonic()
+    with pytest.raises(TimeoutExceeded, match='CPU time'):
+        pool.run('while True:\n    pass\nresult = 1', 1, _rules(timeout=30, cpu_seconds=1))
+    # The budget is rounded up, never down
+    assert 1 <= time.monotonic() - start < 10
+
+
+@pytest.mark.skipif(not sys.platform.startswith('linux'), reason="RLIMIT_AS enforced on Linux")
+def test_memory_limit(pool):
+    with pytest.raises(MemoryExceeded):
+        pool.run("x = bytearray(512 * 1024 * 1024)\nresult = 1", 1, _rules(memory_mb=64))
+
+
+def test_output_limit(pool):
+    with pytest.raises(OutputLimitExceeded):
+        pool.run("while True:\n    print('x' * 1000)\nresult = 1", 1, _rules(max_output_bytes=10_000))
+
+
+def test_jobs_run_in_the_kernel_directory(pool, tmp_path, monkeypatch):
+    """Relative data paths resolve like in the notebook"""
+    (tmp_path / 'data.csv').write_text('a\n1\n2\n')
+    monkeypatch.chdir(tmp_path)
+    assert pool.run("result = int(pd.read_csv('data.csv')['a'].sum())", 3, _rules()) == (True, 'Correct! ✅')
+
+
+def test_reference_solution_runs_in_worker(pool, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    validator = CodeValidator(sandbox=pool, solution_cache=SolutionCache(tmp_path / 'cache'))
+    values = validator.reference_results("import os\nopen('x.txt', 'w')\nresult = os.getpid()")
+    assert values['result'] != os.getpid()
+    assert not (tmp_path / 'x.txt').exists()
+
+    assert validator.validate_namespace({'result': 3}, 'result = 1 + 2', {'type': 'solution_check'})[0]
+
+
+def test_in_process_fallback_enforces_timeout():
+    validator = CodeValidator()
+    with pytest.raises(TimeoutExceeded):
+        validator.validate('while True:\n    pass\nresult = 1', 1, _rules(timeout=0.5))
+
+
+@pytest.mark.parametrize('code', [
+    "print('x')\nresult = 1 / 0",
+    "while True:\n    print('x' * 1000)\nresult = 1",
+])
+def test_in_process_fallback_restores_stdout(code):
+    stdout = sys.stdout
+    try:
+        CodeValidator().validate(code, 1, _rules(max_output_bytes=10_000))
+    except OutputLimitExceeded:
+        pass
+    assert sys.stdout is stdout
@@ -0,0 +1,46 @@
+"""Tests for full-text lesson search (dstutor/curriculum/search.py)"""
+
+from dstutor.curriculum.search import SearchIndex, lesson_terms, tokenize
+
+
+def _index():
+    index = SearchIndex()
+    index.add('sklearn_05.yaml', lesson_terms({
+        'subtopic': 'Cross-validation',
+        'content': {'examples': [{'code': 'scores = cross_val_score(model, X, y, cv=5)'}]},
+    }))
+    index.add('pandas_02.yaml', lesson_terms({
+        'subtopic': 'Selecting data',
+        'content': {'introduction': 'Use loc and iloc to select rows and columns.'},
+    }))
+    index.add('pandas_07.yaml', lesson_terms({
+        'subtopic': 'Grouping',
+        'content': {'introduction': 'Group rows with groupby, then select columns to aggregate.'},
+    }))
+    return index
+
+
+def test_identifiers_are_split_on_underscores():
+    assert tokenize('cross_val_score(model)') == ['cross_val_score', 'cross', 'val', 'score', 'model']
+    assert tokenize('the and a x') == []
+
+
+def test_results_are_ranked_by_score():
+    results = _index().search('select')
+    assert [doc for doc, _ in results] == ['pandas_02.yaml', 'pandas_07.yaml']
+    assert results[0][1] > results[1][1]
+
+
+def test_last_term_matches_as_prefix():
+    assert [doc for doc, _ in _index().search('cross_val')] == ['sklearn_05.yaml']
+    assert _index().search('groupb')[0][0] == 'pandas_07.yaml'
+
+
+def test_removed_and_replaced_documents():
+    index = _index()
+    index.remove('pandas_07.yaml')
+    assert index.search('groupby') == []
+
+    index.add('pandas_02.yaml', {'merge': 1})
+    assert index.search('iloc') == []
+    assert SearchIndex(index.to_dict()).search('merge')[0][0] == 'pandas_02.yaml'
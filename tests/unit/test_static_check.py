@@ -0,0 +1,40 @@
+"""Tests for the static pre-check of submissions (dstutor/core/static_check.py)"""
+
+from dstutor.core.static_check import precheck
+
+
+def test_syntax_error_is_reported():
+    assert precheck('result = (').startswith('Syntax Error')
+
+
+def test_missing_result_is_reported():
+    assert precheck('x = 1', ('result',)) == "Please store your answer in a variable called 'result'"
+    assert precheck('result = 1', ('result',)) is None
+
+
+def test_missing_variables_are_all_reported():
+    assert precheck('a = 1', ('a', 'b', 'c')) == "Variable 'b' not found\nVariable 'c' not found"
+
+
+def test_setup_and_dynamic_bindings_count_as_defined():
+    assert precheck('x = 1', ('data',), setup_code='data = [1, 2]') is None
+    assert precheck("exec('result = 1')", ('result',)) is None
+    assert precheck('for result in range(3): pass', ('result',)) is None
+
+
+def test_function_locals_do_not_define_variables():
+    assert precheck('def f():\n    result = 1', ('result',)) is not None
+
+
+def test_forbidden_construct():
+    message = precheck('x = 1\nfor i in range(3):\n    pass', forbidden=(('loop', ''),))
+    assert message == 'This exercise should be solved without a Python loop (line 2).'
+    assert precheck('[i for i in range(3)]', forbidden=(('loop', 'No loops'),)) == 'No loops'
+    assert precheck('import numpy as np\nnp.sum([1])', forbidden=(('loop', ''),)) is None
+
+
+def test_required_name_matches_attributes():
+    required = (('np.where', ''),)
+    assert precheck('result = np.where(a > 0, a, 0)', required=required) is None
+    assert precheck('result = a', required=required) == 'This exercise should be solved using `np.where`.'
+    assert precheck('df.iterrows()', forbidden=(('iterrows', ''),)) is not None
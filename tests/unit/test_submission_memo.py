@@ -0,0 +1,37 @@
+"""Tests for the memo of submission verdicts (dstutor/core/submission_memo.py)"""
+
+from dstutor.core.submission_memo import SubmissionMemo, normalize_code
+
+
+EXERCISE = {'solution': 'result = x * 2', 'setup_code': 'x = 21', 'validation': {'type': 'value_check'}}
+
+
+def test_formatting_and_comments_do_not_change_the_key():
+    key = SubmissionMemo.key(EXERCISE, 'result = x * 2')
+    assert SubmissionMemo.key(EXERCISE, '# double it\nresult  =  (x*2)\n\n') == key
+    assert SubmissionMemo.key(EXERCISE, 'result = x * 3') != key
+
+
+def test_exercise_and_setup_are_part_of_the_key():
+    key = SubmissionMemo.key(EXERCISE, 'result = x * 2')
+    assert SubmissionMemo.key(dict(EXERCISE, setup_code='x = 20'), 'result = x * 2') != key
+    assert SubmissionMemo.key(dict(EXERCISE, validation={'type': 'type_check'}), 'result = x * 2') != key
+
+
+def test_code_that_does_not_parse_is_stripped():
+    assert normalize_code('result = (\n') == 'result = ('
+
+
+def test_least_recently_used_verdict_is_evicted():
+    memo = SubmissionMemo(max_entries=2)
+    memo.put('a', {'is_correct': True})
+    memo.put('b', {'is_correct': False})
+    memo.get('a')
+    memo.put('c', {'is_correct': True})
+
+    assert memo.get('b') is None
+    assert memo.get('a') == {'is_correct': True}
+
+    # Callers get copies: marking a result as cached doesn't change the memo
+    memo.get('a')['cached'] = True
+    assert memo.get('a') == {'is_correct': True}